@@ -0,0 +1,203 @@
+# backtesting.py
+import argparse
+import os
+import time
+import numpy as np
+import pandas as pd
+import conjuntos_dados
+import diagnosticos
+import helpers as helper
+import metricas
+import registro_modelos
+from modelos import criar_modelo, ajustar_modelo, descrever_candidato
+
+# Horizonte padrão (em períodos) de cada granularidade
+HORIZONTES = {"mensal": 6, "semanal": 8, "diaria": 30}
+
+def carregar_serie_completa(caminho_teste="dados_processados", granularidade="mensal"):
+    """
+    Retorna a série completa de uma granularidade, com as lacunas interpoladas uma única vez sobre
+    toda a série (sem a divisão em treino/teste, definida pelas origens do backtest).
+    """
+    completa = conjuntos_dados.obter_serie(caminho_teste, granularidade)
+    if completa is None:
+        print(f"❌ Erro: Arquivos não encontrados para a granularidade {granularidade}.")
+        return None
+    return helper.tratar_nans(completa, metodo="interpolacao")["Preco_Medio"]
+
+def matriz_reais(valores, origens, horizonte):
+    """
+    Monta a matriz (origens x horizonte) dos valores observados após cada origem, sem laços:
+    as janelas são vistas deslizantes sobre a série, completada com NaN após o último valor.
+    """
+    completos = np.concatenate([np.asarray(valores, dtype="float64"), np.full(horizonte, np.nan)])
+    janelas = np.lib.stride_tricks.sliding_window_view(completos, horizonte)
+    return janelas[np.asarray(origens)]
+
+def backtest(tipo, serie, ordem, ordem_sazonal=None, janela_inicial=None, horizonte=6, passo=1,
+             reajustar_a_cada=None, niveis=None):
+    """
+    Backtest com origem móvel (walk-forward). O modelo é ajustado uma única vez na janela inicial
+    e, a cada nova origem, os resultados do statsmodels são estendidos com as observações novas
+    (`extend`): apenas o filtro de Kalman é executado, com os parâmetros mantidos fixos.
+
+    Se `serie` é a série diferenciada, `niveis` é a série em nível: as previsões de cada origem são
+    acumuladas a partir do nível observado na origem, e erros e métricas são calculados sobre os preços.
+
+    Args:
+        tipo (str): 'ARIMA' ou 'SARIMA'.
+        serie (Series): Série completa, com índice de frequência definida.
+        ordem (tuple): Ordem (p, d, q).
+        ordem_sazonal (tuple): Ordem sazonal (P, D, Q, s), apenas para SARIMA.
+        janela_inicial (int): Número de observações do primeiro ajuste (padrão: 80% da série).
+        horizonte (int): Número de períodos previstos a partir de cada origem.
+        passo (int): Distância, em períodos, entre origens consecutivas.
+        reajustar_a_cada (int): Reestima os parâmetros a cada N origens (None = nunca reestimar).
+        niveis (Series): Série em nível, quando `serie` é a sua diferença (None = `serie` já está em nível).
+
+    Returns:
+        dict: Origens, matrizes de previsões (em nível), valores reais e erros (origens x horizonte),
+        métricas por horizonte (ver `metricas.calcular_metricas`) e tempo gasto em cada origem.
+    """
+    if tipo not in ("ARIMA", "SARIMA"):
+        raise ValueError(f"Backtest com atualização de estado não suportado para '{tipo}'. Use 'ARIMA' ou 'SARIMA'.")
+
+    if janela_inicial is None:
+        janela_inicial = int(len(serie) * 0.8)
+    origens = np.arange(janela_inicial, len(serie), passo)
+    if len(origens) == 0:
+        raise ValueError("A janela inicial não deixa nenhuma origem para o backtest.")
+
+    inicio = time.perf_counter()
+    resultado = ajustar_modelo(criar_modelo(tipo, serie.iloc[:janela_inicial], ordem, ordem_sazonal))
+    tempo_ajuste = time.perf_counter() - inicio
+
+    previsoes = np.empty((len(origens), horizonte))
+    tempos = np.empty(len(origens))
+    reajustes = 0
+    observados = janela_inicial
+
+    for i, origem in enumerate(origens):
+        inicio = time.perf_counter()
+        if reajustar_a_cada and i > 0 and i % reajustar_a_cada == 0:
+            # Reestimação periódica, partindo dos parâmetros atuais
+            resultado = ajustar_modelo(criar_modelo(tipo, serie.iloc[:origem], ordem, ordem_sazonal),
+                                       start_params=resultado.params)
+            reajustes += 1
+        elif origem > observados:
+            resultado = resultado.extend(serie.iloc[observados:origem])
+        observados = origem
+
+        previsoes[i] = np.asarray(resultado.forecast(steps=horizonte))
+        tempos[i] = time.perf_counter() - inicio
+
+    if niveis is not None:
+        # Níveis alinhados às datas da série diferenciada: a variação da posição i leva ao nível da posição i
+        serie = niveis.reindex(serie.index)
+        previsoes = serie.to_numpy()[origens - 1, None] + np.cumsum(previsoes, axis=1)
+
+    # Erros de todas as origens e horizontes em uma única passada vetorizada (uma linha por horizonte)
+    reais = matriz_reais(serie.to_numpy(), origens, horizonte)
+    erros = previsoes - reais
+    por_horizonte = metricas.calcular_metricas(previsoes.T, reais.T, serie.iloc[:janela_inicial])
+
+    return {
+        "tipo": tipo,
+        "ordem": tuple(ordem),
+        "ordem_sazonal": tuple(ordem_sazonal) if ordem_sazonal is not None else None,
+        "origens": serie.index[origens - 1],
+        "previsoes": previsoes,
+        "reais": reais,
+        "erros": erros,
+        "metricas_horizonte": por_horizonte,
+        "mae_horizonte": por_horizonte["MAE"],
+        "rmse_horizonte": por_horizonte["RMSE"],
+        "n_horizonte": (~np.isnan(erros)).sum(axis=0),
+        "tempo_ajuste": tempo_ajuste,
+        "tempos": tempos,
+        "reajustes": reajustes
+    }
+
+def resumir_backtest(resultado):
+    """
+    Exibe as métricas por horizonte e o custo do backtest por origem.
+    """
+    tempos = resultado["tempos"]
+    print(f"\n📈 Backtest {descrever_candidato(resultado['tipo'], resultado['ordem'], resultado['ordem_sazonal'])}: "
+          f"{len(tempos)} origens, horizonte de {resultado['previsoes'].shape[1]} períodos")
+    for h, n in enumerate(resultado["n_horizonte"]):
+        desempenho = {nome: valores[h] for nome, valores in resultado["metricas_horizonte"].items()}
+        print(f"   h={h + 1}: {metricas.formatar_metricas(desempenho)} ({n} origens)")
+    print(f"⏱️ Ajuste inicial: {resultado['tempo_ajuste']:.2f}s | por origem: média {tempos.mean() * 1000:.1f} ms, "
+          f"máx. {tempos.max() * 1000:.1f} ms | total: {resultado['tempo_ajuste'] + tempos.sum():.2f}s "
+          f"({resultado['reajustes']} reestimações)")
+
+def salvar_backtest(resultado, nome_modelo, granularidade, pasta_resultados="resultados"):
+    """
+    Salva as métricas por horizonte do backtest em CSV.
+    """
+    os.makedirs(pasta_resultados, exist_ok=True)
+    caminho = os.path.join(pasta_resultados, f"backtest_{nome_modelo.lower()}_{granularidade}.csv")
+    pd.DataFrame({
+        "Horizonte": np.arange(1, len(resultado["mae_horizonte"]) + 1),
+        **resultado["metricas_horizonte"],
+        "Origens": resultado["n_horizonte"]
+    }).to_csv(caminho, index=False)
+    print(f"✅ Backtest do {nome_modelo}_{granularidade} salvo em '{caminho}'.")
+    return caminho
+
+def executar_backtest(caminho_teste="dados_processados", granularidade="mensal", nome_modelo="SARIMA",
+                      horizonte=None, passo=1, reajustar_a_cada=None, pasta_registro=registro_modelos.PASTA_REGISTRO):
+    """
+    Executa o backtest com origem móvel de um modelo na granularidade especificada.
+    As ordens são lidas do registro de modelos (melhor configuração da última execução);
+    sem registro, são usadas as ordens padrão da busca.
+    """
+    if nome_modelo not in ("ARIMA", "SARIMA"):
+        print(f"❌ Backtest não disponível para {nome_modelo}: o Prophet não permite atualizar o estado "
+              "sem reajustar o modelo.")
+        return None
+
+    print(f"\n🚀 Executando backtest do {nome_modelo} para granularidade {granularidade}...")
+    serie = carregar_serie_completa(caminho_teste, granularidade)
+    if serie is None:
+        return None
+    niveis = None
+
+    metadados = registro_modelos.carregar_registro(pasta_registro).get(f"{nome_modelo.lower()}_{granularidade}")
+    if metadados is not None:
+        ordem = tuple(metadados["ordem"])
+        ordem_sazonal = tuple(metadados["ordem_sazonal"]) if metadados.get("ordem_sazonal") else None
+        if metadados.get("serie_diferenciada"):
+            # Mesma transformação aplicada no ajuste registrado; a avaliação volta aos níveis
+            niveis, serie = serie, serie.diff().iloc[1:]
+        print(f"📦 Ordens lidas do registro: {descrever_candidato(nome_modelo, ordem, ordem_sazonal)}")
+    else:
+        ordem = (1, 1, 1)
+        ordem_sazonal = (0, 0, 0, diagnosticos.SAZONALIDADES.get(granularidade, 12)) if nome_modelo == "SARIMA" else None
+
+    resultado = backtest(nome_modelo, serie, ordem, ordem_sazonal, horizonte=horizonte or HORIZONTES[granularidade],
+                         passo=passo, reajustar_a_cada=reajustar_a_cada, niveis=niveis)
+    resumir_backtest(resultado)
+    salvar_backtest(resultado, nome_modelo, granularidade)
+    return resultado
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description="Executa o backtest com origem móvel de um modelo do registro.")
+    parser.add_argument("--modelo", choices=["ARIMA", "SARIMA"], default="SARIMA")
+    parser.add_argument("--granularidade", choices=list(HORIZONTES), default="mensal")
+    parser.add_argument("--horizonte", type=int, default=None,
+                        help="Períodos previstos a partir de cada origem (padrão: depende da granularidade)")
+    parser.add_argument("--passo", type=int, default=1, help="Distância, em períodos, entre origens consecutivas")
+    parser.add_argument("--reajustar-a-cada", type=int, default=None,
+                        help="Reestima os parâmetros a cada N origens (padrão: nunca)")
+    parser.add_argument("--dados", default="dados_processados", help="Diretório dos dados processados")
+    parser.add_argument("--registro", default=registro_modelos.PASTA_REGISTRO, help="Diretório do registro de modelos")
+    args = parser.parse_args(argumentos)
+
+    resultado = executar_backtest(args.dados, args.granularidade, args.modelo, args.horizonte, args.passo,
+                                  args.reajustar_a_cada, args.registro)
+    return 0 if resultado is not None else 1
+
+if __name__ == "__main__":
+    raise SystemExit(main())
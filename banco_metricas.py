@@ -0,0 +1,172 @@
+# banco_metricas.py
+import json
+import os
+import socket
+import sqlite3
+from datetime import datetime
+import pandas as pd
+
+PASTA_METRICAS = "metricas"
+ARQUIVO_BANCO = "metricas.db"
+ARQUIVO_CSV_ANTIGO = "resultados_modelos.csv"
+CAMINHO_BANCO = os.path.join(PASTA_METRICAS, ARQUIVO_BANCO)
+
+# Identificador da execução: processos filhos herdam a variável de ambiente (ex.: execução em lote)
+VARIAVEL_EXECUCAO = "EXECUCAO_ID"
+
+# Colunas de métricas: nome exibido -> coluna no banco
+COLUNAS_METRICAS = {"MAE": "mae", "RMSE": "rmse", "R²": "r2", "MAPE": "mape", "sMAPE": "smape", "MASE": "mase"}
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS metricas (
+    modelo TEXT NOT NULL COLLATE NOCASE,
+    granularidade TEXT NOT NULL,
+    execucao TEXT NOT NULL,
+    mae REAL,
+    rmse REAL,
+    r2 REAL,
+    mape REAL,
+    smape REAL,
+    mase REAL,
+    tempo REAL,
+    metadados TEXT,
+    registrado_em TEXT NOT NULL,
+    PRIMARY KEY (modelo, granularidade, execucao)
+);
+CREATE INDEX IF NOT EXISTS idx_metricas_granularidade ON metricas (granularidade, modelo, registrado_em);
+CREATE INDEX IF NOT EXISTS idx_metricas_registro ON metricas (modelo, granularidade, registrado_em);
+"""
+
+def id_execucao():
+    """
+    Retorna o identificador da execução atual, criando-o na primeira chamada.
+    O identificador fica em uma variável de ambiente para ser compartilhado com os processos filhos.
+    """
+    if VARIAVEL_EXECUCAO not in os.environ:
+        os.environ[VARIAVEL_EXECUCAO] = f"{datetime.now():%Y%m%dT%H%M%S}-{socket.gethostname()}-{os.getpid()}"
+    return os.environ[VARIAVEL_EXECUCAO]
+
+def conectar(caminho_banco=CAMINHO_BANCO):
+    """
+    Abre o banco de métricas (SQLite em modo WAL, que permite leituras durante as gravações
+    de outros processos) e cria o esquema se necessário. Na criação, as métricas do CSV antigo
+    da mesma pasta são importadas.
+    """
+    pasta = os.path.dirname(caminho_banco)
+    if pasta:
+        os.makedirs(pasta, exist_ok=True)
+    novo = not os.path.exists(caminho_banco)
+
+    conexao = sqlite3.connect(caminho_banco, timeout=30)
+    conexao.execute("PRAGMA journal_mode=WAL")
+    conexao.execute("PRAGMA synchronous=NORMAL")
+    conexao.executescript(ESQUEMA)
+
+    caminho_csv = os.path.join(pasta, ARQUIVO_CSV_ANTIGO)
+    if novo and os.path.exists(caminho_csv):
+        importar_csv(conexao, caminho_csv)
+    return conexao
+
+def importar_csv(conexao, caminho_csv):
+    """
+    Importa as métricas do antigo `resultados_modelos.csv`, com a execução 'csv'.
+    """
+    df = pd.read_csv(caminho_csv)
+    registrado_em = datetime.fromtimestamp(os.path.getmtime(caminho_csv)).isoformat(timespec="seconds")
+    linhas = []
+    for _, linha in df.iterrows():
+        granularidade = linha["Granularidade"]
+        modelo = linha["Modelo"].removesuffix(f"_{granularidade}")
+        valores = [linha[nome] if nome in df.columns and pd.notna(linha[nome]) else None for nome in COLUNAS_METRICAS]
+        linhas.append((modelo, granularidade, "csv", *valores, registrado_em))
+
+    with conexao:
+        conexao.executemany(
+            f"INSERT OR IGNORE INTO metricas (modelo, granularidade, execucao, {', '.join(COLUNAS_METRICAS.values())}, "
+            "registrado_em) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            linhas
+        )
+    print(f"📥 {len(linhas)} registros importados de '{caminho_csv}'.")
+
+def salvar_metricas(modelo, granularidade, metricas, execucao=None, tempo=None, metadados=None,
+                    caminho_banco=CAMINHO_BANCO):
+    """
+    Grava as métricas de um modelo com uma única operação atômica (upsert) pela chave
+    (modelo, granularidade, execução). Nenhum outro registro é lido ou reescrito.
+
+    Args:
+        modelo (str): Nome do modelo.
+        granularidade (str): Granularidade dos dados.
+        metricas (dict): Métricas pelo nome exibido (ex.: {"MAE": ..., "RMSE": ..., "R²": ...}).
+        execucao (str): Identificador da execução (padrão: `id_execucao()`).
+        tempo (float): Tempo total da execução do modelo, em segundos.
+        metadados (dict): Informações adicionais da execução (ordens, modo de busca, ...).
+        caminho_banco (str): Caminho do banco SQLite.
+    """
+    colunas = [coluna for nome, coluna in COLUNAS_METRICAS.items() if nome in metricas]
+    valores = [None if pd.isna(metricas[nome]) else float(metricas[nome]) for nome in COLUNAS_METRICAS if nome in metricas]
+    campos = ["modelo", "granularidade", "execucao", *colunas, "tempo", "metadados", "registrado_em"]
+    atualizacao = ", ".join(f"{campo} = excluded.{campo}" for campo in campos[3:])
+
+    conexao = conectar(caminho_banco)
+    try:
+        with conexao:
+            conexao.execute(
+                f"INSERT INTO metricas ({', '.join(campos)}) VALUES ({', '.join('?' * len(campos))}) "
+                f"ON CONFLICT (modelo, granularidade, execucao) DO UPDATE SET {atualizacao}",
+                [modelo, granularidade, execucao or id_execucao(), *valores, tempo,
+                 json.dumps(metadados, ensure_ascii=False, default=str) if metadados else None,
+                 datetime.now().isoformat(timespec="seconds")]
+            )
+    finally:
+        conexao.close()
+
+def consultar_metricas(modelo=None, granularidade=None, todas_execucoes=False, caminho_banco=CAMINHO_BANCO):
+    """
+    Consulta as métricas pelos índices do banco, filtrando por modelo e/ou granularidade.
+
+    Args:
+        modelo (str): Nome do modelo (sem diferenciar maiúsculas/minúsculas). None = todos.
+        granularidade (str): Granularidade. None = todas.
+        todas_execucoes (bool): Se False, retorna apenas a execução mais recente de cada
+            par (modelo, granularidade).
+        caminho_banco (str): Caminho do banco SQLite.
+
+    Returns:
+        DataFrame: Colunas 'Modelo' (modelo_granularidade), 'Granularidade', métricas,
+        'Tempo', 'Execucao' e 'Registrado_em'.
+    """
+    filtros, parametros = [], []
+    if modelo is not None:
+        filtros.append("m.modelo = ?")
+        parametros.append(modelo)
+    if granularidade is not None:
+        filtros.append("m.granularidade = ?")
+        parametros.append(granularidade)
+    if not todas_execucoes:
+        filtros.append(
+            "m.rowid = (SELECT r.rowid FROM metricas r WHERE r.modelo = m.modelo AND r.granularidade = m.granularidade "
+            "ORDER BY r.registrado_em DESC, r.rowid DESC LIMIT 1)"
+        )
+    where = f"WHERE {' AND '.join(filtros)}" if filtros else ""
+
+    colunas_metricas = ", ".join(f'm.{coluna} AS "{nome}"' for nome, coluna in COLUNAS_METRICAS.items())
+    consulta = (
+        f"SELECT m.modelo || '_' || m.granularidade AS Modelo, m.granularidade AS Granularidade, "
+        f"{colunas_metricas}, m.tempo AS Tempo, m.execucao AS Execucao, m.registrado_em AS Registrado_em "
+        f"FROM metricas m {where} ORDER BY m.granularidade, m.modelo, m.registrado_em"
+    )
+
+    conexao = conectar(caminho_banco)
+    try:
+        return pd.read_sql_query(consulta, conexao, params=parametros)
+    finally:
+        conexao.close()
+
+def exportar_csv(caminho_csv, caminho_banco=CAMINHO_BANCO):
+    """
+    Exporta a execução mais recente de cada modelo e granularidade para CSV.
+    """
+    df = consultar_metricas(caminho_banco=caminho_banco)
+    df.to_csv(caminho_csv, index=False)
+    return caminho_csv
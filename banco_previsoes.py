@@ -0,0 +1,100 @@
+# banco_previsoes.py
+import json
+import os
+from datetime import datetime
+import numpy as np
+import pyarrow as pa
+import banco_metricas
+
+PASTA_PREVISOES = os.path.join("resultados", "previsoes")
+COLUNAS_FIXAS = ["Data", "Real", "Final"]
+
+def _caminho(nome_modelo, granularidade, pasta):
+    return os.path.join(pasta, f"{nome_modelo.lower()}_{granularidade}.arrow")
+
+def salvar_previsoes(nome_modelo, granularidade, datas, reais, final, candidatos=None, metadados=None,
+                     compressao=None, pasta=PASTA_PREVISOES):
+    """
+    Salva as previsões de uma execução (modelo final e todos os candidatos da busca) em um único
+    arquivo colunar Arrow IPC (Feather v2), uma coluna contígua por previsão.
+    As datas e os valores reais vêm do chamador: o conjunto de teste não é relido do disco.
+
+    Args:
+        nome_modelo (str): Nome do modelo.
+        granularidade (str): Granularidade dos dados.
+        datas (DatetimeIndex): Datas do conjunto de teste.
+        reais (array-like): Valores reais do conjunto de teste.
+        final (array-like): Previsões do modelo final, alinhadas às datas (NaN onde não houver).
+        candidatos (dict): Previsões de cada candidato da busca, pelo nome do candidato.
+        metadados (dict): Informações adicionais (ordens, métricas de cada candidato, ...).
+        compressao (str): None (padrão, permite leitura sem cópia), 'zstd' ou 'lz4'.
+        pasta (str): Diretório do armazenamento de previsões.
+
+    Returns:
+        str: Caminho do arquivo salvo.
+    """
+    os.makedirs(pasta, exist_ok=True)
+    colunas = {
+        "Data": pa.array(np.asarray(datas, dtype="datetime64[ns]")),
+        "Real": pa.array(np.asarray(reais, dtype="float64")),
+        "Final": pa.array(np.asarray(final, dtype="float64"))
+    }
+    for nome, valores in (candidatos or {}).items():
+        colunas[nome] = pa.array(np.asarray(valores, dtype="float64"))
+
+    descricao = {
+        "modelo": nome_modelo,
+        "granularidade": granularidade,
+        "execucao": banco_metricas.id_execucao(),
+        "salvo_em": datetime.now().isoformat(timespec="seconds"),
+        **(metadados or {})
+    }
+    tabela = pa.table(colunas).replace_schema_metadata(
+        {"previsoes": json.dumps(descricao, ensure_ascii=False, default=str)}
+    )
+
+    caminho = _caminho(nome_modelo, granularidade, pasta)
+    temporario = f"{caminho}.{os.getpid()}.tmp"
+    opcoes = pa.ipc.IpcWriteOptions(compression=compressao)
+    with pa.OSFile(temporario, "wb") as arquivo, pa.ipc.new_file(arquivo, tabela.schema, options=opcoes) as escritor:
+        escritor.write_table(tabela)
+    os.replace(temporario, caminho)
+
+    print(f"✅ {len(colunas) - len(COLUNAS_FIXAS)} previsões de candidatos e a previsão final do "
+          f"{nome_modelo}_{granularidade} salvas em '{caminho}'.")
+    return caminho
+
+def ler_previsoes(nome_modelo, granularidade, pasta=PASTA_PREVISOES):
+    """
+    Lê as previsões de uma execução com mapeamento em memória. Em arquivos sem compressão,
+    as colunas apontam diretamente para o arquivo mapeado (sem cópia).
+
+    Returns:
+        tuple: Tabela Arrow (colunas 'Data', 'Real', 'Final' e uma por candidato) e metadados.
+    """
+    caminho = _caminho(nome_modelo, granularidade, pasta)
+    tabela = pa.ipc.open_file(pa.memory_map(caminho, "r")).read_all()
+    metadados = json.loads(tabela.schema.metadata[b"previsoes"].decode("utf-8"))
+    return tabela, metadados
+
+def coluna_previsao(tabela, nome):
+    """
+    Retorna uma coluna de previsões como array NumPy somente leitura, sem cópia.
+    """
+    coluna = tabela.column(nome)
+    if coluna.num_chunks == 1:
+        return coluna.chunk(0).to_numpy(zero_copy_only=True)
+    return coluna.to_numpy()
+
+def matriz_candidatos(tabela):
+    """
+    Empilha as previsões de todos os candidatos em uma matriz (candidatos x horizonte),
+    no formato usado por `metricas.calcular_metricas`.
+
+    Returns:
+        tuple: Nomes dos candidatos e matriz de previsões.
+    """
+    nomes = [nome for nome in tabela.column_names if nome not in COLUNAS_FIXAS]
+    if not nomes:
+        return nomes, np.empty((0, tabela.num_rows))
+    return nomes, np.vstack([coluna_previsao(tabela, nome) for nome in nomes])
@@ -0,0 +1,290 @@
+# benchmarks/executar.py
+import argparse
+import contextlib
+import hashlib
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if RAIZ not in sys.path:
+    sys.path.insert(0, RAIZ)
+
+from benchmarks import inicializacao
+from benchmarks.gerar_dados import gerar_arquivos_anp
+
+PASTA_BENCHMARKS = os.path.dirname(os.path.abspath(__file__))
+PASTA_RESULTADOS = os.path.join(PASTA_BENCHMARKS, "resultados")
+PASTA_DADOS = os.path.join(tempfile.gettempdir(), "benchmarks_anp")
+GRANULARIDADES = ["mensal", "semanal", "diaria"]
+TOLERANCIA = 0.10  # Aumento relativo do tempo mínimo considerado regressão
+
+# Escalas dos dados sintéticos: coletas por arquivo (semestre), anos, produtos e postos.
+# Mínimo de 10 anos: a EDA calcula a PACF com 40 defasagens no treino mensal (exige mais de 80 meses).
+ESCALAS = {
+    "pequena": {"linhas": 5_000, "anos": 10, "produtos": 2, "postos": 200},
+    "media": {"linhas": 50_000, "anos": 15, "produtos": 3, "postos": 2_000},
+    "grande": {"linhas": 400_000, "anos": 20, "produtos": 6, "postos": 20_000}
+}
+
+def preparar_dados(escala, pasta_base=PASTA_DADOS, semente=0):
+    """
+    Gera (ou reaproveita) os arquivos sintéticos de uma escala. Os arquivos ficam em uma pasta
+    identificada pelos parâmetros, para que execuções repetidas meçam exatamente os mesmos dados.
+
+    Returns:
+        str: Padrão glob dos arquivos ca-*.csv.
+    """
+    chave = hashlib.sha256(json.dumps({**escala, "semente": semente}, sort_keys=True).encode()).hexdigest()[:12]
+    pasta = os.path.join(pasta_base, chave)
+    marcador = os.path.join(pasta, "completo.json")
+    if not os.path.exists(marcador):
+        inicio = time.perf_counter()
+        gerar_arquivos_anp(pasta, escala["linhas"], escala["anos"], produtos=escala["produtos"],
+                           postos=escala["postos"], semente=semente)
+        with open(marcador, "w", encoding="utf-8") as f:
+            json.dump({**escala, "semente": semente}, f)
+        print(f"🧪 Dados sintéticos gerados em '{pasta}' em {time.perf_counter() - inicio:.2f}s")
+    return os.path.join(pasta, "ca-*.csv")
+
+def medir(funcao, repeticoes, preparar=None):
+    """
+    Executa a função `repeticoes` vezes, com a saída suprimida, e mede cada execução.
+    `preparar` roda antes de cada repetição, fora da medição, e o seu retorno é passado à função.
+
+    Returns:
+        dict: Tempos de cada repetição, mínimo, mediana e máximo, em segundos.
+    """
+    tempos = []
+    for _ in range(repeticoes):
+        with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+            argumento = preparar() if preparar else None
+            inicio = time.perf_counter()
+            funcao(argumento) if preparar else funcao()
+            tempos.append(time.perf_counter() - inicio)
+    return {
+        "tempos": [round(t, 4) for t in tempos],
+        "minimo": min(tempos),
+        "mediana": statistics.median(tempos),
+        "maximo": max(tempos)
+    }
+
+def montar_benchmarks(arquivos, busca="stepwise", n_processos=1):
+    """
+    Monta os benchmarks: inicialização do menu e importação a frio dos módulos pesados, leitura dos
+    dados (sem e com o cache de arquivos), ajuste de cada modelo por granularidade (sem o cache de
+    ajustes, para medir a busca inteira) e a EDA.
+
+    Returns:
+        dict: Nome do benchmark -> (função, preparação ou None).
+    """
+    import dados
+    import modelos
+    import visualizacao
+
+    def carregar_frio():
+        pasta_cache = tempfile.mkdtemp(prefix="cache_", dir=".")
+        dados.carregar_dados(arquivos, "dados_processados", n_processos, pasta_cache)
+
+    def carregar_quente():
+        dados.carregar_dados(arquivos, "dados_processados", n_processos, "cache_dados")
+
+    benchmarks = {
+        "inicializacao_menu": (lambda: inicializacao.medir_inicializacao(".", repeticoes=1), None),
+        "importar_modelos": (lambda: inicializacao.importar("modelos"), None),
+        "importar_visualizacao": (lambda: inicializacao.importar("visualizacao"), None),
+        "carregar_dados_frio": (carregar_frio, None),
+        "carregar_dados_cache": (carregar_quente, None)
+    }
+
+    # Cada repetição recebe visões novas dos dados (lidos uma única vez por processo)
+    def preparar(gran):
+        return lambda: modelos.carregar_dados("dados_processados", gran)
+
+    for gran in GRANULARIDADES:
+        benchmarks[f"arima_{gran}"] = (
+            lambda conjuntos, gran=gran: modelos.ajustar_arima(*conjuntos, "ARIMA", gran, n_processos, busca,
+                                                               pasta_cache=None),
+            preparar(gran)
+        )
+        benchmarks[f"sarima_{gran}"] = (
+            lambda conjuntos, gran=gran: modelos.ajustar_sarima(*conjuntos, "SARIMA", gran, n_processos, busca,
+                                                                pasta_cache=None),
+            preparar(gran)
+        )
+        benchmarks[f"prophet_{gran}"] = (
+            lambda conjuntos, gran=gran: modelos.ajustar_prophet(*conjuntos, "Prophet", gran),
+            preparar(gran)
+        )
+
+    benchmarks["executar_eda"] = (
+        lambda: visualizacao.executar_eda("dados_processados", "resultados_eda", n_processos, usar_cache=False), None
+    )
+    benchmarks["executar_eda_cache"] = (
+        lambda: visualizacao.executar_eda("dados_processados", "resultados_eda", n_processos), None
+    )
+    return benchmarks
+
+def informacoes_ambiente():
+    """
+    Descreve o ambiente da execução (commit, Python, sistema e núcleos) para comparar resultados.
+    """
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=RAIZ, capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "python": platform.python_version(),
+        "sistema": platform.platform(),
+        "nucleos": os.cpu_count()
+    }
+
+def executar_benchmarks(escala, repeticoes=3, filtro=None, busca="stepwise", n_processos=1, semente=0):
+    """
+    Executa os benchmarks em um diretório de trabalho temporário, isolado dos dados e resultados do projeto.
+
+    Args:
+        escala (dict): Parâmetros dos dados sintéticos ('linhas', 'anos', 'produtos', 'postos').
+        repeticoes (int): Repetições de cada benchmark.
+        filtro (list): Prefixos dos benchmarks a executar (None = todos).
+        busca (str): Modo de busca dos parâmetros ('exaustiva' ou 'stepwise').
+        n_processos (int): Processos usados na leitura e na busca (1 torna os tempos mais estáveis).
+        semente (int): Semente dos dados sintéticos.
+
+    Returns:
+        dict: Ambiente, parâmetros e resultados de cada benchmark.
+    """
+    os.environ.setdefault("MPLBACKEND", "Agg")
+    arquivos = preparar_dados(escala, semente=semente)
+    diretorio_original = os.getcwd()
+
+    with tempfile.TemporaryDirectory(prefix="benchmarks_") as diretorio:
+        os.chdir(diretorio)
+        os.environ["EXECUCAO_ID"] = f"benchmark-{os.getpid()}"
+        try:
+            import dados
+            # Os modelos precisam dos dados processados mesmo quando só eles são medidos
+            with contextlib.redirect_stdout(io.StringIO()):
+                dados.carregar_dados(arquivos, "dados_processados", n_processos)
+
+            resultados = {}
+            for nome, (funcao, preparar) in montar_benchmarks(arquivos, busca, n_processos).items():
+                if filtro and not any(nome.startswith(prefixo) for prefixo in filtro):
+                    continue
+                try:
+                    resultados[nome] = medir(funcao, repeticoes, preparar)
+                    print(f"⏱️ {nome:<24} mín. {resultados[nome]['minimo']:.3f}s  "
+                          f"mediana {resultados[nome]['mediana']:.3f}s")
+                except Exception as e:
+                    resultados[nome] = {"erro": str(e)}
+                    print(f"❌ {nome}: {e}")
+        finally:
+            os.chdir(diretorio_original)
+
+    return {
+        "data": datetime.now().isoformat(timespec="seconds"),
+        "ambiente": informacoes_ambiente(),
+        "parametros": {**escala, "semente": semente, "repeticoes": repeticoes, "busca": busca,
+                       "n_processos": n_processos},
+        "resultados": resultados
+    }
+
+def salvar_resultados(relatorio, caminho=None):
+    """
+    Salva o relatório em JSON (padrão: benchmarks/resultados/<data>_<commit>.json).
+    """
+    if caminho is None:
+        nome = f"{datetime.now():%Y%m%dT%H%M%S}_{relatorio['ambiente']['commit'] or 'sem_commit'}.json"
+        caminho = os.path.join(PASTA_RESULTADOS, nome)
+    pasta = os.path.dirname(caminho)
+    if pasta:
+        os.makedirs(pasta, exist_ok=True)
+    temporario = f"{caminho}.tmp"
+    with open(temporario, "w", encoding="utf-8") as f:
+        json.dump(relatorio, f, ensure_ascii=False, indent=2)
+    os.replace(temporario, caminho)
+    print(f"📁 Resultados salvos em '{caminho}'.")
+    return caminho
+
+def comparar(atual, base, tolerancia=TOLERANCIA):
+    """
+    Compara os tempos mínimos de dois relatórios (o mínimo é o menos sensível a ruído)
+    e aponta as regressões acima da tolerância.
+
+    Args:
+        atual (dict): Relatório da execução atual.
+        base (dict): Relatório de referência.
+        tolerancia (float): Aumento relativo aceito (0.10 = 10%).
+
+    Returns:
+        list: Nomes dos benchmarks com regressão.
+    """
+    if {k: v for k, v in atual["parametros"].items() if k != "repeticoes"} != \
+            {k: v for k, v in base["parametros"].items() if k != "repeticoes"}:
+        print("⚠️ Os relatórios foram gerados com parâmetros diferentes; a comparação pode não ser válida.")
+
+    print(f"\n=== ⚖️ COMPARAÇÃO COM {base['ambiente'].get('commit') or base['data']} ===")
+    print(f"{'Benchmark':<26}{'Base (s)':>10}{'Atual (s)':>11}{'Variação':>10}")
+    regressoes = []
+    for nome, resultado in atual["resultados"].items():
+        referencia = base["resultados"].get(nome)
+        if "minimo" not in resultado or not referencia or "minimo" not in referencia:
+            continue
+        variacao = resultado["minimo"] / referencia["minimo"] - 1
+        marca = ""
+        if variacao > tolerancia:
+            regressoes.append(nome)
+            marca = "  ⚠️ regressão"
+        elif variacao < -tolerancia:
+            marca = "  🚀"
+        print(f"{nome:<26}{referencia['minimo']:>10.3f}{resultado['minimo']:>11.3f}{variacao:>+10.1%}{marca}")
+
+    if regressoes:
+        print(f"⚠️ {len(regressoes)} benchmarks mais lentos que a base (tolerância de {tolerancia:.0%}).")
+    else:
+        print("✅ Nenhuma regressão encontrada.")
+    return regressoes
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description="Executa os benchmarks com dados sintéticos no formato ANP.")
+    parser.add_argument("--escala", choices=ESCALAS, default="pequena")
+    parser.add_argument("--linhas", type=int, help="Coletas por arquivo (substitui a escala)")
+    parser.add_argument("--anos", type=int, help="Anos de dados (substitui a escala)")
+    parser.add_argument("--produtos", type=int, help="Número de produtos (substitui a escala)")
+    parser.add_argument("--postos", type=int, help="Número de postos (substitui a escala)")
+    parser.add_argument("--repeticoes", type=int, default=3)
+    parser.add_argument("--filtro", nargs="+", help="Prefixos dos benchmarks (ex.: carregar_dados arima_mensal)")
+    parser.add_argument("--busca", choices=["exaustiva", "stepwise"], default="stepwise")
+    parser.add_argument("--processos", type=int, default=1)
+    parser.add_argument("--semente", type=int, default=0)
+    parser.add_argument("--saida", help="Arquivo JSON de saída")
+    parser.add_argument("--base", help="Relatório JSON de referência para detectar regressões")
+    parser.add_argument("--tolerancia", type=float, default=TOLERANCIA)
+    args = parser.parse_args(argumentos)
+
+    escala = dict(ESCALAS[args.escala])
+    for parametro in escala:
+        if getattr(args, parametro) is not None:
+            escala[parametro] = getattr(args, parametro)
+
+    relatorio = executar_benchmarks(escala, args.repeticoes, args.filtro, args.busca, args.processos, args.semente)
+    salvar_resultados(relatorio, args.saida)
+
+    if args.base:
+        with open(args.base, encoding="utf-8") as f:
+            base = json.load(f)
+        if comparar(relatorio, base, args.tolerancia):
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,114 @@
+# benchmarks/gerar_dados.py
+import argparse
+import os
+import time
+import numpy as np
+import pandas as pd
+
+# Colunas dos arquivos semestrais da ANP (Série Histórica de Preços de Combustíveis)
+COLUNAS_ANP = [
+    "Regiao - Sigla", "Estado - Sigla", "Municipio", "Revenda", "CNPJ da Revenda", "Nome da Rua",
+    "Numero Rua", "Complemento", "Bairro", "Cep", "Produto", "Data da Coleta", "Valor de Venda",
+    "Valor de Compra", "Unidade de Medida", "Bandeira"
+]
+PRODUTOS = ["GASOLINA", "ETANOL", "DIESEL", "DIESEL S10", "GASOLINA ADITIVADA", "GNV"]
+PRECO_BASE = {"GASOLINA": 4.2, "ETANOL": 3.0, "DIESEL": 3.6, "DIESEL S10": 3.7, "GASOLINA ADITIVADA": 4.4, "GNV": 3.3}
+ESTADOS = {
+    "SP": "SE", "RJ": "SE", "MG": "SE", "ES": "SE", "PR": "S", "SC": "S", "RS": "S", "BA": "NE", "PE": "NE",
+    "CE": "NE", "GO": "CO", "DF": "CO", "MT": "CO", "AM": "N", "PA": "N"
+}
+BANDEIRAS = ["BRANCA", "PETROBRAS DISTRIBUIDORA S.A.", "IPIRANGA", "RAIZEN", "ALESAT"]
+SEMESTRES = [(1, 6), (7, 12)]
+
+def gerar_postos(n_postos, rng):
+    """
+    Gera o cadastro fictício dos postos (estado, município, revenda, CNPJ, endereço e bandeira).
+    """
+    estados = rng.choice(list(ESTADOS), n_postos)
+    municipios = np.char.add(np.char.add(estados.astype(str), " MUNICIPIO "), rng.integers(1, 20, n_postos).astype(str))
+    return pd.DataFrame({
+        "Regiao - Sigla": [ESTADOS[uf] for uf in estados],
+        "Estado - Sigla": estados,
+        "Municipio": municipios,
+        "Revenda": [f"POSTO {i:05d} LTDA" for i in range(n_postos)],
+        "CNPJ da Revenda": [f"{i:08d}/0001-{i % 100:02d}" for i in range(n_postos)],
+        "Nome da Rua": "AVENIDA PRINCIPAL",
+        "Numero Rua": rng.integers(1, 5000, n_postos).astype(str),
+        "Complemento": "",
+        "Bairro": "CENTRO",
+        "Cep": [f"{rng.integers(10000, 99999)}-000" for _ in range(n_postos)],
+        "Bandeira": rng.choice(BANDEIRAS, n_postos)
+    })
+
+def gerar_semestre(ano, semestre, linhas, produtos, postos, rng):
+    """
+    Gera as coletas de um semestre. O preço segue tendência + sazonalidade semanal e anual
+    + diferença por produto e por estado + ruído.
+    """
+    mes_inicio, mes_fim = SEMESTRES[semestre - 1]
+    dias = pd.date_range(f"{ano}-{mes_inicio:02d}-01", pd.Timestamp(f"{ano}-{mes_fim:02d}-01") + pd.offsets.MonthEnd(0))
+    datas = dias[rng.integers(0, len(dias), linhas)]
+    produto = np.asarray(produtos)[rng.integers(0, len(produtos), linhas)]
+    posto = postos.iloc[rng.integers(0, len(postos), linhas)].reset_index(drop=True)
+
+    t = (datas - pd.Timestamp("2004-01-01")).days.to_numpy()
+    base = pd.Series(produto).map(PRECO_BASE).to_numpy()
+    ajuste_estado = posto["Estado - Sigla"].map({uf: i * 0.02 for i, uf in enumerate(ESTADOS)}).to_numpy()
+    preco = (base * (0.55 + 0.00012 * t) + 0.03 * np.sin(2 * np.pi * t / 7) + 0.08 * np.sin(2 * np.pi * t / 365.25)
+             + ajuste_estado + rng.normal(0, 0.05, linhas))
+
+    df = posto.copy()
+    df["Produto"] = produto
+    df["Data da Coleta"] = datas.strftime("%d/%m/%Y")
+    df["Valor de Venda"] = np.char.replace(np.char.mod("%.3f", preco.round(3)), ".", ",")
+    df["Valor de Compra"] = ""
+    df["Unidade de Medida"] = np.where(produto == "GNV", "R$ / m³", "R$ / litro")
+    return df[COLUNAS_ANP]
+
+def gerar_arquivos_anp(pasta, linhas_por_arquivo=20_000, anos=5, ano_inicial=2004, produtos=3, postos=500,
+                       semente=0):
+    """
+    Gera arquivos ca-AAAA-01.csv / ca-AAAA-02.csv no formato da ANP (separador ';', decimal ',',
+    datas dd/mm/aaaa), um por semestre. Com a mesma semente, os arquivos gerados são idênticos.
+
+    Args:
+        pasta (str): Diretório de saída.
+        linhas_por_arquivo (int): Número de coletas por arquivo (semestre).
+        anos (int): Número de anos gerados.
+        ano_inicial (int): Primeiro ano.
+        produtos (int): Número de produtos (a gasolina sempre está incluída).
+        postos (int): Número de postos.
+        semente (int): Semente do gerador aleatório.
+
+    Returns:
+        list: Caminhos dos arquivos gerados.
+    """
+    os.makedirs(pasta, exist_ok=True)
+    rng = np.random.default_rng(semente)
+    lista_produtos = PRODUTOS[:max(1, produtos)]
+    cadastro = gerar_postos(postos, rng)
+
+    arquivos = []
+    for ano in range(ano_inicial, ano_inicial + anos):
+        for semestre in (1, 2):
+            caminho = os.path.join(pasta, f"ca-{ano}-0{semestre}.csv")
+            gerar_semestre(ano, semestre, linhas_por_arquivo, lista_produtos, cadastro, rng).to_csv(
+                caminho, sep=";", index=False)
+            arquivos.append(caminho)
+    return arquivos
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Gera arquivos sintéticos no formato ANP (ca-*.csv).")
+    parser.add_argument("pasta", help="Diretório de saída")
+    parser.add_argument("--linhas", type=int, default=20_000, help="Coletas por arquivo (semestre)")
+    parser.add_argument("--anos", type=int, default=5)
+    parser.add_argument("--ano-inicial", type=int, default=2004)
+    parser.add_argument("--produtos", type=int, default=3)
+    parser.add_argument("--postos", type=int, default=500)
+    parser.add_argument("--semente", type=int, default=0)
+    args = parser.parse_args()
+
+    inicio = time.perf_counter()
+    gerados = gerar_arquivos_anp(args.pasta, args.linhas, args.anos, args.ano_inicial, args.produtos, args.postos,
+                                 args.semente)
+    print(f"✅ {len(gerados)} arquivos gerados em '{args.pasta}' em {time.perf_counter() - inicio:.2f}s")
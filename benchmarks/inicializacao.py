@@ -0,0 +1,134 @@
+# benchmarks/inicializacao.py
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Tempo máximo (s) de `python main.py` até sair pelo menu, com os dados já processados
+ORCAMENTO_INICIALIZACAO = 0.5
+# Bibliotecas que não devem ser carregadas para abrir o menu
+MODULOS_PESADOS = ["numpy", "pandas", "scipy", "statsmodels", "prophet", "matplotlib", "seaborn", "sklearn", "pyarrow"]
+
+def _executar_python(argumentos, cwd=None, entrada=None):
+    ambiente = {**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, [RAIZ, os.environ.get("PYTHONPATH")]))}
+    return subprocess.run([sys.executable, *argumentos], cwd=cwd or RAIZ, input=entrada, capture_output=True,
+                          text=True, env=ambiente)
+
+def medir_inicializacao(pasta_trabalho=None, repeticoes=5):
+    """
+    Mede o tempo de `python main.py` até a saída pelo menu (opção Z), em um processo novo a cada repetição.
+    Sem dados processados em `pasta_trabalho`, o tempo inclui o processamento dos dados.
+
+    Returns:
+        dict: Tempos de cada repetição, mínimo, mediana e máximo, em segundos.
+    """
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        processo = _executar_python([os.path.join(RAIZ, "main.py")], pasta_trabalho, entrada="Z\n")
+        tempos.append(time.perf_counter() - inicio)
+        if processo.returncode != 0:
+            raise RuntimeError(f"main.py terminou com código {processo.returncode}: {processo.stderr.strip()[-500:]}")
+    return {
+        "tempos": [round(t, 4) for t in tempos],
+        "minimo": min(tempos),
+        "mediana": statistics.median(tempos),
+        "maximo": max(tempos)
+    }
+
+def importar(modulo):
+    """
+    Importa um módulo do projeto em um processo novo (importação a frio).
+    """
+    processo = _executar_python(["-c", f"import {modulo}"])
+    if processo.returncode != 0:
+        raise RuntimeError(processo.stderr.strip()[-500:])
+
+def modulos_carregados(modulo="main"):
+    """
+    Lista as bibliotecas pesadas carregadas pela importação de um módulo do projeto, em um processo novo.
+    """
+    codigo = (f"import sys, {modulo}; "
+              f"print(','.join(m for m in {MODULOS_PESADOS!r} if m in sys.modules))")
+    processo = _executar_python(["-c", codigo])
+    if processo.returncode != 0:
+        raise RuntimeError(processo.stderr.strip()[-500:])
+    saida = processo.stdout.strip().splitlines()
+    return [m for m in saida[-1].split(",") if m] if saida else []
+
+def detalhar_importacoes(modulo="main", limite=15):
+    """
+    Detalha o tempo de importação de um módulo com `python -X importtime`, em um processo novo.
+
+    Args:
+        modulo (str): Módulo importado.
+        limite (int): Número de pacotes de primeiro nível retornados.
+
+    Returns:
+        list: Pacotes de primeiro nível (dict com 'modulo', 'proprio' e 'acumulado', em segundos),
+        do mais caro para o mais barato. 'proprio' soma o tempo próprio de todos os submódulos do pacote.
+    """
+    processo = _executar_python(["-X", "importtime", "-c", f"import {modulo}"])
+    if processo.returncode != 0:
+        raise RuntimeError(processo.stderr.strip()[-500:])
+
+    pacotes = {}
+    for linha in processo.stderr.splitlines():
+        if not linha.startswith("import time:") or "cumulative" in linha:
+            continue
+        proprio, acumulado, nome = linha.removeprefix("import time:").split("|")
+        raiz = nome.strip().split(".")[0]
+        # Somente os módulos importados diretamente pelo módulo do projeto (nível de indentação mínimo)
+        profundidade = (len(nome) - len(nome.lstrip())) // 2
+        item = pacotes.setdefault(raiz, {"modulo": raiz, "proprio": 0.0, "acumulado": 0.0, "_profundidade": profundidade})
+        item["proprio"] += int(proprio) / 1e6
+        if profundidade <= item["_profundidade"]:
+            item["_profundidade"] = profundidade
+            item["acumulado"] = max(item["acumulado"], int(acumulado) / 1e6)
+
+    linhas = sorted(pacotes.values(), key=lambda item: item["acumulado"], reverse=True)[:limite]
+    for item in linhas:
+        del item["_profundidade"]
+    return linhas
+
+def exibir_importacoes(modulo, linhas):
+    print(f"\n=== 📦 IMPORTAÇÃO DE '{modulo}' ===")
+    print(f"{'Pacote':<24}{'Acumulado (ms)':>16}{'Próprio (ms)':>14}")
+    for item in linhas:
+        print(f"{item['modulo']:<24}{item['acumulado'] * 1000:>16.1f}{item['proprio'] * 1000:>14.1f}")
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description="Mede a inicialização do menu e detalha o tempo de importação.")
+    parser.add_argument("--repeticoes", type=int, default=5)
+    parser.add_argument("--orcamento", type=float, default=ORCAMENTO_INICIALIZACAO,
+                        help="Tempo máximo (s) da inicialização do menu")
+    parser.add_argument("--pasta", help="Diretório de trabalho com 'dados_processados' (padrão: raiz do projeto)")
+    parser.add_argument("--modulos", nargs="+", default=["main", "visualizacao", "modelos"],
+                        help="Módulos com importação detalhada")
+    args = parser.parse_args(argumentos)
+
+    for modulo in args.modulos:
+        exibir_importacoes(modulo, detalhar_importacoes(modulo))
+
+    falhas = 0
+    pesados = modulos_carregados("main")
+    if pesados:
+        print(f"\n⚠️ O menu carrega bibliotecas pesadas na inicialização: {', '.join(pesados)}")
+        falhas += 1
+
+    tempos = medir_inicializacao(args.pasta, args.repeticoes)
+    print(f"\n⏱️ Inicialização do menu: mín. {tempos['minimo']:.3f}s, mediana {tempos['mediana']:.3f}s "
+          f"(orçamento {args.orcamento:.3f}s)")
+    if tempos["mediana"] > args.orcamento:
+        print("⚠️ Inicialização acima do orçamento.")
+        falhas += 1
+    else:
+        print("✅ Inicialização dentro do orçamento.")
+    return 1 if falhas else 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
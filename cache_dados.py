@@ -0,0 +1,159 @@
+# cache_dados.py
+import hashlib
+import json
+import os
+
+PASTA_CACHE = "cache_dados"
+ARQUIVO_MANIFESTO = "manifesto.json"
+VERSAO_CACHE = 2
+
+def calcular_hash(arquivo, tamanho_bloco=1 << 20):
+    """
+    Calcula o hash SHA-256 do conteúdo de um arquivo, lendo-o em blocos.
+    """
+    sha = hashlib.sha256()
+    with open(arquivo, "rb") as f:
+        for bloco in iter(lambda: f.read(tamanho_bloco), b""):
+            sha.update(bloco)
+    return sha.hexdigest()
+
+def carregar_manifesto(pasta_cache=PASTA_CACHE):
+    """
+    Carrega o manifesto que associa cada arquivo de origem (caminho, tamanho, mtime) ao hash do seu conteúdo.
+    """
+    caminho = os.path.join(pasta_cache, ARQUIVO_MANIFESTO)
+    if not os.path.exists(caminho):
+        return {}
+    try:
+        with open(caminho, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        print(f"⚠️ Manifesto do cache inválido em '{caminho}'. Ignorando...")
+        return {}
+
+def salvar_manifesto(manifesto, pasta_cache=PASTA_CACHE):
+    """
+    Salva o manifesto de forma atômica (arquivo temporário + os.replace).
+    """
+    os.makedirs(pasta_cache, exist_ok=True)
+    caminho = os.path.join(pasta_cache, ARQUIVO_MANIFESTO)
+    temporario = f"{caminho}.{os.getpid()}.tmp"
+    with open(temporario, "w", encoding="utf-8") as f:
+        json.dump(manifesto, f, indent=2, sort_keys=True)
+    os.replace(temporario, caminho)
+
+def identificar_fonte(arquivo, manifesto):
+    """
+    Identifica um arquivo de origem pelo caminho, tamanho, mtime e hash do conteúdo.
+    O hash só é recalculado quando o tamanho ou o mtime mudaram desde o último registro.
+
+    Args:
+        arquivo (str): Caminho do arquivo CSV.
+        manifesto (dict): Manifesto carregado com `carregar_manifesto`.
+
+    Returns:
+        dict: Identificação da fonte ('caminho', 'tamanho', 'mtime', 'hash').
+    """
+    caminho = os.path.abspath(arquivo)
+    info = os.stat(caminho)
+    registro = manifesto.get(caminho)
+
+    if registro and registro["tamanho"] == info.st_size and registro["mtime"] == info.st_mtime_ns:
+        hash_conteudo = registro["hash"]
+    else:
+        hash_conteudo = calcular_hash(caminho)
+
+    return {
+        "caminho": caminho,
+        "tamanho": info.st_size,
+        "mtime": info.st_mtime_ns,
+        "hash": hash_conteudo
+    }
+
+def identificar_fontes(arquivos, pasta_cache=PASTA_CACHE):
+    """
+    Identifica uma lista de arquivos de origem usando o manifesto atual do cache.
+    """
+    manifesto = carregar_manifesto(pasta_cache)
+    return [identificar_fonte(arquivo, manifesto) for arquivo in arquivos]
+
+def fontes_alteradas(arquivos, pasta_cache=PASTA_CACHE):
+    """
+    Verifica, sem ler o conteúdo, se algum arquivo de origem foi criado, removido ou modificado
+    desde o último processamento registrado no manifesto.
+    """
+    manifesto = carregar_manifesto(pasta_cache)
+    caminhos = {os.path.abspath(arquivo) for arquivo in arquivos}
+
+    if caminhos != set(manifesto):
+        return True
+
+    for caminho in caminhos:
+        info = os.stat(caminho)
+        registro = manifesto[caminho]
+        if registro["tamanho"] != info.st_size or registro["mtime"] != info.st_mtime_ns:
+            return True
+
+    return False
+
+def _caminho_entrada(hash_conteudo, produto, pasta_cache):
+    return os.path.join(pasta_cache, f"{hash_conteudo}-{produto.lower()}-v{VERSAO_CACHE}.npz")
+
+def ler_cache(hash_conteudo, produto="GASOLINA", pasta_cache=PASTA_CACHE):
+    """
+    Lê os pares (soma, contagem) diários de um arquivo de origem a partir do cache.
+
+    Returns:
+        DataFrame ou None: Colunas 'Dia', 'Soma' e 'Contagem', ou None se não houver entrada.
+    """
+    caminho = _caminho_entrada(hash_conteudo, produto, pasta_cache)
+    if not os.path.exists(caminho):
+        return None
+
+    import numpy as np
+    import pandas as pd
+
+    with np.load(caminho) as entrada:
+        return pd.DataFrame({
+            "Dia": entrada["dia"],
+            "Soma": entrada["soma"],
+            "Contagem": entrada["contagem"]
+        })
+
+def gravar_cache(hash_conteudo, diario, produto="GASOLINA", pasta_cache=PASTA_CACHE):
+    """
+    Grava os pares (soma, contagem) diários de um arquivo de origem no cache, de forma atômica.
+    """
+    import numpy as np
+
+    os.makedirs(pasta_cache, exist_ok=True)
+    caminho = _caminho_entrada(hash_conteudo, produto, pasta_cache)
+    # Temporário sem a extensão .npz: a limpeza de `registrar_fontes` (talvez em outro processo) não o remove
+    temporario = f"{caminho}.{os.getpid()}.tmp"
+    with open(temporario, "wb") as f:
+        np.savez(
+            f,
+            dia=diario["Dia"].to_numpy(dtype="datetime64[ns]"),
+            soma=diario["Soma"].to_numpy(dtype="float64"),
+            contagem=diario["Contagem"].to_numpy(dtype="int64")
+        )
+    os.replace(temporario, caminho)
+
+def registrar_fontes(fontes, pasta_cache=PASTA_CACHE):
+    """
+    Atualiza o manifesto com as fontes processadas e remove entradas do cache que
+    não pertencem mais a nenhuma fonte.
+    """
+    manifesto = {
+        fonte["caminho"]: {"tamanho": fonte["tamanho"], "mtime": fonte["mtime"], "hash": fonte["hash"]}
+        for fonte in fontes
+    }
+    salvar_manifesto(manifesto, pasta_cache)
+
+    hashes_validos = {fonte["hash"] for fonte in fontes}
+    for nome in os.listdir(pasta_cache):
+        if not nome.endswith(".npz"):
+            continue
+        # Entradas de fontes que não existem mais ou de versões antigas do cache
+        if nome.split("-", 1)[0] not in hashes_validos or not nome.endswith(f"-v{VERSAO_CACHE}.npz"):
+            os.remove(os.path.join(pasta_cache, nome))
@@ -0,0 +1,119 @@
+# cache_modelos.py
+import hashlib
+import json
+import os
+import numpy as np
+
+PASTA_CACHE = "cache_modelos"
+LIMITE_BYTES = 200 * 1024 * 1024  # 200 MB
+VERSAO_CACHE = 1
+
+def impressao_serie(serie):
+    """
+    Calcula a impressão digital (SHA-256) de uma série: valores, datas e frequência do índice.
+    """
+    sha = hashlib.sha256()
+    sha.update(np.ascontiguousarray(serie.to_numpy(dtype="float64")).tobytes())
+    sha.update(np.ascontiguousarray(serie.index.to_numpy(dtype="datetime64[ns]")).view("int64").tobytes())
+    sha.update(str(getattr(serie.index, "freqstr", None)).encode())
+    return sha.hexdigest()
+
+def partida_vizinho(vizinho):
+    """
+    Identifica o ponto de partida de um ajuste com warm start pelos parâmetros do vizinho de onde ele
+    parte (nomes e valores): ajustes que partem de vizinhos diferentes ficam em entradas diferentes.
+    Retorna 'padrao' sem vizinho ajustado.
+    """
+    if vizinho is None or vizinho.get("params") is None:
+        return "padrao"
+    sha = hashlib.sha256(json.dumps(list(vizinho["nomes_params"])).encode())
+    sha.update(np.ascontiguousarray(vizinho["params"], dtype="float64").tobytes())
+    return f"vizinho:{sha.hexdigest()}"
+
+def chave_ajuste(tipo, impressao, ordem, ordem_sazonal, horizonte, partida="padrao"):
+    """
+    Monta a chave de cache de um ajuste: impressão da série de treino + especificação do modelo
+    + ponto de partida da otimização ('padrao' ou a identificação dos parâmetros iniciais, ver `partida_vizinho`).
+    """
+    especificacao = json.dumps({
+        "versao": VERSAO_CACHE,
+        "partida": partida,
+        "tipo": tipo,
+        "serie": impressao,
+        "ordem": list(ordem),
+        "ordem_sazonal": list(ordem_sazonal) if ordem_sazonal is not None else None,
+        "horizonte": horizonte
+    }, sort_keys=True)
+    return hashlib.sha256(especificacao.encode()).hexdigest()
+
+def _caminho(chave, pasta_cache):
+    return os.path.join(pasta_cache, f"{chave}.npz")
+
+def ler_ajuste(chave, pasta_cache=PASTA_CACHE):
+    """
+    Lê um ajuste do cache e marca a entrada como usada recentemente (LRU pelo mtime).
+
+    Returns:
+        dict ou None: 'params', 'nomes_params', 'llf', 'aic' e 'previsoes', ou None se não houver entrada.
+    """
+    caminho = _caminho(chave, pasta_cache)
+    try:
+        with np.load(caminho) as entrada:
+            ajuste = {
+                "params": entrada["params"],
+                "nomes_params": [str(nome) for nome in entrada["nomes_params"]],
+                "llf": float(entrada["llf"]),
+                "aic": float(entrada["aic"]),
+                "previsoes": entrada["previsoes"]
+            }
+    except (OSError, KeyError, ValueError):
+        return None
+
+    try:
+        os.utime(caminho)
+    except OSError:
+        pass
+    return ajuste
+
+def gravar_ajuste(chave, params, nomes_params, llf, aic, previsoes, pasta_cache=PASTA_CACHE,
+                  limite_bytes=LIMITE_BYTES):
+    """
+    Grava um ajuste no cache de forma atômica e remove as entradas menos usadas se o limite for excedido.
+    """
+    os.makedirs(pasta_cache, exist_ok=True)
+    caminho = _caminho(chave, pasta_cache)
+    temporario = f"{caminho}.{os.getpid()}.tmp.npz"
+    np.savez(
+        temporario,
+        params=np.asarray(params, dtype="float64"),
+        nomes_params=np.array(nomes_params, dtype=str),
+        llf=np.float64(llf),
+        aic=np.float64(aic),
+        previsoes=np.asarray(previsoes, dtype="float64")
+    )
+    os.replace(temporario, caminho)
+    limitar_cache(pasta_cache, limite_bytes)
+
+def limitar_cache(pasta_cache=PASTA_CACHE, limite_bytes=LIMITE_BYTES):
+    """
+    Remove as entradas usadas há mais tempo até o cache ficar abaixo de `limite_bytes`.
+    """
+    entradas = []
+    for nome in os.listdir(pasta_cache):
+        if not nome.endswith(".npz") or ".tmp" in nome:
+            continue
+        try:
+            info = os.stat(os.path.join(pasta_cache, nome))
+        except OSError:
+            continue
+        entradas.append((info.st_mtime_ns, info.st_size, nome))
+
+    total = sum(tamanho for _, tamanho, _ in entradas)
+    for _, tamanho, nome in sorted(entradas):
+        if total <= limite_bytes:
+            break
+        try:
+            os.remove(os.path.join(pasta_cache, nome))
+        except OSError:
+            continue
+        total -= tamanho
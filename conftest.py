@@ -0,0 +1,2 @@
+# conftest.py
+# Presente na raiz para que o pytest coloque o diretório do projeto no sys.path e os testes importem os módulos
@@ -0,0 +1,265 @@
+# conjuntos_dados.py
+import json
+import os
+import perfil
+
+# numpy e pandas são importados apenas ao ler ou gravar os dados: o menu importa este módulo sem carregá-los
+PASTA_DADOS = "dados_processados"
+FREQUENCIAS = {"diaria": "D", "semanal": "W", "mensal": "ME"}
+FRACAO_TREINO = 0.8
+VERSAO_SERIE = 1
+# Registro binário de cada período: data (ns desde a época) e preço médio
+CAMPOS_SERIE = [("data", "<M8[ns]"), ("preco", "<f8")]
+
+# Conjuntos já lidos neste processo: (pasta, granularidade) -> assinatura dos arquivos, série e divisões
+_CONJUNTOS = {}
+
+def caminho_serie(pasta, granularidade):
+    return os.path.join(pasta, f"serie_{granularidade}.npy")
+
+def caminho_metadados(pasta, granularidade):
+    return os.path.join(pasta, f"serie_{granularidade}.json")
+
+def _caminhos_csv(pasta, granularidade):
+    return (os.path.join(pasta, f"train_data_{granularidade}.csv"),
+            os.path.join(pasta, f"test_data_{granularidade}.csv"))
+
+def _fonte(pasta, granularidade):
+    """
+    Arquivos de onde a granularidade é lida: a série binária (com os metadados) ou, em pastas
+    processadas antes dela, o par de CSVs de treino e teste. None se nenhum dos dois existir.
+    """
+    binarios = (caminho_metadados(pasta, granularidade), caminho_serie(pasta, granularidade))
+    if all(map(os.path.exists, binarios)):
+        return "binario", binarios
+    csvs = _caminhos_csv(pasta, granularidade)
+    if all(map(os.path.exists, csvs)):
+        return "csv", csvs
+    return None
+
+def existe(pasta=PASTA_DADOS, granularidade="mensal"):
+    """
+    Verifica se a granularidade está processada na pasta (em qualquer um dos formatos).
+    """
+    return _fonte(pasta, granularidade) is not None
+
+def origem(pasta=PASTA_DADOS, granularidade="mensal"):
+    """
+    Identifica a versão dos dados de uma granularidade (arquivo principal, tamanho e mtime),
+    para caches derivados deles. None se a granularidade não estiver processada.
+    """
+    fonte = _fonte(pasta, granularidade)
+    if fonte is None:
+        return None
+    caminho = fonte[1][1] if fonte[0] == "binario" else fonte[1][0]
+    estado = os.stat(caminho)
+    return {"arquivo": os.path.basename(caminho), "tamanho": estado.st_size, "mtime_ns": estado.st_mtime_ns}
+
+def contar_observacoes(pasta=PASTA_DADOS, granularidade="mensal"):
+    """
+    Conta os períodos do conjunto de treino (divisão gravada), sem ler a série.
+    """
+    fonte = _fonte(pasta, granularidade)
+    if fonte is None:
+        raise FileNotFoundError(f"Granularidade '{granularidade}' não processada em '{pasta}'.")
+    tipo, caminhos = fonte
+    if tipo == "binario":
+        with open(caminhos[0], encoding="utf-8") as f:
+            return json.load(f)["corte"]
+    with open(caminhos[0], "rb") as f:
+        return max(0, sum(1 for _ in f) - 1)
+
+def calcular_corte(n, fracao_treino=FRACAO_TREINO):
+    """
+    Número de períodos do conjunto de treino (os primeiros) para uma fração de treino.
+    """
+    return int(n * fracao_treino)
+
+def salvar_serie(datas, precos, granularidade, pasta=PASTA_DADOS, fracao_treino=FRACAO_TREINO):
+    """
+    Grava a série de uma granularidade uma única vez, como um array estruturado (data, preço) em
+    `serie_<granularidade>.npy` (mapeável em memória) e um cabeçalho de metadados em
+    `serie_<granularidade>.json`. A divisão gravada é apenas a padrão: treino e teste são escolhidos
+    na leitura (ver `obter_dados`).
+
+    Args:
+        datas (array-like): Datas dos períodos, em ordem crescente.
+        precos (array-like): Preço médio de cada período (NaN em períodos sem coletas).
+        granularidade (str): Granularidade (diaria, semanal, mensal).
+        pasta (str): Diretório dos dados processados.
+        fracao_treino (float): Fração inicial da série usada como treino por padrão.
+
+    Returns:
+        dict: Metadados gravados.
+    """
+    import numpy as np
+
+    serie = np.empty(len(precos), dtype=CAMPOS_SERIE)
+    serie["data"] = np.asarray(datas, dtype="datetime64[ns]")
+    serie["preco"] = np.asarray(precos, dtype="float64")
+
+    metadados = {
+        "versao": VERSAO_SERIE,
+        "granularidade": granularidade,
+        "frequencia": FREQUENCIAS.get(granularidade),
+        "n": int(len(serie)),
+        "corte": calcular_corte(len(serie), fracao_treino),
+        "fracao_treino": fracao_treino,
+        "inicio": str(serie["data"][0]) if len(serie) else None,
+        "fim": str(serie["data"][-1]) if len(serie) else None,
+        "campos": [nome for nome, _ in CAMPOS_SERIE]
+    }
+
+    # Série antes dos metadados: os metadados só apontam para uma série completa
+    os.makedirs(pasta, exist_ok=True)
+    for caminho, gravar in [(caminho_serie(pasta, granularidade), lambda f: np.save(f, serie)),
+                            (caminho_metadados(pasta, granularidade),
+                             lambda f: f.write(json.dumps(metadados, ensure_ascii=False, indent=2).encode("utf-8")))]:
+        temporario = f"{caminho}.{os.getpid()}.tmp"
+        with open(temporario, "wb") as f:
+            gravar(f)
+        os.replace(temporario, caminho)
+    return metadados
+
+def _assinatura(caminhos):
+    """
+    Tamanho e mtime de cada arquivo; None se algum deles não existir.
+    """
+    try:
+        return tuple((estado.st_size, estado.st_mtime_ns) for estado in map(os.stat, caminhos))
+    except FileNotFoundError:
+        return None
+
+def _com_frequencia(df, frequencia):
+    """
+    Define a frequência do índice sem copiar os dados quando as datas já são regulares;
+    caso contrário, completa os períodos ausentes com NaN.
+    """
+    if not frequencia:
+        return df
+    try:
+        df.index.freq = frequencia
+        return df
+    except ValueError:
+        return df.asfreq(frequencia)
+
+def _ler_binario(caminhos, frequencia):
+    import numpy as np
+    import pandas as pd
+
+    caminho_meta, caminho_npy = caminhos
+    with open(caminho_meta, encoding="utf-8") as f:
+        metadados = json.load(f)
+    if metadados.get("versao") != VERSAO_SERIE:
+        raise ValueError(f"Versão de série não suportada em '{caminho_meta}': {metadados.get('versao')}")
+
+    # Os preços continuam no arquivo mapeado: as fatias de treino/teste são visões sobre ele
+    serie = np.load(caminho_npy, mmap_mode="r")
+    df = pd.DataFrame({"Preco_Medio": serie["preco"], "Time_Index": np.arange(len(serie))},
+                      index=pd.DatetimeIndex(serie["data"], name="Data"), copy=False)
+    return _com_frequencia(df, frequencia), metadados["corte"]
+
+def _ler_csv(caminhos, frequencia):
+    import pandas as pd
+
+    treino, teste = (_com_frequencia(pd.read_csv(caminho, parse_dates=["Data"]).set_index("Data"), frequencia)
+                     for caminho in caminhos)
+    return _com_frequencia(pd.concat([treino, teste]), frequencia), len(treino)
+
+def _carregar(tipo, caminhos, granularidade, assinatura):
+    with perfil.etapa("ler_conjunto", granularidade=granularidade, formato=tipo):
+        ler = _ler_binario if tipo == "binario" else _ler_csv
+        serie, corte = ler(caminhos, FREQUENCIAS.get(granularidade))
+    return {"assinatura": assinatura, "serie": serie, "corte": corte, "divisoes": {}}
+
+def _conjunto(pasta, granularidade):
+    """
+    Conjunto em cache da granularidade, relido se os arquivos mudaram; None se não estiver processada.
+    """
+    chave = (os.path.abspath(pasta), granularidade)
+    fonte = _fonte(pasta, granularidade)
+    assinatura = _assinatura(fonte[1]) if fonte else None
+    if assinatura is None:
+        _CONJUNTOS.pop(chave, None)
+        return None
+
+    conjunto = _CONJUNTOS.get(chave)
+    if conjunto is None or conjunto["assinatura"] != assinatura:
+        conjunto = _CONJUNTOS[chave] = _carregar(*fonte, granularidade, assinatura)
+    return conjunto
+
+def _copia_na_escrita():
+    import pandas as pd
+
+    return int(pd.__version__.split(".")[0]) >= 3 or pd.get_option("mode.copy_on_write") is True
+
+def _visao(df):
+    """
+    Entrega um DataFrame do cache sem expô-lo a alterações: com copy-on-write (padrão do pandas 3),
+    uma cópia rasa compartilha os dados e só os duplica se o chamador alterá-los; sem ele, uma cópia profunda.
+    """
+    return df.copy(deep=not _copia_na_escrita())
+
+@perfil.medir()
+def obter_serie(pasta=PASTA_DADOS, granularidade="mensal", inicio=None, fim=None):
+    """
+    Retorna uma janela da série completa de uma granularidade (posições `inicio` a `fim`, como em
+    uma fatia), como está nos arquivos e sem copiar os dados.
+
+    Returns:
+        DataFrame ou None: Colunas 'Preco_Medio' e 'Time_Index', indexadas pela data.
+    """
+    conjunto = _conjunto(pasta, granularidade)
+    if conjunto is None:
+        return None
+    return _visao(conjunto["serie"].iloc[inicio:fim])
+
+@perfil.medir()
+def obter_dados(pasta=PASTA_DADOS, granularidade="mensal", metodo_nan="interpolacao", fracao_treino=None):
+    """
+    Retorna os dados de treino e teste de uma granularidade, indexados pela data e com a frequência
+    da granularidade. A divisão é feita na leitura, como fatias da série sem cópia. Os arquivos são
+    lidos e as lacunas tratadas uma única vez por processo; as chamadas seguintes reaproveitam o
+    resultado enquanto o tamanho e o mtime dos arquivos não mudarem.
+
+    Os DataFrames retornados são visões independentes do cache: alterá-los (inclusive com
+    `inplace=True`) não afeta o que é entregue às próximas chamadas.
+
+    Args:
+        pasta (str): Diretório dos dados processados.
+        granularidade (str): Granularidade (diaria, semanal, mensal).
+        metodo_nan (str): Tratamento dos valores ausentes ('interpolacao', 'ffill' ou 'drop'; ver
+            `helpers.tratar_nans`), aplicado a treino e teste separadamente. Se None, os dados são
+            entregues como estão nos arquivos.
+        fracao_treino (float): Fração inicial da série usada como treino. Se None, usa a divisão
+            gravada no processamento (80/20).
+
+    Returns:
+        tuple: DataFrames de treino e teste, ou (None, None) se a granularidade não estiver processada.
+    """
+    import helpers as helper
+
+    conjunto = _conjunto(pasta, granularidade)
+    if conjunto is None:
+        return None, None
+
+    serie = conjunto["serie"]
+    corte = conjunto["corte"] if fracao_treino is None else calcular_corte(len(serie), fracao_treino)
+    chave = (corte, metodo_nan)
+    if chave not in conjunto["divisoes"]:
+        dados = (serie.iloc[:corte], serie.iloc[corte:])
+        if metodo_nan is not None:
+            dados = tuple(helper.tratar_nans(*dados, metodo=metodo_nan))
+        conjunto["divisoes"][chave] = dados
+    return tuple(_visao(df) for df in conjunto["divisoes"][chave])
+
+def invalidar(pasta=None):
+    """
+    Descarta os conjuntos em memória (de uma pasta ou de todas), forçando a releitura dos arquivos.
+    """
+    if pasta is None:
+        _CONJUNTOS.clear()
+        return
+    raiz = os.path.abspath(pasta)
+    for chave in [chave for chave in _CONJUNTOS if chave[0] == raiz]:
+        del _CONJUNTOS[chave]
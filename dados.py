@@ -2,8 +2,285 @@ import pandas as pd
 import glob
 import numpy as np
 import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+import cache_dados
+import conjuntos_dados
 
-def carregar_dados(caminho_arquivos="../data/ca-*.csv", pasta="dados_processados"):
+# Somente as colunas usadas no processamento são lidas dos arquivos da ANP
+COLUNAS_NECESSARIAS = ["Produto", "Data da Coleta", "Valor de Venda"]
+TIPOS_COLUNAS = {
+    "Produto": "category",
+    "Data da Coleta": "str",
+    "Valor de Venda": "float64"
+}
+FORMATO_DATA = "%d/%m/%Y"
+
+# Granularidades geradas e suas frequências no pandas
+GRANULARIDADES = {
+    "mensal": "ME",
+    "semanal": "W",
+    "diaria": "D"
+}
+ARQUIVO_ACUMULADO = "acumulado_diario.npz"
+TAMANHO_BLOCO = 200_000
+
+def ler_blocos(arquivo, produto="GASOLINA", tamanho_bloco=TAMANHO_BLOCO):
+    """
+    Lê um arquivo ca-*.csv em blocos de linhas, apenas com as colunas necessárias, e devolve
+    as linhas do produto já filtradas, com datas e preços convertidos.
+
+    Args:
+        arquivo (str): Caminho do arquivo CSV.
+        produto (str): Produto a ser mantido.
+        tamanho_bloco (int): Número de linhas lidas por bloco.
+
+    Yields:
+        DataFrame: Bloco compacto com as colunas 'Data da Coleta' e 'Valor de Venda'.
+    """
+    with pd.read_csv(
+        arquivo,
+        delimiter=';',
+        usecols=COLUNAS_NECESSARIAS,
+        dtype=TIPOS_COLUNAS,
+        decimal=',',
+        chunksize=tamanho_bloco
+    ) as leitor:
+        for bloco in leitor:
+            bloco = bloco.loc[bloco['Produto'] == produto, ['Data da Coleta', 'Valor de Venda']]
+            bloco['Data da Coleta'] = pd.to_datetime(bloco['Data da Coleta'], format=FORMATO_DATA, errors='coerce')
+            yield bloco
+
+def reduzir_diario(df):
+    """
+    Reduz as linhas de preço a pares (soma, contagem) por dia, ignorando datas e valores inválidos.
+
+    Args:
+        df (DataFrame): Linhas com as colunas 'Data da Coleta' e 'Valor de Venda'.
+
+    Returns:
+        DataFrame: Colunas 'Dia', 'Soma' e 'Contagem', uma linha por dia com coleta.
+    """
+    dias = df['Data da Coleta'].to_numpy(dtype='datetime64[ns]').astype('datetime64[D]')
+    valores = df['Valor de Venda'].to_numpy(dtype='float64')
+    validos = ~np.isnat(dias) & ~np.isnan(valores)
+
+    dias_unicos, inverso = np.unique(dias[validos], return_inverse=True)
+    return pd.DataFrame({
+        'Dia': dias_unicos.astype('datetime64[ns]'),
+        'Soma': np.bincount(inverso, weights=valores[validos], minlength=len(dias_unicos)),
+        'Contagem': np.bincount(inverso, minlength=len(dias_unicos)).astype('int64')
+    })
+
+def somar_diarios(diarios):
+    """
+    Soma vários conjuntos de pares (soma, contagem) diários em um único conjunto, ordenado por dia.
+    """
+    diario = pd.concat(diarios, ignore_index=True)
+    return diario.groupby('Dia', as_index=False)[['Soma', 'Contagem']].sum()
+
+def reduzir_arquivo(arquivo, produto="GASOLINA", tamanho_bloco=TAMANHO_BLOCO):
+    """
+    Reduz um arquivo ca-*.csv a pares (soma, contagem) por dia em uma única passada,
+    bloco a bloco, sem manter as linhas brutas em memória.
+
+    Args:
+        arquivo (str): Caminho do arquivo CSV.
+        produto (str): Produto a ser mantido.
+        tamanho_bloco (int): Número de linhas lidas por bloco.
+
+    Returns:
+        tuple: DataFrame diário ('Dia', 'Soma', 'Contagem'), número de linhas do produto e tempo em segundos.
+    """
+    inicio = time.perf_counter()
+
+    diario = reduzir_diario(pd.DataFrame({
+        'Data da Coleta': pd.Series(dtype='datetime64[ns]'),
+        'Valor de Venda': pd.Series(dtype='float64')
+    }))
+    linhas = 0
+    for bloco in ler_blocos(arquivo, produto, tamanho_bloco):
+        linhas += len(bloco)
+        diario = somar_diarios([diario, reduzir_diario(bloco)])
+
+    return diario, linhas, time.perf_counter() - inicio
+
+def reduzir_arquivos(arquivos, n_processos=None, tamanho_bloco=TAMANHO_BLOCO):
+    """
+    Reduz os arquivos CSV a pares diários em paralelo (um arquivo por processo) e exibe o tempo de cada um.
+
+    Args:
+        arquivos (list): Caminhos dos arquivos CSV.
+        n_processos (int): Número de processos. None usa um por núcleo; 1 lê em série.
+        tamanho_bloco (int): Número de linhas lidas por bloco em cada arquivo.
+
+    Returns:
+        list: DataFrames diários, na mesma ordem de `arquivos`.
+    """
+    tarefa = partial(reduzir_arquivo, tamanho_bloco=tamanho_bloco)
+
+    diarios = []
+    for arquivo, (diario, linhas, segundos) in zip(arquivos, mapear_arquivos(tarefa, arquivos, n_processos)):
+        print(f"⏱️ {os.path.basename(arquivo)}: {linhas} linhas ({len(diario)} dias) em {segundos:.2f}s")
+        diarios.append(diario)
+    return diarios
+
+def mapear_arquivos(tarefa, arquivos, n_processos=None):
+    """
+    Aplica `tarefa` a cada arquivo, um arquivo por processo.
+
+    Args:
+        tarefa (callable): Função de nível de módulo que recebe o caminho de um arquivo.
+        arquivos (list): Caminhos dos arquivos.
+        n_processos (int): Número de processos. None usa um por núcleo; 1 executa em série.
+
+    Returns:
+        list: Resultados, na mesma ordem de `arquivos`.
+    """
+    if n_processos is None:
+        n_processos = os.cpu_count() or 1
+    n_processos = max(1, min(n_processos, len(arquivos)))
+
+    if n_processos == 1:
+        return [tarefa(arquivo) for arquivo in arquivos]
+
+    with ProcessPoolExecutor(max_workers=n_processos) as executor:
+        return list(executor.map(tarefa, arquivos))
+
+def reduzir_arquivos_com_cache(fontes, n_processos=None, pasta_cache=cache_dados.PASTA_CACHE):
+    """
+    Obtém os pares diários de cada arquivo usando o cache: arquivos inalterados são carregados
+    do cache e somente os arquivos novos ou modificados são lidos novamente.
+
+    Args:
+        fontes (list): Fontes identificadas com `cache_dados.identificar_fontes`.
+        n_processos (int): Número de processos usados na leitura dos arquivos fora do cache.
+        pasta_cache (str): Diretório do cache.
+
+    Returns:
+        list: DataFrames diários, na mesma ordem de `fontes`.
+    """
+    diarios = [cache_dados.ler_cache(fonte["hash"], pasta_cache=pasta_cache) for fonte in fontes]
+    pendentes = [i for i, diario in enumerate(diarios) if diario is None]
+    print(f"📦 {len(fontes) - len(pendentes)} arquivos carregados do cache, {len(pendentes)} para ler.")
+
+    if pendentes:
+        lidos = reduzir_arquivos([fontes[i]["caminho"] for i in pendentes], n_processos)
+        for i, diario in zip(pendentes, lidos):
+            cache_dados.gravar_cache(fontes[i]["hash"], diario, pasta_cache=pasta_cache)
+            diarios[i] = diario
+
+    return diarios
+
+def carregar_acumulado(pasta="dados_processados"):
+    """
+    Carrega os acumulados diários (soma e contagem de 'Valor de Venda') de cada arquivo de origem.
+
+    Returns:
+        dict: Caminho do arquivo de origem -> {'hash': str, 'diario': DataFrame}, ou None se não existir.
+    """
+    caminho = os.path.join(pasta, ARQUIVO_ACUMULADO)
+    if not os.path.exists(caminho):
+        return None
+
+    with np.load(caminho) as dados:
+        caminhos, hashes = dados['caminhos'], dados['hashes']
+        fonte = dados['fonte']
+        diario = pd.DataFrame({'Dia': dados['dia'], 'Soma': dados['soma'], 'Contagem': dados['contagem']})
+
+    acumulado = {}
+    for i, (caminho_fonte, hash_fonte) in enumerate(zip(caminhos, hashes)):
+        acumulado[str(caminho_fonte)] = {
+            'hash': str(hash_fonte),
+            'diario': diario[fonte == i].reset_index(drop=True)
+        }
+    return acumulado
+
+def salvar_acumulado(acumulado, pasta="dados_processados"):
+    """
+    Salva os acumulados diários por arquivo de origem em um único arquivo .npz.
+    """
+    os.makedirs(pasta, exist_ok=True)
+    caminhos = sorted(acumulado)
+    diarios = [acumulado[caminho]['diario'] for caminho in caminhos]
+    diario = pd.concat(diarios, ignore_index=True)
+
+    caminho = os.path.join(pasta, ARQUIVO_ACUMULADO)
+    temporario = f"{caminho}.{os.getpid()}.tmp.npz"
+    np.savez(
+        temporario,
+        caminhos=np.array(caminhos, dtype=str),
+        hashes=np.array([acumulado[c]['hash'] for c in caminhos], dtype=str),
+        fonte=np.repeat(np.arange(len(caminhos)), [len(d) for d in diarios]).astype('int32'),
+        dia=diario['Dia'].to_numpy(dtype='datetime64[ns]'),
+        soma=diario['Soma'].to_numpy(dtype='float64'),
+        contagem=diario['Contagem'].to_numpy(dtype='int64')
+    )
+    os.replace(temporario, caminho)
+
+def processar_granularidade(diario, frequencia, nome, pasta_destino):
+    """
+    Calcula a média de preço na frequência especificada a partir dos acumulados diários e salva a
+    série completa uma única vez (ver `conjuntos_dados.salvar_serie`). A divisão em treino (80%) e
+    teste (20%) é apenas a padrão: a leitura pode escolher outra.
+
+    Args:
+        diario (DataFrame): Soma e contagem por dia, indexados pela data.
+        frequencia (str): Frequência do pandas ('ME', 'W' ou 'D').
+        nome (str): Nome da granularidade.
+        pasta_destino (str): Diretório onde os arquivos serão salvos.
+
+    Returns:
+        tuple: DataFrames de treino e teste.
+    """
+    # Média no período = soma dos preços / número de coletas
+    agregado = diario.resample(frequencia).sum()
+    media = agregado['Soma'] / agregado['Contagem'].where(agregado['Contagem'] > 0)
+    df_resample = media.rename_axis('Data').reset_index()
+    df_resample.columns = ['Data', 'Preco_Medio']
+
+    # Salvar a série na pasta especificada
+    metadados = conjuntos_dados.salvar_serie(df_resample['Data'], df_resample['Preco_Medio'], nome, pasta_destino)
+
+    # Dividir em treino (80%) e teste (20%)
+    train_size = metadados['corte']
+    train_data = df_resample[:train_size].copy()
+    test_data = df_resample[train_size:].copy()
+
+    # Adicionar a coluna de índice temporal
+    train_data['Time_Index'] = np.arange(len(train_data))
+    test_data['Time_Index'] = np.arange(len(train_data), len(df_resample))
+
+    print(f"Granularidade {nome} processada e salva em {pasta_destino}")
+    return train_data, test_data
+
+def gerar_granularidades(acumulado, pasta="dados_processados"):
+    """
+    Soma os acumulados diários de todas as fontes e gera as granularidades mensal, semanal e diária.
+
+    Returns:
+        dict: Dicionário contendo os DataFrames de treino e teste para cada granularidade.
+    """
+    pasta_destino = f"./{pasta}"
+    os.makedirs(pasta_destino, exist_ok=True)
+
+    diario = somar_diarios([item['diario'] for item in acumulado.values()]).set_index('Dia')
+
+    resultados = {}
+    for nome, freq in GRANULARIDADES.items():
+        resultados[nome] = processar_granularidade(diario, freq, nome, pasta_destino)
+
+    return resultados
+
+def listar_arquivos(caminho_arquivos):
+    arquivos = sorted(glob.glob(caminho_arquivos))
+    if not arquivos:
+        raise FileNotFoundError(f"Nenhum arquivo encontrado em '{caminho_arquivos}'.")
+    return arquivos
+
+def carregar_dados(caminho_arquivos="../data/ca-*.csv", pasta="dados_processados", n_processos=None,
+                   pasta_cache=cache_dados.PASTA_CACHE):
     """
     Carrega os dados, filtra gasolina e gera as granularidades mensal, semanal e diária,
     dividindo cada uma em conjuntos de treino e teste.
@@ -11,62 +288,69 @@ def carregar_dados(caminho_arquivos="../data/ca-*.csv", pasta="dados_processados
     Args:
         caminho_arquivos (str): Caminho dos arquivos CSV.
         pasta (str): Diretório onde os arquivos processados serão salvos.
+        n_processos (int): Número de processos usados na leitura (None = um por núcleo).
+        pasta_cache (str): Diretório do cache de acumulados diários por arquivo.
 
     Returns:
         dict: Dicionário contendo os DataFrames de treino e teste para cada granularidade.
     """
-    # Lista para armazenar cada DataFrame carregado
-    dataframes = []
-    for arquivo in glob.glob(caminho_arquivos):
-        # Carregar o arquivo CSV
-        df = pd.read_csv(arquivo, delimiter=';')
-        # Filtrar somente gasolina e colunas de interesse
-        df = df[df['Produto'] == 'GASOLINA'][['Data da Coleta', 'Valor de Venda']]
-        df['Data da Coleta'] = pd.to_datetime(df['Data da Coleta'], dayfirst=True, errors='coerce')
-        df['Valor de Venda'] = df['Valor de Venda'].str.replace(',', '.').astype(float)
-        dataframes.append(df)
-
-    # Concatenar todos os DataFrames
-    dados_completos = pd.concat(dataframes, ignore_index=True)
-
-    # Criar a pasta de destino, se não existir
-    pasta_destino = f"./{pasta}"
-    os.makedirs(pasta_destino, exist_ok=True)
+    arquivos = listar_arquivos(caminho_arquivos)
+    fontes = cache_dados.identificar_fontes(arquivos, pasta_cache)
+
+    # Reduzir cada arquivo a acumulados diários (cache ou um arquivo por processo, em blocos)
+    inicio = time.perf_counter()
+    diarios = reduzir_arquivos_com_cache(fontes, n_processos, pasta_cache)
+    print(f"✅ {len(arquivos)} arquivos carregados em {time.perf_counter() - inicio:.2f}s")
 
-    # Função auxiliar para calcular a média e dividir em treino e teste
-    def processar_granularidade(df, frequencia, nome):
-        # Agrupar por média na frequência especificada
-        df_resample = df.resample(frequencia, on='Data da Coleta')['Valor de Venda'].mean().reset_index()
-        df_resample.columns = ['Data', 'Preco_Medio']
-
-        # Dividir em treino (80%) e teste (20%)
-        train_size = int(len(df_resample) * 0.8)
-        train_data = df_resample[:train_size].copy()
-        test_data = df_resample[train_size:].copy()
-
-        # Adicionar a coluna de índice temporal
-        train_data['Time_Index'] = np.arange(len(train_data))
-        test_data['Time_Index'] = np.arange(len(train_data), len(df_resample))
-
-        # Salvar os arquivos na pasta especificada
-        train_data.to_csv(os.path.join(pasta_destino, f"train_data_{nome}.csv"), index=False)
-        test_data.to_csv(os.path.join(pasta_destino, f"test_data_{nome}.csv"), index=False)
-
-        print(f"Granularidade {nome} processada e salva em {pasta_destino}")
-        return train_data, test_data
-
-    # Gerar granularidades e salvar
-    granularidades = {
-        "mensal": "ME",
-        "semanal": "W",
-        "diaria": "D"
+    acumulado = {
+        fonte['caminho']: {'hash': fonte['hash'], 'diario': diario}
+        for fonte, diario in zip(fontes, diarios)
     }
+    salvar_acumulado(acumulado, pasta)
+    cache_dados.registrar_fontes(fontes, pasta_cache)
 
-    resultados = {}
-    for nome, freq in granularidades.items():
-        resultados[nome] = processar_granularidade(dados_completos, freq, nome)
+    return gerar_granularidades(acumulado, pasta)
 
-    return resultados
+def atualizar_dados(caminho_arquivos="../data/ca-*.csv", pasta="dados_processados", n_processos=None,
+                    pasta_cache=cache_dados.PASTA_CACHE):
+    """
+    Atualiza os dados processados de forma incremental: somente arquivos novos ou modificados
+    são lidos e incorporados aos acumulados diários; arquivos removidos deixam de contribuir.
+    As granularidades são recalculadas a partir dos acumulados, sem reler o histórico.
+
+    Args:
+        caminho_arquivos (str): Caminho dos arquivos CSV.
+        pasta (str): Diretório dos dados processados.
+        n_processos (int): Número de processos usados na leitura (None = um por núcleo).
+        pasta_cache (str): Diretório do cache de acumulados diários por arquivo.
+
+    Returns:
+        dict: Dicionário contendo os DataFrames de treino e teste para cada granularidade.
+    """
+    acumulado = carregar_acumulado(pasta)
+    if acumulado is None:
+        print("⚠️ Acumulados diários não encontrados. Processando todos os arquivos...")
+        return carregar_dados(caminho_arquivos, pasta, n_processos, pasta_cache)
+
+    arquivos = listar_arquivos(caminho_arquivos)
+    fontes = cache_dados.identificar_fontes(arquivos, pasta_cache)
+
+    removidas = set(acumulado) - {fonte['caminho'] for fonte in fontes}
+    for caminho in removidas:
+        del acumulado[caminho]
+
+    novas = [fonte for fonte in fontes if acumulado.get(fonte['caminho'], {}).get('hash') != fonte['hash']]
+    print(f"🔄 {len(novas)} arquivos novos ou alterados, {len(removidas)} removidos.")
+
+    inicio = time.perf_counter()
+    for fonte, diario in zip(novas, reduzir_arquivos_com_cache(novas, n_processos, pasta_cache)):
+        acumulado[fonte['caminho']] = {'hash': fonte['hash'], 'diario': diario}
+    print(f"✅ Acumulados atualizados em {time.perf_counter() - inicio:.2f}s")
+
+    salvar_acumulado(acumulado, pasta)
+    cache_dados.registrar_fontes(fontes, pasta_cache)
+
+    return gerar_granularidades(acumulado, pasta)
 
 # Caminho dos arquivos CSV (ajuste para o caminho correto)
 #caminho_arquivos = "../data/ca-*.csv"
@@ -0,0 +1,396 @@
+# diagnosticos.py
+import hashlib
+import os
+import numpy as np
+
+PASTA_CACHE = "cache_diagnosticos"
+LAGS_PADRAO = 40
+Z_95 = 1.959963984540054
+
+def impressao_valores(valores):
+    """
+    Calcula a impressão digital (SHA-256) dos valores de uma série, sem o índice:
+    a mesma série lida pela EDA ou pelos modelos compartilha os correlogramas do cache.
+    """
+    return hashlib.sha256(np.ascontiguousarray(np.asarray(valores, dtype="float64")).tobytes()).hexdigest()
+
+# Período sazonal usado pelo SARIMA em cada granularidade
+SAZONALIDADES = {"diaria": 7, "semanal": 52, "mensal": 12}
+
+def lags_correlograma(granularidade=None, periodo=None):
+    """
+    Número de defasagens dos correlogramas de uma granularidade: o mesmo para a EDA e para as
+    sugestões de ordens do ARIMA e do SARIMA, para que todos compartilhem a entrada do cache.
+    """
+    return max(LAGS_PADRAO, periodo or SAZONALIDADES.get(granularidade, 0))
+
+def limitar_lags(n_observacoes, nlags=LAGS_PADRAO):
+    """
+    Limita o número de defasagens a menos da metade da série (exigência da PACF).
+    """
+    return max(0, min(nlags, n_observacoes // 2 - 1))
+
+def acf_fft(valores, nlags=LAGS_PADRAO):
+    """
+    Autocorrelação amostral pela FFT, em O(n log n): a autocovariância é a transformada inversa
+    do periodograma da série centrada, preenchida com zeros para evitar a correlação circular.
+    Equivale a `statsmodels.tsa.stattools.acf(x, nlags, fft=True)`.
+
+    Returns:
+        ndarray: Autocorrelações das defasagens 0..nlags.
+    """
+    x = np.asarray(valores, dtype="float64")
+    n = len(x)
+    x = x - x.mean()
+    tamanho = 1 << (2 * n - 1).bit_length()
+    espectro = np.fft.rfft(x, tamanho)
+    autocovariancia = np.fft.irfft(espectro * np.conj(espectro), tamanho)[:nlags + 1] / n
+    if autocovariancia[0] <= 0:
+        # Série constante: sem autocorrelação definida
+        return np.r_[1.0, np.zeros(nlags)]
+    return autocovariancia / autocovariancia[0]
+
+def pacf_levinson(acf, nlags=None):
+    """
+    Autocorrelação parcial pela recursão de Levinson–Durbin sobre as autocorrelações já calculadas,
+    em O(nlags²), sem novos ajustes. Equivale a `statsmodels.tsa.stattools.pacf(x, nlags, method="ywm")`.
+
+    Returns:
+        ndarray: Autocorrelações parciais das defasagens 0..nlags.
+    """
+    nlags = len(acf) - 1 if nlags is None else nlags
+    pacf = np.zeros(nlags + 1)
+    pacf[0] = 1.0
+    phi = np.zeros(0)
+    variancia = 1.0
+    for k in range(1, nlags + 1):
+        phi_kk = (acf[k] - phi @ acf[k - 1:0:-1]) / variancia if variancia > 0 else 0.0
+        phi = np.r_[phi - phi_kk * phi[::-1], phi_kk]
+        variancia *= 1 - phi_kk ** 2
+        pacf[k] = phi_kk
+    return pacf
+
+def calcular_correlogramas(valores, nlags=LAGS_PADRAO):
+    """
+    Calcula ACF e PACF de uma série e seus limites de significância de 95%
+    (Bartlett para a ACF, 1/√n para a PACF), com as defasagens limitadas ao tamanho da série.
+
+    Returns:
+        dict: 'acf', 'pacf', 'limite_acf', 'limite_pacf' (arrays das defasagens 0..nlags) e 'n'.
+    """
+    x = np.asarray(valores, dtype="float64")
+    x = x[np.isfinite(x)]
+    n = len(x)
+    nlags = limitar_lags(n, nlags)
+    acf = acf_fft(x, nlags)
+    pacf = pacf_levinson(acf, nlags)
+
+    variancia_acf = np.ones(nlags + 1)
+    variancia_acf[2:] = 1 + 2 * np.cumsum(acf[1:-1] ** 2)
+    limite_acf = Z_95 * np.sqrt(variancia_acf / n)
+    limite_acf[0] = 0.0
+    limite_pacf = np.full(nlags + 1, Z_95 / np.sqrt(n))
+    limite_pacf[0] = 0.0
+    return {"acf": acf, "pacf": pacf, "limite_acf": limite_acf, "limite_pacf": limite_pacf, "n": n}
+
+def correlogramas(serie, nlags=LAGS_PADRAO, pasta_cache=PASTA_CACHE):
+    """
+    Retorna os correlogramas de uma série, calculados uma única vez: o resultado fica em cache
+    pela impressão dos valores e é reutilizado pelos gráficos da EDA e pelas sugestões de ordens.
+
+    Args:
+        serie (Series ou array): Valores da série.
+        nlags (int): Número máximo de defasagens.
+        pasta_cache (str): Diretório do cache (None desativa o cache).
+
+    Returns:
+        dict: Ver `calcular_correlogramas`.
+    """
+    valores = np.asarray(serie, dtype="float64")
+    if pasta_cache is None:
+        return calcular_correlogramas(valores, nlags)
+
+    caminho = os.path.join(pasta_cache, f"{impressao_valores(valores)[:32]}_{nlags}.npz")
+    try:
+        with np.load(caminho) as entrada:
+            return {**{chave: entrada[chave] for chave in ("acf", "pacf", "limite_acf", "limite_pacf")},
+                    "n": int(entrada["n"])}
+    except (OSError, KeyError, ValueError):
+        pass
+
+    resultado = calcular_correlogramas(valores, nlags)
+    os.makedirs(pasta_cache, exist_ok=True)
+    temporario = f"{caminho}.{os.getpid()}.tmp.npz"
+    np.savez(temporario, **resultado)
+    os.replace(temporario, caminho)
+    return resultado
+
+def sugerir_ordens(correlograma, max_p=2, max_q=2, periodo=None):
+    """
+    Sugere ordens a partir dos correlogramas: p é a última defasagem significativa da PACF e q a
+    da ACF, até os limites da grade; P e Q valem 1 se a PACF/ACF for significativa no período sazonal.
+
+    Returns:
+        dict: 'p', 'q', 'P' e 'Q'.
+    """
+    def ultima_significativa(valores, limites, maximo):
+        significativas = np.flatnonzero(np.abs(valores[1:maximo + 1]) > limites[1:maximo + 1])
+        return int(significativas[-1] + 1) if significativas.size else 0
+
+    acf, pacf = correlograma["acf"], correlograma["pacf"]
+    sugestao = {
+        "p": ultima_significativa(pacf, correlograma["limite_pacf"], max_p),
+        "q": ultima_significativa(acf, correlograma["limite_acf"], max_q),
+        "P": 0,
+        "Q": 0
+    }
+    if periodo is not None and periodo < len(acf):
+        sugestao["P"] = int(abs(pacf[periodo]) > correlograma["limite_pacf"][periodo])
+        sugestao["Q"] = int(abs(acf[periodo]) > correlograma["limite_acf"][periodo])
+    return sugestao
+
+# --- Índice de diagnósticos por série processada ---
+
+PASTA_INDICE = "dados_processados"
+VERSAO_INDICE = 2
+MAX_DIFERENCAS = 2
+# Períodos sazonais avaliados por granularidade (incluem o período usado pelo SARIMA)
+PERIODOS_CANDIDATOS = {"diaria": [7, 30, 365], "semanal": [4, 13, 52], "mensal": [3, 6, 12]}
+# Força sazonal acima da qual a diferença sazonal é considerada (mesmo critério do auto.arima)
+LIMITE_FORCA_SAZONAL = 0.64
+N_PICOS = 5
+
+def testar_estacionariedade(valores, nivel_significancia=0.05):
+    """
+    Executa os testes ADF (H0: raiz unitária) e KPSS (H0: estacionária) em uma série sem lacunas.
+
+    Returns:
+        dict: Estatísticas e p-valores dos testes e 'estacionaria' (True se os dois testes concordam).
+    """
+    import warnings
+    from statsmodels.tsa.stattools import adfuller, kpss
+
+    x = np.asarray(valores, dtype="float64")
+    if len(x) < 8 or np.ptp(x) == 0:
+        return {"adf_estatistica": None, "adf_p": None, "kpss_estatistica": None, "kpss_p": None,
+                "estacionaria": bool(len(x) and np.ptp(x) == 0)}
+
+    # Avisos do statsmodels: p-valor fora da tabela do KPSS e mudança futura no retorno dos testes
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        adf_estatistica, adf_p, *_ = adfuller(x)
+        try:
+            kpss_estatistica, kpss_p, *_ = kpss(x, nlags="auto")
+        except ValueError:
+            kpss_estatistica, kpss_p = None, None
+
+    return {
+        "adf_estatistica": float(adf_estatistica),
+        "adf_p": float(adf_p),
+        "kpss_estatistica": None if kpss_estatistica is None else float(kpss_estatistica),
+        "kpss_p": None if kpss_p is None else float(kpss_p),
+        "estacionaria": bool(adf_p < nivel_significancia and kpss_p is not None and kpss_p > nivel_significancia)
+    }
+
+def estatisticas_lacunas(valores):
+    """
+    Conta os períodos sem coleta (NaN após a regularização da frequência) e suas sequências.
+    """
+    ausentes = np.isnan(np.asarray(valores, dtype="float64"))
+    bordas = np.diff(np.r_[0, ausentes.astype(np.int8), 0])
+    comprimentos = np.flatnonzero(bordas == -1) - np.flatnonzero(bordas == 1)
+    return {
+        "ausentes": int(ausentes.sum()),
+        "fracao": float(ausentes.mean()) if len(ausentes) else 0.0,
+        "sequencias": int(len(comprimentos)),
+        "maior_sequencia": int(comprimentos.max()) if len(comprimentos) else 0
+    }
+
+def forca_sazonal(serie, periodo):
+    """
+    Força da sazonalidade (Wang, Smith & Hyndman): max(0, 1 - Var(resíduo) / Var(sazonal + resíduo))
+    da decomposição aditiva com o período dado. None se a série tiver menos de dois ciclos.
+    """
+    from statsmodels.tsa.seasonal import seasonal_decompose
+
+    if len(serie) < 2 * periodo:
+        return None
+    decomposicao = seasonal_decompose(np.asarray(serie, dtype="float64"), model="additive", period=periodo)
+    residuo = decomposicao.resid
+    validos = np.isfinite(residuo)
+    variancia = np.var(decomposicao.seasonal[validos] + residuo[validos])
+    if variancia <= 0:
+        return 0.0
+    return float(max(0.0, 1 - np.var(residuo[validos]) / variancia))
+
+def _picos(valores, limites):
+    significativos = np.flatnonzero(np.abs(valores[1:]) > limites[1:]) + 1
+    ordem = significativos[np.argsort(-np.abs(valores[significativos]), kind="stable")][:N_PICOS]
+    return [[int(lag), round(float(valores[lag]), 4)] for lag in ordem]
+
+def construir_indice(serie, granularidade, origem=None, impressao=None):
+    """
+    Calcula o índice de diagnósticos de uma série processada: lacunas, testes de estacionariedade e
+    picos de ACF/PACF para cada nível de diferenciação (0..MAX_DIFERENCAS) e força sazonal de cada
+    período candidato.
+
+    Args:
+        serie (Series): Série com frequência regular (lacunas como NaN).
+        granularidade (str): Granularidade da série.
+        origem (dict): Identificação do arquivo de origem (tamanho e mtime), para invalidação.
+        impressao (str): Impressão digital da série (`cache_modelos.impressao_serie`), para invalidação.
+
+    Returns:
+        dict: Índice de diagnósticos (serializável em JSON).
+    """
+    valores = np.asarray(serie, dtype="float64")
+    nivel = serie.interpolate(limit_direction="both").to_numpy(dtype="float64")
+    nivel = nivel[np.isfinite(nivel)]
+    periodos = PERIODOS_CANDIDATOS.get(granularidade, [])
+
+    indice = {
+        "versao": VERSAO_INDICE,
+        "granularidade": granularidade,
+        "origem": origem,
+        "impressao": impressao,
+        "n": int(len(valores)),
+        "lacunas": estatisticas_lacunas(valores),
+        "diferencas": {},
+        "sazonalidade": {}
+    }
+
+    diferenciada = nivel
+    for d in range(MAX_DIFERENCAS + 1):
+        if d:
+            diferenciada = np.diff(diferenciada)
+        correlograma = correlogramas(diferenciada, max([LAGS_PADRAO, *periodos]), pasta_cache=None)
+        indice["diferencas"][str(d)] = {
+            **testar_estacionariedade(diferenciada),
+            "picos_acf": _picos(correlograma["acf"], correlograma["limite_acf"]),
+            "picos_pacf": _picos(correlograma["pacf"], correlograma["limite_pacf"]),
+            "sazonal": {
+                str(periodo): {
+                    "acf": round(float(correlograma["acf"][periodo]), 4),
+                    "pacf": round(float(correlograma["pacf"][periodo]), 4),
+                    "significativo": bool(abs(correlograma["acf"][periodo]) > correlograma["limite_acf"][periodo]
+                                          or abs(correlograma["pacf"][periodo]) > correlograma["limite_pacf"][periodo])
+                }
+                for periodo in periodos if periodo < len(correlograma["acf"])
+            }
+        }
+
+    for periodo in periodos:
+        forca = forca_sazonal(nivel, periodo)
+        indice["sazonalidade"][str(periodo)] = {"forca": None if forca is None else round(forca, 4)}
+
+    estacionarias = [d for d in range(MAX_DIFERENCAS + 1) if indice["diferencas"][str(d)]["estacionaria"]]
+    indice["d_minimo"] = estacionarias[0] if estacionarias else None
+    return indice
+
+def _caminho_indice(granularidade, pasta):
+    return os.path.join(pasta, f"diagnosticos_{granularidade}.json")
+
+def carregar_indice(granularidade, pasta=PASTA_INDICE, serie=None):
+    """
+    Retorna o índice de diagnósticos de uma granularidade, salvo ao lado dos dados processados
+    (`diagnosticos_<granularidade>.json`) e calculado apenas quando a série muda.
+
+    Args:
+        granularidade (str): Granularidade da série.
+        pasta (str): Diretório dos dados processados.
+        serie (Series): Série de treino que será ajustada. O índice salvo só é reaproveitado se tiver
+            sido calculado para ela (mesma impressão digital); caso contrário, é recalculado a partir
+            dela. Se None, usa o treino da divisão padrão, como está nos arquivos.
+
+    Returns:
+        dict ou None: Índice de diagnósticos, ou None se a granularidade não estiver processada.
+    """
+    import json
+    import cache_modelos
+    import conjuntos_dados
+
+    origem = conjuntos_dados.origem(pasta, granularidade)
+    if origem is None:
+        return None
+    if serie is None:
+        treino, _ = conjuntos_dados.obter_dados(pasta, granularidade, metodo_nan=None)
+        if treino is None:
+            return None
+        serie = treino["Preco_Medio"]
+    impressao = cache_modelos.impressao_serie(serie)
+
+    caminho = _caminho_indice(granularidade, pasta)
+    try:
+        with open(caminho, encoding="utf-8") as f:
+            indice = json.load(f)
+        if indice.get("versao") == VERSAO_INDICE and indice.get("impressao") == impressao:
+            return indice
+    except (OSError, ValueError):
+        pass
+
+    indice = construir_indice(serie, granularidade, origem, impressao)
+
+    temporario = f"{caminho}.{os.getpid()}.tmp"
+    with open(temporario, "w", encoding="utf-8") as f:
+        json.dump(indice, f, ensure_ascii=False, indent=2)
+    os.replace(temporario, caminho)
+    return indice
+
+def podar_candidatos(candidatos, indice, diferencas_previas=0, periodo=None):
+    """
+    Remove da grade os candidatos descartados pelo índice de diagnósticos:
+    - d (somado às diferenças já aplicadas na série) em que os dois testes rejeitam a estacionariedade
+      (subdiferenciação) ou em que a série com uma diferença a menos já é estacionária pelos dois testes
+      (sobrediferenciação);
+    - D = 1 quando a força sazonal do período é conhecida e não passa de LIMITE_FORCA_SAZONAL;
+    - P, Q > 0 quando, além disso, ACF e PACF não são significativas na defasagem sazonal.
+    Se uma regra descartaria todos os candidatos, ela não é aplicada.
+
+    Args:
+        candidatos (list): Pares (ordem, ordem_sazonal) da grade.
+        indice (dict): Índice de diagnósticos da série.
+        diferencas_previas (int): Diferenças já aplicadas à série antes da busca.
+        periodo (int): Período sazonal do modelo (None para ARIMA).
+
+    Returns:
+        tuple: Candidatos mantidos e a lista com o motivo de cada descarte.
+    """
+    diferencas = indice["diferencas"]
+
+    def nao_estacionaria(total):
+        teste = diferencas.get(str(total))
+        return (teste is not None and teste["adf_p"] is not None and teste["kpss_p"] is not None
+                and teste["adf_p"] >= 0.05 and teste["kpss_p"] <= 0.05)
+
+    def estacionaria(total):
+        teste = diferencas.get(str(total))
+        return teste is not None and teste["estacionaria"]
+
+    regras = []
+    niveis_d = sorted({ordem[1] for ordem, _ in candidatos})
+    descartados_d = {}
+    for d in niveis_d:
+        total = diferencas_previas + d
+        if nao_estacionaria(total):
+            descartados_d[d] = f"d={d}: série ainda não estacionária com {total} diferença(s) (ADF e KPSS)"
+        elif total > 0 and estacionaria(total - 1):
+            descartados_d[d] = f"d={d}: série já estacionária com {total - 1} diferença(s) (sobrediferenciação)"
+    regras.append((lambda c: c[0][1] not in descartados_d, list(descartados_d.values())))
+
+    if periodo is not None:
+        forca = indice["sazonalidade"].get(str(periodo), {}).get("forca")
+        if forca is not None and forca <= LIMITE_FORCA_SAZONAL:
+            regras.append((lambda c: c[1][1] == 0,
+                           [f"D=1: força sazonal {forca:.2f} ≤ {LIMITE_FORCA_SAZONAL} no período {periodo}"]))
+            sazonal = diferencas.get(str(diferencas_previas), {}).get("sazonal", {}).get(str(periodo))
+            if sazonal is not None and not sazonal["significativo"]:
+                regras.append((lambda c: c[1][0] == 0 and c[1][2] == 0,
+                               [f"P, Q > 0: ACF/PACF não significativas na defasagem {periodo}"]))
+
+    motivos = []
+    for manter, descricao in regras:
+        restantes = [candidato for candidato in candidatos if manter(candidato)]
+        if restantes and len(restantes) < len(candidatos):
+            candidatos = restantes
+            motivos.extend(descricao)
+    return candidatos, motivos
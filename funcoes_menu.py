@@ -1,8 +1,5 @@
-import modelos as model
-import visualizacao as vlz
-import pandas as pd
-import os
-
+# Os módulos dos modelos (statsmodels, Prophet) e de visualização (matplotlib, seaborn) são
+# importados apenas pela ação do menu que os usa, para que o menu abra sem carregá-los
 # Mapear índices aos nomes dos modelos
 modelos_disponiveis = {
     "1": "ARIMA",
@@ -25,10 +22,18 @@ def selecionar_granularidade():
     escolha = input("Escolha a granularidade (1-3): ")
     return granularidades_disponiveis.get(escolha, "mensal")
 
+# Níveis de agregação do painel de preços
+niveis_painel = {
+    "1": "nacional",
+    "2": "estado",
+    "3": "municipio"
+}
+
 # Função para executar um modelo específico com granularidade
 def executar_modelo_especifico(indice_modelo):
     granularidade = selecionar_granularidade()  # Pergunta a granularidade ao usuário
-    
+    import modelos as model
+
     if indice_modelo == "1":
         model.executar_arima(granularidade=granularidade)
     elif indice_modelo == "2":
@@ -46,6 +51,8 @@ def menu_interativo(nome_pasta_metricas="metricas", nome_pasta_test_data="dados_
         print("2. Executar Análise Exploratória (EDA)")
         print("3. Exibir todas as métricas de um modelo específico")
         print("4. Comparar desempenho entre os modelos")
+        print("5. Gerar painel de preços por produto e região")
+        print("6. Executar backtest de um modelo (origem móvel)")
         print("Z. Sair")
 
         escolha = input("Escolha uma opção: ")
@@ -59,6 +66,7 @@ def menu_interativo(nome_pasta_metricas="metricas", nome_pasta_test_data="dados_
 
         elif escolha == "2":
             print("\n🔎 Executando Análise Exploratória (EDA)...")
+            import visualizacao as vlz
             vlz.executar_eda()
             print("\n✅ EDA concluída com sucesso.")
 
@@ -71,15 +79,39 @@ def menu_interativo(nome_pasta_metricas="metricas", nome_pasta_test_data="dados_
 
             if nome_modelo:
                 print(f"\n📊 Exibindo todas as métricas para '{nome_modelo}'...")
+                import visualizacao as vlz
                 vlz.exibir_todas_as_metricas(nome_modelo)
             else:
                 print("❌ Índice inválido. Tente novamente.")
 
         elif escolha == "4":
             print("\n🔍 Gerando análise comparativa entre os modelos...")
+            import visualizacao as vlz
             vlz.comparar_modelos()
             print("\n✅ Comparação concluída e gráficos salvos.")
 
+        elif escolha == "5":
+            print("\n📌 Níveis disponíveis:")
+            for indice, nivel in niveis_painel.items():
+                print(f"{indice}. {nivel.capitalize()}")
+            nivel = niveis_painel.get(input("Escolha o nível (1-3): "), "estado")
+            print(f"\n🗂️ Gerando painel por {nivel}...")
+            import painel
+            painel.carregar_painel(pasta=nome_pasta_test_data, nivel=nivel)
+            print("\n✅ Painel gerado com sucesso.")
+
+        elif escolha == "6":
+            print("\n📌 Modelos disponíveis:")
+            for indice in ("1", "2"):
+                print(f"{indice}. {modelos_disponiveis[indice]}")
+            nome_modelo = modelos_disponiveis.get(input("Digite o índice do modelo desejado: "))
+            if nome_modelo in ("ARIMA", "SARIMA"):
+                granularidade = selecionar_granularidade()
+                import backtesting
+                backtesting.executar_backtest(nome_pasta_test_data, granularidade, nome_modelo)
+            else:
+                print("❌ Índice inválido. O backtest está disponível para ARIMA e SARIMA.")
+
         elif escolha == "z" or escolha=="Z":
             print("👋 Saindo do programa.")
             break
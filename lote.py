@@ -0,0 +1,193 @@
+# lote.py
+import argparse
+import contextlib
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import banco_metricas
+import conjuntos_dados
+import diagnosticos
+import perfil
+
+MODELOS = ["ARIMA", "SARIMA", "Prophet"]
+GRANULARIDADES = ["mensal", "semanal", "diaria"]
+PASTA_LOGS = os.path.join("logs", "lote")
+FRACAO_CARO = 0.25  # Trabalhos com custo estimado acima desta fração do total recebem processos dedicados
+
+def contar_observacoes(caminho_teste, granularidade):
+    """
+    Conta as observações de treino de uma granularidade, sem ler a série.
+    """
+    return conjuntos_dados.contar_observacoes(caminho_teste, granularidade)
+
+def estimar_custo(modelo, granularidade, n_observacoes, busca="exaustiva"):
+    """
+    Estima o custo relativo de um trabalho. Para ARIMA/SARIMA: número de ajustes da busca sobre a
+    grade de `modelos` x observações x quadrado da dimensão aproximada do estado (o período sazonal
+    domina no SARIMA). O Prophet é aproximado como linear no número de observações.
+    """
+    if modelo not in ("ARIMA", "SARIMA"):
+        return 2000 * n_observacoes
+
+    import modelos
+
+    sazonalidade = diagnosticos.SAZONALIDADES[granularidade]
+    ajustes = modelos.estimar_ajustes(modelos.grade_candidatos(modelo, sazonalidade), busca)
+    dimensao = 3 + (sazonalidade if modelo == "SARIMA" else 0)
+    return ajustes * n_observacoes * dimensao ** 2
+
+def montar_trabalhos(modelos, granularidades, caminho_teste="dados_processados", busca="exaustiva"):
+    """
+    Monta a matriz de trabalhos (modelo x granularidade) com o custo estimado de cada um,
+    ordenada do mais barato para o mais caro.
+    """
+    observacoes = {gran: contar_observacoes(caminho_teste, gran) for gran in granularidades}
+    trabalhos = [
+        {"modelo": modelo, "granularidade": gran, "custo": estimar_custo(modelo, gran, observacoes[gran], busca)}
+        for modelo in modelos
+        for gran in granularidades
+    ]
+    return sorted(trabalhos, key=lambda trabalho: trabalho["custo"])
+
+def executar_trabalho(trabalho, caminho_teste="dados_processados", busca="exaustiva", pasta_logs=PASTA_LOGS):
+    """
+    Executa um trabalho (modelo, granularidade) em um processo, com a saída redirecionada
+    para um arquivo de log próprio.
+
+    Returns:
+        dict: O trabalho com 'status', 'tempo' e 'log'.
+    """
+    import modelos
+
+    os.makedirs(pasta_logs, exist_ok=True)
+    caminho_log = os.path.join(pasta_logs, f"{trabalho['modelo'].lower()}_{trabalho['granularidade']}.log")
+    inicio = time.perf_counter()
+    with open(caminho_log, "w", encoding="utf-8") as log, contextlib.redirect_stdout(log), \
+            contextlib.redirect_stderr(log):
+        try:
+            if trabalho["modelo"] == "ARIMA":
+                resultado = modelos.executar_arima(caminho_teste, trabalho["granularidade"],
+                                                   trabalho["n_processos"], busca)
+            elif trabalho["modelo"] == "SARIMA":
+                resultado = modelos.executar_sarima(caminho_teste, trabalho["granularidade"],
+                                                    trabalho["n_processos"], busca)
+            else:
+                resultado = modelos.executar_prophet(caminho_teste, trabalho["granularidade"])
+            status = "ok" if resultado is not None else "erro"
+        except Exception as e:
+            print(f"❌ Erro: {e}")
+            status = "erro"
+        perfil.finalizar(caminho_log.replace(".log", ".trace.json"))
+
+    return {**trabalho, "status": status, "tempo": time.perf_counter() - inicio, "log": caminho_log}
+
+def distribuir_trabalhos(trabalhos, n_trabalhadores=None, fracao_caro=FRACAO_CARO):
+    """
+    Separa os trabalhos caros (custo acima de `fracao_caro` do total) dos baratos e divide os núcleos:
+    os baratos rodam em paralelo, um processo cada, do mais barato ao mais caro; os caros rodam um
+    de cada vez em um processo dedicado, que usa os núcleos restantes na busca de parâmetros.
+
+    Returns:
+        tuple: Trabalhos baratos, trabalhos caros, número de processos dos baratos e processos da busca dos caros.
+    """
+    if n_trabalhadores is None:
+        n_trabalhadores = os.cpu_count() or 1
+    custo_total = sum(trabalho["custo"] for trabalho in trabalhos) or 1
+
+    caros = [t for t in trabalhos if t["custo"] >= fracao_caro * custo_total and t["modelo"] != "Prophet"]
+    baratos = [t for t in trabalhos if t not in caros]
+
+    processos_baratos = max(1, n_trabalhadores // 2 if caros else n_trabalhadores)
+    processos_caros = max(1, n_trabalhadores - processos_baratos)
+    return (
+        [{**t, "n_processos": 1} for t in baratos],
+        [{**t, "n_processos": processos_caros} for t in caros],
+        processos_baratos,
+        processos_caros
+    )
+
+def executar_lote(modelos=None, granularidades=None, caminho_teste="dados_processados", n_trabalhadores=None,
+                  busca="exaustiva", pasta_logs=PASTA_LOGS):
+    """
+    Executa sem interação todos os modelos nas granularidades pedidas, em paralelo.
+
+    Args:
+        modelos (list): Modelos ('ARIMA', 'SARIMA', 'Prophet'). None = todos.
+        granularidades (list): Granularidades ('mensal', 'semanal', 'diaria'). None = todas.
+        caminho_teste (str): Diretório dos dados processados.
+        n_trabalhadores (int): Limite de processos (None = um por núcleo).
+        busca (str): Modo de busca dos parâmetros ('exaustiva' ou 'stepwise').
+        pasta_logs (str): Diretório dos logs de cada trabalho.
+
+    Returns:
+        list: Resultado de cada trabalho ('status', 'tempo', 'log').
+    """
+    trabalhos = montar_trabalhos(modelos or MODELOS, granularidades or GRANULARIDADES, caminho_teste, busca)
+    baratos, caros, processos_baratos, processos_caros = distribuir_trabalhos(trabalhos, n_trabalhadores)
+
+    print(f"📋 {len(trabalhos)} trabalhos: {len(baratos)} em paralelo ({processos_baratos} processos), "
+          f"{len(caros)} dedicados ({processos_caros} processos na busca)")
+
+    # Todos os trabalhos gravam suas métricas com o mesmo identificador de execução
+    print(f"🏷️ Execução: {banco_metricas.id_execucao()}")
+
+    inicio = time.perf_counter()
+    resultados = []
+    with ProcessPoolExecutor(max_workers=processos_baratos) as executor_baratos, \
+            ProcessPoolExecutor(max_workers=1) as executor_caros:
+        futuros = [executor_caros.submit(executar_trabalho, t, caminho_teste, busca, pasta_logs) for t in caros]
+        futuros += [executor_baratos.submit(executar_trabalho, t, caminho_teste, busca, pasta_logs) for t in baratos]
+        for futuro in as_completed(futuros):
+            resultado = futuro.result()
+            icone = "✅" if resultado["status"] == "ok" else "❌"
+            print(f"{icone} {resultado['modelo']}_{resultado['granularidade']} concluído em {resultado['tempo']:.2f}s")
+            resultados.append(resultado)
+    duracao = time.perf_counter() - inicio
+
+    resumir_lote(resultados, duracao)
+    return resultados
+
+def resumir_lote(resultados, duracao):
+    """
+    Exibe o tempo de cada trabalho e o tempo total do lote.
+    """
+    print("\n=== ⏱️ RESUMO DO LOTE ===")
+    print(f"{'Trabalho':<20}{'Custo est.':>14}{'Processos':>11}{'Tempo (s)':>11}  Status")
+    for r in sorted(resultados, key=lambda r: r["custo"]):
+        print(f"{r['modelo'] + '_' + r['granularidade']:<20}{r['custo']:>14,}{r['n_processos']:>11}"
+              f"{r['tempo']:>11.2f}  {r['status']}")
+    soma = sum(r["tempo"] for r in resultados)
+    print(f"Tempo total: {duracao:.2f}s (soma dos trabalhos: {soma:.2f}s)")
+    falhas = [r for r in resultados if r["status"] != "ok"]
+    if falhas:
+        print(f"⚠️ {len(falhas)} trabalhos com erro. Veja os logs em '{os.path.dirname(falhas[0]['log'])}'.")
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description="Executa os modelos em lote, sem o menu interativo.")
+    parser.add_argument("--modelos", nargs="+", choices=MODELOS, default=MODELOS)
+    parser.add_argument("--granularidades", nargs="+", choices=GRANULARIDADES, default=GRANULARIDADES)
+    parser.add_argument("--trabalhadores", type=int, default=None,
+                        help="Limite de processos (padrão: um por núcleo)")
+    parser.add_argument("--busca", choices=["exaustiva", "stepwise"], default="exaustiva")
+    parser.add_argument("--dados", default="dados_processados", help="Diretório dos dados processados")
+    parser.add_argument("--arquivos", default="../data/ca-*.csv", help="Arquivos de origem (ca-*.csv)")
+    parser.add_argument("--perfil", action="store_true",
+                        help="Mede as etapas de cada trabalho e salva um trace (Chrome) ao lado do log")
+    parser.add_argument("--perfil-memoria", action="store_true", help="Mede também o pico de memória por etapa")
+    args = parser.parse_args(argumentos)
+
+    if args.perfil or args.perfil_memoria:
+        perfil.ativar(memoria=args.perfil_memoria)
+
+    from main import verificar_dados_processados
+    from dados import atualizar_dados
+
+    if not verificar_dados_processados(args.dados, args.arquivos):
+        print("🔄 Carregando os dados...\n")
+        atualizar_dados(args.arquivos, args.dados)
+
+    resultados = executar_lote(args.modelos, args.granularidades, args.dados, args.trabalhadores, args.busca)
+    return 0 if all(r["status"] == "ok" for r in resultados) else 1
+
+if __name__ == "__main__":
+    raise SystemExit(main())
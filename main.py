@@ -1,27 +1,39 @@
 from funcoes_menu import menu_interativo
-from dados import carregar_dados
-import os
+from cache_dados import fontes_alteradas
+import conjuntos_dados
+import glob
 
 caminho_arquivos = "../data/ca-*.csv"
 pasta_dados_processados = "dados_processados"
+n_processos_leitura = None  # None = um processo por núcleo; 1 = leitura em série
 
-def verificar_dados_processados(pasta):
+def verificar_dados_processados(pasta, caminho_arquivos=caminho_arquivos):
     """
-    Verifica se os arquivos de treino para todas as granularidades estão na pasta de dados processados.
+    Verifica se todas as granularidades estão na pasta de dados processados (séries binárias ou,
+    em pastas antigas, CSVs de treino e teste) e se os arquivos de origem não foram alterados
+    desde o último processamento.
     """
-    arquivos_necessarios = [
-        "train_data_mensal.csv",
-        "train_data_semanal.csv",
-        "train_data_diaria.csv"
-    ]
-    return all(os.path.exists(os.path.join(pasta, arquivo)) for arquivo in arquivos_necessarios)
+    granularidades_necessarias = ["mensal", "semanal", "diaria"]
+    if not all(conjuntos_dados.existe(pasta, gran) for gran in granularidades_necessarias):
+        return False
+
+    # Sem arquivos de origem disponíveis, os dados processados existentes são usados
+    arquivos_origem = glob.glob(caminho_arquivos)
+    if arquivos_origem and fontes_alteradas(arquivos_origem):
+        print("🔄 Arquivos de origem novos ou alterados detectados.")
+        return False
+
+    return True
 
 # Execução principal
 if __name__ == "__main__":
-    # Se os dados ainda não estiverem processados, executa o carregamento
+    # Se os dados ainda não estiverem processados (ou as fontes mudaram), executa o carregamento
+    # incremental: somente arquivos novos ou alterados são lidos
     if not verificar_dados_processados(pasta_dados_processados):
         print("🔄 Carregando os dados...\n")
-        carregar_dados(caminho_arquivos, pasta_dados_processados)
+        from dados import atualizar_dados
+
+        atualizar_dados(caminho_arquivos, pasta_dados_processados, n_processos_leitura)
         print("✅ Dados processados e salvos na pasta 'dados_processados'.\n")
     else:
         print("📂 Dados já processados encontrados.\n")
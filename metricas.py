@@ -0,0 +1,84 @@
+# metricas.py
+import numpy as np
+
+METRICAS = ["MAE", "RMSE", "R²", "MAPE", "sMAPE", "MASE"]
+
+def chave_metrica(nome):
+    """
+    Nome da métrica usado como chave nos dicionários de resultados (ex.: "R²" -> "r2").
+    """
+    return nome.lower().replace("²", "2")
+
+def escala_mase(serie_treino, periodo_sazonal=1):
+    """
+    Calcula a escala do MASE: erro absoluto médio da previsão ingênua (sazonal) no treino.
+    """
+    valores = np.asarray(serie_treino, dtype="float64")
+    if len(valores) <= periodo_sazonal:
+        return np.nan
+    diferencas = np.abs(valores[periodo_sazonal:] - valores[:-periodo_sazonal])
+    diferencas = diferencas[~np.isnan(diferencas)]
+    return diferencas.mean() if len(diferencas) else np.nan
+
+def calcular_metricas(previsoes, reais, serie_treino=None, periodo_sazonal=1):
+    """
+    Calcula MAE, RMSE, R², MAPE, sMAPE e MASE de várias previsões de uma só vez.
+    As previsões são empilhadas em uma matriz (candidatos x horizonte) e os pontos em que a previsão
+    ou o valor real é NaN são ignorados por uma máscara, sem alinhar índices nem copiar os dados de teste.
+
+    Args:
+        previsoes (array-like): Matriz (candidatos x horizonte) ou vetor (horizonte) de previsões.
+        reais (array-like): Vetor (horizonte) de valores reais, ou matriz com o mesmo formato das previsões.
+        serie_treino (array-like): Série de treino, usada na escala do MASE (None = MASE indisponível).
+        periodo_sazonal (int): Defasagem da previsão ingênua usada no MASE.
+
+    Returns:
+        dict: Uma entrada por métrica de `METRICAS`, com um vetor (um valor por candidato),
+        ou um float se `previsoes` for um vetor. MAPE e sMAPE em %.
+    """
+    vetor = np.ndim(previsoes) == 1
+    previsoes = np.atleast_2d(np.asarray(previsoes, dtype="float64"))
+    reais = np.broadcast_to(np.asarray(reais, dtype="float64"), previsoes.shape)
+
+    mascara = ~(np.isnan(previsoes) | np.isnan(reais))
+    n = mascara.sum(axis=1)
+    erros = np.where(mascara, previsoes - reais, 0.0)
+    reais_validos = np.where(mascara, reais, 0.0)
+    absolutos = np.abs(erros)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mae = absolutos.sum(axis=1) / n
+        sse = (erros ** 2).sum(axis=1)
+        rmse = np.sqrt(sse / n)
+
+        # R² como no scikit-learn: 1 se a série real é constante e a previsão exata, 0 se constante e não exata
+        media = reais_validos.sum(axis=1) / n
+        sst = np.where(mascara, (reais - media[:, None]) ** 2, 0.0).sum(axis=1)
+        r2 = np.where(sst > 0, 1 - sse / np.where(sst > 0, sst, 1.0), np.where(sse == 0, 1.0, 0.0))
+        r2 = np.where(n > 0, r2, np.nan)
+
+        # MAPE ignora os pontos com valor real zero
+        nao_zero = mascara & (reais != 0)
+        mape = 100 * np.where(nao_zero, absolutos / np.where(nao_zero, np.abs(reais), 1.0), 0.0).sum(axis=1) \
+            / nao_zero.sum(axis=1)
+
+        denominador = np.abs(np.where(mascara, previsoes, 0.0)) + np.abs(reais_validos)
+        smape = 100 * np.where(denominador > 0, 2 * absolutos / np.where(denominador > 0, denominador, 1.0),
+                               0.0).sum(axis=1) / n
+
+        escala = escala_mase(serie_treino, periodo_sazonal) if serie_treino is not None else np.nan
+        mase = mae / escala if escala else np.full_like(mae, np.nan)
+
+    resultado = dict(zip(METRICAS, [mae, rmse, r2, mape, smape, mase]))
+    if vetor:
+        return {nome: float(valores[0]) for nome, valores in resultado.items()}
+    return resultado
+
+def formatar_metricas(metricas):
+    """
+    Formata as métricas de uma previsão para exibição (ex.: "MAE: 0.1234, RMSE: ...").
+    """
+    return ", ".join(
+        f"{nome}: {valor:.2f}%" if nome in ("MAPE", "sMAPE") else f"{nome}: {valor:.4f}"
+        for nome, valor in metricas.items()
+    )
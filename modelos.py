@@ -1,272 +1,873 @@
 import os
+import time
 import pandas as pd
 import numpy as np
 import helpers as helper
-from statsmodels.tsa.stattools import adfuller, kpss
+import banco_previsoes
+import cache_modelos
+import conjuntos_dados
+import diagnosticos
+import metricas
+import perfil
+import registro_modelos
+from concurrent.futures import ProcessPoolExecutor
 from statsmodels.tsa.arima.model import ARIMA
 from statsmodels.tsa.statespace.sarimax import SARIMAX
-from prophet import Prophet
-from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
 
+# Ajustes típicos da busca stepwise em cada combinação (d, D): modelos iniciais e poucos passos de vizinhos
+AJUSTES_STEPWISE_POR_GRUPO = 16
 
+
+def _exibir_testes(teste):
+    if teste["adf_p"] is not None:
+        print(f"ADF Statistic: {teste['adf_estatistica']:.4f}, p-valor: {teste['adf_p']:.4f}")
+    if teste["kpss_p"] is not None:
+        print(f"KPSS Statistic: {teste['kpss_estatistica']:.4f}, p-valor: {teste['kpss_p']:.4f}")
+    elif teste["adf_p"] is not None:
+        print("⚠️ Erro ao executar o teste KPSS.")
+
+@perfil.medir()
 def testar_estacionariedade(series):
     """
     Executa os testes de ADF e KPSS para avaliar a estacionariedade da série.
+    A série recebida não é alterada: valores ausentes e infinitos são ignorados em uma cópia.
     """
     print("\n📊 Teste de Estacionariedade:")
 
     # Remover valores ausentes e infinitos
-    series.dropna(inplace=True)
-    series.replace([np.inf, -np.inf], np.nan, inplace=True)
-    series.dropna(inplace=True)
+    valores = series.to_numpy(dtype="float64")
+    valores = valores[np.isfinite(valores)]
 
-    if series.empty:
+    if valores.size == 0:
         print("❌ Série vazia após limpeza. Verifique os dados.")
         return True
 
-    # Teste de Dickey-Fuller (ADF)
-    adf_resultado = adfuller(series)
-    print(f"ADF Statistic: {adf_resultado[0]:.4f}, p-valor: {adf_resultado[1]:.4f}")
-    adf_estacionaria = adf_resultado[1] < 0.05
+    teste = diagnosticos.testar_estacionariedade(valores)
+    _exibir_testes(teste)
+    return teste["estacionaria"]
+
+@perfil.medir()
+def carregar_diagnosticos(serie_treino, granularidade, caminho_teste="dados_processados"):
+    """
+    Obtém o índice de diagnósticos da série de treino (salvo ao lado dos dados processados e
+    recalculado apenas quando a série muda) e exibe os testes de estacionariedade da série original.
+    Sem dados processados em `caminho_teste`, o índice é calculado a partir da série recebida, sem salvá-lo.
+    """
+    indice = diagnosticos.carregar_indice(granularidade, caminho_teste, serie_treino) if caminho_teste else None
+    if indice is None:
+        indice = diagnosticos.construir_indice(serie_treino, granularidade)
+
+    print("\n📊 Teste de Estacionariedade:")
+    _exibir_testes(indice["diferencas"]["0"])
+    lacunas = indice["lacunas"]
+    if lacunas["ausentes"]:
+        print(f"🕳️ {lacunas['ausentes']} períodos sem coleta ({lacunas['fracao']:.1%}), "
+              f"maior sequência: {lacunas['maior_sequencia']}")
+    return indice
+
+def podar_grade(candidatos, indice, precisa_diff, periodo=None):
+    """
+    Remove da grade as diferenciações e ordens sazonais descartadas pelo índice de diagnósticos.
+    """
+    mantidos, motivos = diagnosticos.podar_candidatos(candidatos, indice, int(precisa_diff), periodo)
+    for motivo in motivos:
+        print(f"✂️ Descartado pelo diagnóstico: {motivo}")
+    if len(mantidos) < len(candidatos):
+        print(f"✂️ Grade reduzida de {len(candidatos)} para {len(mantidos)} candidatos.")
+    return mantidos
+
+@perfil.medir()
+def carregar_dados(caminho_teste="dados_processados", granularidade="mensal", metodo_nan="interpolacao"):
+    """
+    Carrega os dados de treino e teste (indexados pela data, com a frequência da granularidade e
+    valores ausentes já tratados) e verifica a existência dos arquivos.
+    Os arquivos são lidos uma única vez por processo (ver `conjuntos_dados.obter_dados`).
+    """
+    train_data, test_data = conjuntos_dados.obter_dados(caminho_teste, granularidade, metodo_nan)
+    if train_data is None:
+        print(f"❌ Erro: Arquivos não encontrados para a granularidade {granularidade}.")
+    return train_data, test_data
 
-    # Teste KPSS
+def criar_modelo(tipo, serie, ordem, ordem_sazonal=None):
+    """
+    Cria o modelo statsmodels de um candidato ('ARIMA' ou 'SARIMA').
+    """
+    if tipo == "ARIMA":
+        return ARIMA(serie, order=ordem)
+    return SARIMAX(
+        serie,
+        order=ordem,
+        seasonal_order=ordem_sazonal,
+        enforce_stationarity=False,
+        enforce_invertibility=False
+    )
+
+def ajustar_modelo(modelo, start_params=None):
+    """
+    Ajusta um modelo criado por `criar_modelo`, opcionalmente a partir de `start_params`.
+    """
+    if isinstance(modelo, ARIMA):
+        return modelo.fit(start_params=start_params)
+    return modelo.fit(start_params=start_params, disp=False)
+
+def parametros_iniciais(modelo, vizinho):
+    """
+    Monta os parâmetros iniciais de um modelo a partir do ajuste de um candidato vizinho:
+    parâmetros com o mesmo nome (ex.: 'ar.L1', 'sigma2') são copiados e os coeficientes
+    AR/MA novos começam em zero. Retorna None se não for possível aproveitar o vizinho.
+    """
+    if vizinho is None or vizinho.get("params") is None:
+        return None
+
+    valores = dict(zip(vizinho["nomes_params"], vizinho["params"]))
+    iniciais = []
+    for nome in modelo.param_names:
+        if nome in valores:
+            iniciais.append(valores[nome])
+        elif nome.startswith(("ar.", "ma.")):
+            iniciais.append(0.0)
+        else:
+            return None
+    return np.asarray(iniciais, dtype="float64")
+
+def descrever_candidato(tipo, ordem, ordem_sazonal=None):
+    p, d, q = ordem
+    if ordem_sazonal is None:
+        return f"{tipo}({p},{d},{q})"
+    P, D, Q, s = ordem_sazonal
+    return f"{tipo}({p},{d},{q})x({P},{D},{Q},{s})"
+
+def avaliar_candidato(tarefa):
+    """
+    Ajusta um candidato da grade e obtém suas previsões no horizonte de teste. As métricas são
+    calculadas depois, para todos os candidatos de uma vez (ver `pontuar_candidatos`).
+    Se o mesmo ajuste (mesma série de treino e especificação) estiver no cache, ele é reutilizado.
+    Executada nos processos do pool, por isso nunca propaga exceções.
+
+    Args:
+        tarefa (tuple): (tipo, serie_treino, serie_teste, ordem, ordem_sazonal, pasta_cache, impressao, vizinho),
+            com pasta_cache None para desativar o cache e vizinho o resultado de um candidato já ajustado
+            cujos parâmetros servem de ponto de partida (warm start), ou None.
+
+    Returns:
+        dict: 'ordem', 'ordem_sazonal', métricas ('mae', 'rmse', ... ainda NaN), 'aic', 'llf', 'params', 'nomes_params', 'previsoes'
+            (horizonte completo), 'tempo' (segundos), 'iteracoes' (do otimizador), 'warm_start',
+            'cache' (True se veio do cache) e 'erro' (None se funcionou).
+    """
+    tipo, serie_treino, serie_teste, ordem, ordem_sazonal, pasta_cache, impressao, vizinho = tarefa
+    resultado = {
+        "ordem": ordem,
+        "ordem_sazonal": ordem_sazonal,
+        **{metricas.chave_metrica(nome): np.nan for nome in metricas.METRICAS},
+        "aic": np.nan,
+        "llf": np.nan,
+        "params": None,
+        "nomes_params": None,
+        "previsoes": None,
+        "tempo": 0.0,
+        "iteracoes": None,
+        "warm_start": False,
+        "cache": False,
+        "erro": None,
+        "pid": os.getpid()
+    }
+
+    inicio = resultado["inicio"] = time.perf_counter()
     try:
-        kpss_resultado, kpss_p, *_ = kpss(series, nlags="auto")
-        print(f"KPSS Statistic: {kpss_resultado:.4f}, p-valor: {kpss_p:.4f}")
-        kpss_estacionaria = kpss_p > 0.05
-    except ValueError:
-        print("⚠️ Erro ao executar o teste KPSS.")
-        kpss_estacionaria = False
+        chave = None
+        ajuste = None
+        if pasta_cache is not None:
+            # Ajustes com pontos de partida diferentes podem convergir para ótimos diferentes: a chave
+            # inclui os parâmetros do vizinho, para que o resultado não dependa da ordem de avaliação
+            chave = cache_modelos.chave_ajuste(tipo, impressao, ordem, ordem_sazonal, len(serie_teste),
+                                               partida=cache_modelos.partida_vizinho(vizinho))
+            ajuste = cache_modelos.ler_ajuste(chave, pasta_cache)
+            resultado["cache"] = ajuste is not None
+
+        if ajuste is None:
+            modelo = criar_modelo(tipo, serie_treino, ordem, ordem_sazonal)
+            start_params = parametros_iniciais(modelo, vizinho)
+            resultado["warm_start"] = start_params is not None
+
+            ajustado = ajustar_modelo(modelo, start_params)
+            resultado["iteracoes"] = getattr(ajustado, "mle_retvals", {}).get("iterations")
+            ajuste = {
+                "params": np.asarray(ajustado.params, dtype="float64"),
+                "nomes_params": list(ajustado.param_names),
+                "llf": float(ajustado.llf),
+                "aic": float(ajustado.aic),
+                "previsoes": np.asarray(ajustado.forecast(steps=len(serie_teste)), dtype="float64")
+            }
+            if chave is not None:
+                cache_modelos.gravar_ajuste(chave, pasta_cache=pasta_cache, **ajuste)
+        resultado.update(ajuste)
+    except Exception as e:
+        resultado["erro"] = str(e)
+    resultado["tempo"] = time.perf_counter() - inicio
+
+    return resultado
+
+def _vetor(candidato):
+    """
+    Converte (ordem, ordem_sazonal) no vetor (p, d, q, P, D, Q); sem parte sazonal, P = D = Q = 0.
+    """
+    ordem, ordem_sazonal = candidato
+    return tuple(ordem) + (tuple(ordem_sazonal[:3]) if ordem_sazonal is not None else (0, 0, 0))
+
+def avaliar_cadeia(tarefa):
+    """
+    Avalia em sequência uma cadeia de candidatos vizinhos, iniciando cada ajuste a partir dos
+    parâmetros do candidato mais próximo já ajustado na cadeia (warm start).
+
+    Args:
+        tarefa (tuple): (tipo, serie_treino, serie_teste, candidatos, pasta_cache, impressao).
+
+    Returns:
+        list: Resultados de `avaliar_candidato`, na mesma ordem de `candidatos`.
+    """
+    tipo, serie_treino, serie_teste, candidatos, pasta_cache, impressao = tarefa
+    resultados = []
+    for ordem, ordem_sazonal in candidatos:
+        vetor = _vetor((ordem, ordem_sazonal))
+        ajustados = [r for r in resultados if r["erro"] is None]
+        vizinho = min(
+            ajustados,
+            key=lambda r: sum(abs(a - b) for a, b in zip(_vetor((r["ordem"], r["ordem_sazonal"])), vetor)),
+            default=None
+        )
+        resultados.append(avaliar_candidato(
+            (tipo, serie_treino, serie_teste, ordem, ordem_sazonal, pasta_cache, impressao, vizinho)
+        ))
+    return resultados
+
+def montar_cadeias(candidatos):
+    """
+    Agrupa os candidatos em cadeias para warm start: cada cadeia tem as mesmas diferenciações e ordens
+    sazonais (d, P, D, Q) e é ordenada por complexidade (p + q), de modo que cada candidato tenha
+    um vizinho já ajustado a um passo de distância.
+
+    Returns:
+        list: Listas de índices de `candidatos`, uma por cadeia.
+    """
+    cadeias = {}
+    for i, candidato in enumerate(candidatos):
+        p, d, q, P, D, Q = _vetor(candidato)
+        cadeias.setdefault((d, P, D, Q), []).append(i)
 
-    return adf_estacionaria and kpss_estacionaria
+    def complexidade(i):
+        vetor = _vetor(candidatos[i])
+        return vetor[0] + vetor[2], vetor
 
-def carregar_dados(caminho_teste="dados_processados", granularidade="mensal"):
+    return [sorted(indices, key=complexidade) for indices in cadeias.values()]
+
+def resolver_n_processos(n_processos, n_tarefas):
+    """
+    Resolve o número efetivo de processos (None = um por núcleo), limitado ao número de tarefas.
+    """
+    if n_processos is None:
+        n_processos = os.cpu_count() or 1
+    return max(1, min(n_processos, n_tarefas))
+
+def criar_executor(n_processos):
+    """
+    Cria o pool de processos da busca, ou None quando a execução deve ser em série.
+    """
+    if n_processos == 1:
+        return None
+    return ProcessPoolExecutor(max_workers=n_processos)
+
+def avaliar_candidatos(tipo, serie_treino, serie_teste, candidatos, executor=None, pasta_cache=cache_modelos.PASTA_CACHE,
+                       warm_start=False, vizinhos=None):
+    """
+    Avalia uma lista de candidatos (ordem, ordem_sazonal) no pool de processos, ou em série se `executor` for None.
+
+    Args:
+        warm_start (bool): Se True, os candidatos são avaliados em cadeias de vizinhos (ver `montar_cadeias`),
+            cada cadeia em um processo, com cada ajuste partindo dos parâmetros do vizinho mais próximo.
+        vizinhos (list): Resultados usados como ponto de partida de cada candidato (tem precedência sobre as cadeias).
+
+    Returns:
+        list: Resultados de `avaliar_candidato`, na mesma ordem de `candidatos`.
+    """
+    impressao = cache_modelos.impressao_serie(serie_treino) if pasta_cache is not None else None
+    mapear = map if executor is None else executor.map
+
+    if warm_start and vizinhos is None:
+        cadeias = montar_cadeias(candidatos)
+        tarefas = [
+            (tipo, serie_treino, serie_teste, [candidatos[i] for i in cadeia], pasta_cache, impressao)
+            for cadeia in cadeias
+        ]
+        resultados = [None] * len(candidatos)
+        for cadeia, resultados_cadeia in zip(cadeias, mapear(avaliar_cadeia, tarefas)):
+            for i, resultado in zip(cadeia, resultados_cadeia):
+                resultados[i] = resultado
+    else:
+        if vizinhos is None:
+            vizinhos = [None] * len(candidatos)
+        tarefas = [
+            (tipo, serie_treino, serie_teste, ordem, ordem_sazonal, pasta_cache, impressao, vizinho)
+            for (ordem, ordem_sazonal), vizinho in zip(candidatos, vizinhos)
+        ]
+        resultados = list(mapear(avaliar_candidato, tarefas))
+
+    # Cada ajuste, medido no processo que o executou, entra no perfil
+    for resultado in resultados:
+        perfil.registrar(f"ajuste:{tipo}", resultado["inicio"], resultado["tempo"], pid=resultado["pid"],
+                         candidato=descrever_candidato(tipo, resultado["ordem"], resultado["ordem_sazonal"]),
+                         iteracoes=resultado["iteracoes"], cache=resultado["cache"],
+                         warm_start=resultado["warm_start"], erro=resultado["erro"])
+    return pontuar_candidatos(resultados, serie_teste, serie_treino)
+
+def pontuar_candidatos(resultados, serie_teste, serie_treino=None):
+    """
+    Calcula as métricas de todos os candidatos ajustados em uma única chamada vetorizada:
+    as previsões são empilhadas em uma matriz (candidatos x horizonte) e comparadas com o teste.
+    As métricas ('mae', 'rmse', 'r2', 'mape', 'smape', 'mase') são gravadas em cada resultado.
+    """
+    ajustados = [resultado for resultado in resultados if resultado["previsoes"] is not None]
+    if not ajustados:
+        return resultados
+
+    calculadas = metricas.calcular_metricas(
+        np.vstack([resultado["previsoes"] for resultado in ajustados]),
+        serie_teste.to_numpy(dtype="float64"),
+        serie_treino
+    )
+    for i, resultado in enumerate(ajustados):
+        for nome, valores in calculadas.items():
+            resultado[metricas.chave_metrica(nome)] = float(valores[i])
+    return resultados
+
+def escolher_melhor(tipo, resultados):
+    """
+    Escolhe o resultado de menor RMSE; em caso de empate vence o primeiro da lista. Exibe as falhas.
     """
-    Carrega os dados de treino e teste e verifica a existência dos arquivos.
+    melhor = None
+    for resultado in resultados:
+        if resultado["erro"] is not None:
+            print(f"❌ Erro ao ajustar {descrever_candidato(tipo, resultado['ordem'], resultado['ordem_sazonal'])}: {resultado['erro']}")
+        elif resultado["rmse"] < (melhor["rmse"] if melhor else float("inf")):
+            melhor = resultado
+    return melhor
+
+def _resumir_busca(resultados, duracao, n_processos):
+    falhas = sum(resultado["erro"] is not None for resultado in resultados)
+    do_cache = sum(resultado["cache"] for resultado in resultados)
+    tempo_ajustes = sum(resultado["tempo"] for resultado in resultados)
+    print(f"⏱️ {len(resultados)} candidatos ({falhas} falhas, {do_cache} do cache) em {duracao:.2f}s "
+          f"com {n_processos} processo(s) (soma dos ajustes: {tempo_ajustes:.2f}s)")
+
+    # Iterações do otimizador e tempo médio por ajuste, separados por ponto de partida
+    for warm_start, rotulo in [(True, "warm start"), (False, "partida padrão")]:
+        ajustes = [r for r in resultados if r["iteracoes"] is not None and r["warm_start"] == warm_start]
+        if ajustes:
+            print(f"   {rotulo}: {len(ajustes)} ajustes, {np.mean([r['iteracoes'] for r in ajustes]):.1f} iterações "
+                  f"e {np.mean([r['tempo'] for r in ajustes]):.3f}s por ajuste em média")
+
+def buscar_melhor_ordem(tipo, serie_treino, serie_teste, candidatos, n_processos=None,
+                        pasta_cache=cache_modelos.PASTA_CACHE, warm_start=False):
     """
+    Avalia a grade de candidatos em um pool de processos e escolhe o de menor RMSE.
+    Em caso de empate vence o primeiro candidato da grade, como na busca em série.
+
+    Args:
+        tipo (str): 'ARIMA' ou 'SARIMA'.
+        serie_treino (Series): Série de treino.
+        serie_teste (Series): Série de teste.
+        candidatos (list): Pares (ordem, ordem_sazonal) na ordem da grade.
+        n_processos (int): Número de processos. None usa um por núcleo; 1 executa em série.
+        pasta_cache (str): Diretório do cache de ajustes (None desativa o cache).
+        warm_start (bool): Avalia a grade em cadeias de vizinhos, iniciando cada ajuste pelos parâmetros
+            do vizinho mais próximo já ajustado.
+
+    Returns:
+        tuple: Melhor resultado (ou None se nenhum ajuste funcionou) e a lista de resultados por candidato.
+    """
+    inicio = time.perf_counter()
+    n_processos = resolver_n_processos(n_processos, len(candidatos))
+    executor = criar_executor(n_processos)
     try:
-        train_data = pd.read_csv(f"./{caminho_teste}/train_data_{granularidade}.csv")
-        test_data = pd.read_csv(f"./{caminho_teste}/test_data_{granularidade}.csv")
-    except FileNotFoundError:
-        print(f"❌ Erro: Arquivos não encontrados para a granularidade {granularidade}.")
-        return None, None
-
-    # Converter 'Data' para datetime e definir como índice
-    train_data["Data"] = pd.to_datetime(train_data["Data"])
-    train_data.set_index("Data", inplace=True)
-
-    test_data["Data"] = pd.to_datetime(test_data["Data"])
-    test_data.set_index("Data", inplace=True)
-
-    # Garantir frequência do índice para previsões futuras
-    if granularidade == "mensal":
-        train_data = train_data.asfreq("ME")  # Atualizado
-        test_data = test_data.asfreq("ME")
-    elif granularidade == "semanal":
-        train_data = train_data.asfreq("W")
-        test_data = test_data.asfreq("W")
-    elif granularidade == "diaria":
-        train_data = train_data.asfreq("D")
-        test_data = test_data.asfreq("D")
+        resultados = avaliar_candidatos(tipo, serie_treino, serie_teste, candidatos, executor, pasta_cache,
+                                        warm_start)
+        _resumir_busca(resultados, time.perf_counter() - inicio, n_processos)
+    finally:
+        if executor is not None:
+            executor.shutdown()
 
-    return train_data, test_data
+    return escolher_melhor(tipo, resultados), resultados
+
+def buscar_stepwise(tipo, serie_treino, serie_teste, candidatos, n_processos=None, comparar_exaustiva=False,
+                    pasta_cache=cache_modelos.PASTA_CACHE, warm_start=False, sugestao=None):
+    """
+    Busca stepwise no estilo Hyndman–Khandakar: para cada combinação de diferenciações (d, D) da grade,
+    parte de alguns modelos iniciais e se move para o vizinho de menor AIC (p, q, P e Q variando em ±1,
+    isolados ou em pares) até não haver melhora. Entre os vencedores de cada (d, D), que não são
+    comparáveis por AIC, vence o de menor RMSE no teste, como na busca exaustiva.
+
+    Os vizinhos de todas as combinações (d, D) de cada passo são avaliados juntos no pool de processos.
+
+    Args:
+        tipo (str): 'ARIMA' ou 'SARIMA'.
+        serie_treino (Series): Série de treino.
+        serie_teste (Series): Série de teste.
+        candidatos (list): Pares (ordem, ordem_sazonal) da grade exaustiva (limites da busca).
+        n_processos (int): Número de processos. None usa um por núcleo; 1 executa em série.
+        comparar_exaustiva (bool): Se True, avalia também os candidatos restantes e compara com o ótimo exaustivo.
+        pasta_cache (str): Diretório do cache de ajustes (None desativa o cache).
+        warm_start (bool): Inicia cada vizinho pelos parâmetros do modelo atual da sua combinação (d, D).
+        sugestao (dict): Ordens sugeridas pelos correlogramas ('p', 'q', 'P', 'Q'), incluídas entre os
+            modelos iniciais de cada combinação (d, D).
+
+    Returns:
+        tuple: Melhor resultado (ou None se nenhum ajuste funcionou) e a lista de resultados avaliados.
+    """
+    por_vetor = {_vetor(candidato): candidato for candidato in candidatos}
+    avaliados = {}
+
+    def aic(vetor):
+        resultado = avaliados[vetor]
+        return resultado["aic"] if resultado["erro"] is None and np.isfinite(resultado["aic"]) else float("inf")
+
+    def vizinhos(vetor):
+        p, d, q, P, D, Q = vetor
+        passos = [(dp, dq, 0, 0) for dp, dq in [(1, 0), (-1, 0), (0, 1), (0, -1), (1, 1), (-1, -1)]]
+        passos += [(0, 0, dP, dQ) for dP, dQ in [(1, 0), (-1, 0), (0, 1), (0, -1), (1, 1), (-1, -1)]]
+        proximos = [(p + dp, d, q + dq, P + dP, D, Q + dQ) for dp, dq, dP, dQ in passos]
+        return [vizinho for vizinho in proximos if vizinho in por_vetor]
+
+    def avaliar(vetores, executor, origens=None):
+        # origens: vetor de partida (warm start) de cada vetor avaliado
+        origens = origens if warm_start and origens is not None else {}
+        novos = list(dict.fromkeys(v for v in vetores if v not in avaliados))
+        vizinhos_novos = [avaliados.get(origens.get(v)) for v in novos]
+        resultados = avaliar_candidatos(tipo, serie_treino, serie_teste, [por_vetor[v] for v in novos], executor,
+                                        pasta_cache, vizinhos=vizinhos_novos)
+        avaliados.update(zip(novos, resultados))
+
+    # Modelos iniciais de cada combinação (d, D), limitados à grade
+    grupos = list(dict.fromkeys((v[1], v[4]) for v in por_vetor))
+    iniciais = {
+        (d, D): [v for v in [(2, d, 2, 1, D, 1), (0, d, 0, 0, D, 0), (1, d, 0, 1, D, 0), (0, d, 1, 0, D, 1),
+                             (2, d, 2, 0, D, 0), (1, d, 0, 0, D, 0), (0, d, 1, 0, D, 0)]
+                 if v in por_vetor]
+        for d, D in grupos
+    }
+    if sugestao is not None:
+        for (d, D), vetores in iniciais.items():
+            sugerido = (sugestao["p"], d, sugestao["q"], sugestao["P"], D, sugestao["Q"])
+            if sugerido not in por_vetor:
+                sugerido = (sugestao["p"], d, sugestao["q"], 0, D, 0)
+            if sugerido in por_vetor and sugerido not in vetores:
+                vetores.append(sugerido)
+
+    inicio = time.perf_counter()
+    n_processos = resolver_n_processos(n_processos, len(candidatos))
+    executor = criar_executor(n_processos)
+    try:
+        avaliar([v for vetores in iniciais.values() for v in vetores], executor)
+        atuais = {grupo: min(vetores, key=aic) for grupo, vetores in iniciais.items() if vetores}
+
+        ativos = set(atuais)
+        passos = 0
+        while ativos:
+            passos += 1
+            origens = {v: atuais[grupo] for grupo in ativos for v in vizinhos(atuais[grupo])}
+            avaliar(list(origens), executor, origens)
+            for grupo in list(ativos):
+                melhor_vizinho = min(vizinhos(atuais[grupo]), key=aic, default=None)
+                if melhor_vizinho is not None and aic(melhor_vizinho) < aic(atuais[grupo]):
+                    atuais[grupo] = melhor_vizinho
+                else:
+                    ativos.discard(grupo)
+
+        resultados = list(avaliados.values())
+        _resumir_busca(resultados, time.perf_counter() - inicio, n_processos)
+        print(f"🪜 Stepwise: {len(avaliados)} de {len(candidatos)} ajustes em {passos} passos "
+              f"({len(candidatos) - len(avaliados)} ajustes evitados)")
+
+        vencedores = [avaliados[atuais[grupo]] for grupo in grupos if grupo in atuais]
+        melhor = escolher_melhor(tipo, [v for v in vencedores if v["erro"] is None])
+
+        if comparar_exaustiva:
+            avaliar(list(por_vetor), executor)
+            melhor_exaustivo = escolher_melhor(tipo, [avaliados[v] for v in por_vetor])
+            _comparar_com_exaustiva(tipo, melhor, melhor_exaustivo)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    return melhor, resultados
+
+def _comparar_com_exaustiva(tipo, melhor, melhor_exaustivo):
+    if melhor is None or melhor_exaustivo is None:
+        print("⚠️ Não foi possível comparar com a busca exaustiva.")
+        return
+
+    escolhido = descrever_candidato(tipo, melhor["ordem"], melhor["ordem_sazonal"])
+    exaustivo = descrever_candidato(tipo, melhor_exaustivo["ordem"], melhor_exaustivo["ordem_sazonal"])
+    diferenca = (melhor["rmse"] / melhor_exaustivo["rmse"] - 1) * 100 if melhor_exaustivo["rmse"] > 0 else 0.0
+    print(f"📏 Stepwise: {escolhido} (RMSE {melhor['rmse']:.4f}) | Exaustiva: {exaustivo} "
+          f"(RMSE {melhor_exaustivo['rmse']:.4f}) | Diferença: {diferenca:+.2f}%")
 
-def ajustar_arima(train_data, test_data, nome_modelo="ARIMA", granularidade="mensal"):
+@perfil.medir()
+def sugerir_ordens(serie_treino, periodo=None, pasta_cache=diagnosticos.PASTA_CACHE, granularidade=None):
+    """
+    Sugere (p, q) e, com `periodo`, (P, Q) pelos correlogramas da série de treino. Para a série sem
+    diferenciação, são os mesmos arrays dos gráficos de ACF/PACF da EDA (mesma série interpolada e
+    mesmas defasagens), calculados uma vez e mantidos em cache.
+    """
+    nlags = diagnosticos.lags_correlograma(granularidade, periodo)
+    correlograma = diagnosticos.correlogramas(serie_treino.dropna(), nlags, pasta_cache)
+    sugestao = diagnosticos.sugerir_ordens(correlograma, max_p=2, max_q=2, periodo=periodo)
+    descricao = f"p={sugestao['p']}, q={sugestao['q']}"
+    if periodo is not None:
+        descricao += f", P={sugestao['P']}, Q={sugestao['Q']}"
+    print(f"💡 Ordens sugeridas pela ACF/PACF: {descricao}")
+    return sugestao
+
+@perfil.medir()
+def grade_candidatos(tipo, sazonalidade=None):
+    """
+    Grade exaustiva de ordens da busca: (p, d, q) com p, q em 0..2 e d em 0..1 e, no SARIMA,
+    (P, D, Q, s) com P, D, Q em 0..1 e s = `sazonalidade`.
+
+    Returns:
+        list: Pares (ordem, ordem_sazonal); ordem_sazonal é None no ARIMA.
+    """
+    ordens = [(p, d, q) for p in range(0, 3) for d in range(0, 2) for q in range(0, 3)]
+    if tipo == "ARIMA":
+        return [(ordem, None) for ordem in ordens]
+    return [
+        (ordem, (P, D, Q, sazonalidade))
+        for ordem in ordens
+        for P in range(0, 2)
+        for D in range(0, 2)
+        for Q in range(0, 2)
+    ]
+
+def estimar_ajustes(candidatos, busca="exaustiva"):
+    """
+    Número aproximado de ajustes de uma busca sobre a grade: todos os candidatos na exaustiva e,
+    na stepwise, até AJUSTES_STEPWISE_POR_GRUPO em cada combinação de diferenciações (d, D).
+    """
+    if busca != "stepwise":
+        return len(candidatos)
+    grupos = {}
+    for ordem, ordem_sazonal in candidatos:
+        grupo = (ordem[1], ordem_sazonal[1] if ordem_sazonal else 0)
+        grupos[grupo] = grupos.get(grupo, 0) + 1
+    return sum(min(n, AJUSTES_STEPWISE_POR_GRUPO) for n in grupos.values())
+
+def buscar_ordem(tipo, serie_treino, serie_teste, candidatos, n_processos=None, busca="exaustiva",
+                 comparar_exaustiva=False, pasta_cache=cache_modelos.PASTA_CACHE, warm_start=False, sugestao=None):
+    """
+    Seleciona a estratégia de busca de ordens ('exaustiva' ou 'stepwise').
+    A sugestão de ordens dos correlogramas só orienta a busca stepwise; a exaustiva avalia toda a grade.
+    """
+    if busca == "exaustiva":
+        return buscar_melhor_ordem(tipo, serie_treino, serie_teste, candidatos, n_processos, pasta_cache,
+                                   warm_start)
+    if busca == "stepwise":
+        return buscar_stepwise(tipo, serie_treino, serie_teste, candidatos, n_processos, comparar_exaustiva,
+                               pasta_cache, warm_start, sugestao)
+    raise ValueError(f"Busca '{busca}' inválida. Use 'exaustiva' ou 'stepwise'.")
+
+@perfil.medir()
+def prever_modelo_final(tipo, serie_treino, serie_teste, ordem, ordem_sazonal=None, melhor=None):
+    """
+    Obtém o modelo final e suas previsões no horizonte de teste, alinhadas ao índice de teste.
+    Os parâmetros do candidato vencedor (ajustado na busca ou lido do cache) são reutilizados com uma
+    única passada do filtro de Kalman; o modelo só é otimizado novamente quando a busca não produziu um vencedor.
+
+    Returns:
+        tuple: Previsões (Series) e o resultado ajustado do statsmodels.
+    """
+    modelo = criar_modelo(tipo, serie_treino, ordem, ordem_sazonal)
+    if melhor is not None and melhor["params"] is not None:
+        print("♻️ Reutilizando os parâmetros do candidato vencedor, sem reajustar o modelo final.")
+        resultado_final = modelo.filter(melhor["params"])
+    else:
+        resultado_final = ajustar_modelo(modelo)
+
+    previsoes = resultado_final.forecast(steps=len(serie_teste))
+    previsoes.index = serie_teste.index
+    return previsoes, resultado_final
+
+@perfil.medir()
+def registrar_modelo_final(resultado_final, nome_modelo, granularidade, serie_treino, ordem, ordem_sazonal=None,
+                           melhor=None, serie_diferenciada=False, ultimo_nivel=None):
+    """
+    Salva o modelo final do statsmodels no registro de modelos, com os metadados do ajuste.
+    `ultimo_nivel` é o último preço (em nível) do treino, usado para reconstruir os níveis
+    quando o modelo foi ajustado sobre a série diferenciada.
+    """
+    registro_modelos.salvar_modelo(resultado_final, nome_modelo, granularidade, {
+        "ordem": list(ordem),
+        "ordem_sazonal": list(ordem_sazonal) if ordem_sazonal is not None else None,
+        "hash_treino": cache_modelos.impressao_serie(serie_treino),
+        "tempo_ajuste": melhor["tempo"] if melhor is not None else None,
+        "ultima_data": str(serie_treino.index[-1]),
+        "frequencia": serie_treino.index.freqstr,
+        "serie_diferenciada": serie_diferenciada,
+        "ultimo_nivel": ultimo_nivel
+    })
+
+@perfil.medir()
+def salvar_previsoes_busca(tipo, nome_modelo, granularidade, serie_teste, previsoes, resultados, metadados=None):
+    """
+    Salva no armazenamento de previsões a previsão final e as de todos os candidatos ajustados na busca,
+    com as métricas de cada candidato nos metadados.
+    """
+    candidatos, descricao = {}, {}
+    for resultado in resultados:
+        if resultado["previsoes"] is None:
+            continue
+        nome = descrever_candidato(tipo, resultado["ordem"], resultado["ordem_sazonal"])
+        candidatos[nome] = resultado["previsoes"]
+        descricao[nome] = {chave: resultado[chave] for chave in map(metricas.chave_metrica, metricas.METRICAS)}
+        descricao[nome].update(aic=resultado["aic"], cache=resultado["cache"])
+
+    banco_previsoes.salvar_previsoes(nome_modelo, granularidade, serie_teste.index, serie_teste,
+                                     previsoes.reindex(serie_teste.index), candidatos,
+                                     {**(metadados or {}), "candidatos": descricao})
+
+@perfil.medir()
+def ajustar_arima(train_data, test_data, nome_modelo="ARIMA", granularidade="mensal", n_processos=None,
+                  busca="exaustiva", comparar_exaustiva=False, pasta_cache=cache_modelos.PASTA_CACHE,
+                  warm_start=False, caminho_teste="dados_processados", usar_diagnosticos=True):
     """
     Ajusta o modelo ARIMA com detecção automática de diferenciação (d).
+    Com `usar_diagnosticos`, a estacionariedade vem do índice de diagnósticos dos dados processados
+    e a grade é reduzida às diferenciações compatíveis com ele.
     """
     if train_data is None or test_data is None:
         print("❌ Erro: Conjuntos de dados inválidos.")
         return
+    inicio_execucao = time.perf_counter()
 
     # Verificar se a série é estacionária
-    precisa_diff = not testar_estacionariedade(train_data["Preco_Medio"])
+    if usar_diagnosticos:
+        indice = carregar_diagnosticos(train_data["Preco_Medio"], granularidade, caminho_teste)
+        precisa_diff = not indice["diferencas"]["0"]["estacionaria"]
+    else:
+        precisa_diff = not testar_estacionariedade(train_data["Preco_Medio"])
+    ultimo_nivel = float(train_data["Preco_Medio"].iloc[-1])
 
     if precisa_diff:
         print("🔁 Aplicando diferenciação para tornar a série estacionária...")
-        train_data["Preco_Medio"] = train_data["Preco_Medio"].diff()
-        train_data.dropna(inplace=True)
+        train_data = train_data.assign(Preco_Medio=train_data["Preco_Medio"].diff()).dropna()
 
     melhor_p, melhor_d, melhor_q = 1, 1, 1
-    melhor_rmse = float("inf")
 
     print("\n🔍 Otimizando parâmetros para ARIMA...")
-    for p in range(0, 3):
-        for d in range(0, 2):
-            for q in range(0, 3):
-                try:
-                    modelo = ARIMA(train_data["Preco_Medio"], order=(p, d, q))
-                    resultado = modelo.fit()
-                    previsoes = resultado.forecast(steps=len(test_data))
-
-                    # Garantir o alinhamento do índice
-                    previsoes.index = test_data.index
-
-                    # Remover NaNs antes de calcular métricas
-                    previsoes.dropna(inplace=True)
-                    test_data_validado = test_data.loc[previsoes.index]
-
-                    rmse = np.sqrt(mean_squared_error(test_data_validado["Preco_Medio"], previsoes))
-
-                    if rmse < melhor_rmse:
-                        melhor_p, melhor_d, melhor_q = p, d, q
-                        melhor_rmse = rmse
-
-                except Exception as e:
-                    print(f"❌ Erro ao ajustar ARIMA({p},{d},{q}): {e}")
+    candidatos = grade_candidatos("ARIMA")
+    if usar_diagnosticos:
+        candidatos = podar_grade(candidatos, indice, precisa_diff)
+    # A sugestão dos correlogramas só orienta a busca stepwise
+    sugestao = sugerir_ordens(train_data["Preco_Medio"], granularidade=granularidade) if busca == "stepwise" else None
+    melhor, resultados = buscar_ordem("ARIMA", train_data["Preco_Medio"], test_data["Preco_Medio"],
+                                      candidatos, n_processos, busca, comparar_exaustiva, pasta_cache,
+                                      warm_start, sugestao)
+    if melhor is not None:
+        melhor_p, melhor_d, melhor_q = melhor["ordem"]
 
     print(f"✅ Melhor configuração para ARIMA: (p, d, q) = ({melhor_p}, {melhor_d}, {melhor_q})")
 
-    # Ajustar o modelo final
-    modelo_final = ARIMA(train_data["Preco_Medio"], order=(melhor_p, melhor_d, melhor_q))
-    resultado_final = modelo_final.fit()
+    # Modelo final: reutiliza o ajuste do vencedor da busca (ou do cache) e salva no registro
+    previsoes, resultado_final = prever_modelo_final("ARIMA", train_data["Preco_Medio"], test_data["Preco_Medio"],
+                                                     (melhor_p, melhor_d, melhor_q), None, melhor)
+    registrar_modelo_final(resultado_final, nome_modelo, granularidade, train_data["Preco_Medio"],
+                           (melhor_p, melhor_d, melhor_q), None, melhor, precisa_diff, ultimo_nivel)
 
-    # Fazer previsões e alinhar índice
-    previsoes = resultado_final.forecast(steps=len(test_data))
-    previsoes.index = test_data.index
+    # Calcular métricas (pontos com NaN são ignorados pela máscara, sem alinhar índices)
+    desempenho = metricas.calcular_metricas(previsoes.to_numpy(), test_data["Preco_Medio"].to_numpy(),
+                                            train_data["Preco_Medio"])
+    mae, rmse, r2 = desempenho["MAE"], desempenho["RMSE"], desempenho["R²"]
 
     # Remover valores ausentes
     previsoes.dropna(inplace=True)
-    test_data_validado = test_data.loc[previsoes.index]
-
-    # Calcular métricas
-    mae = mean_absolute_error(test_data_validado["Preco_Medio"], previsoes)
-    rmse = np.sqrt(mean_squared_error(test_data_validado["Preco_Medio"], previsoes))
-    r2 = r2_score(test_data_validado["Preco_Medio"], previsoes)
 
     # Salvar métricas e previsões
-    helper.salvar_metricas_em_csv(nome_modelo, mae, rmse, r2, granularidade)
-    helper.salva_previsao_csv(nome_modelo.lower(), previsoes.values, granularidade)
-
-    print(f"📊 {nome_modelo} - MAE: {mae:.4f}, RMSE: {rmse:.4f}, R²: {r2:.4f}")
+    helper.salvar_metricas(nome_modelo, mae, rmse, r2, granularidade, metricas_extras=desempenho,
+                           tempo=time.perf_counter() - inicio_execucao,
+                           metadados={"ordem": (melhor_p, melhor_d, melhor_q), "busca": busca,
+                                      "candidatos": len(resultados), "n_processos": n_processos})
+    helper.salva_previsao_csv(nome_modelo.lower(), previsoes.values, granularidade, test_data.loc[previsoes.index])
+    salvar_previsoes_busca("ARIMA", nome_modelo, granularidade, test_data["Preco_Medio"], previsoes, resultados,
+                           {"ordem": (melhor_p, melhor_d, melhor_q)})
+
+    print(f"📊 {nome_modelo} - {metricas.formatar_metricas(desempenho)}")
     print(f"📁 Previsões salvas em 'resultados/{nome_modelo.lower()}_predictions.csv'.")
 
-def executar_arima(caminho_teste="dados_processados", granularidade="mensal"):
+    return {
+        "ordem": (melhor_p, melhor_d, melhor_q),
+        **{metricas.chave_metrica(nome): valor for nome, valor in desempenho.items()},
+        "candidatos": resultados
+    }
+
+@perfil.medir()
+def executar_arima(caminho_teste="dados_processados", granularidade="mensal", n_processos=None, busca="exaustiva"):
     """
     Executa o pipeline completo do modelo ARIMA para a granularidade especificada.
+    A grade de parâmetros é avaliada com `n_processos` processos (None = um por núcleo), de forma
+    exaustiva ou stepwise (`busca`).
     """
     print(f"\n🚀 Executando ARIMA com otimização de parâmetros para granularidade {granularidade}...")
 
-    train_data, test_data = carregar_dados(caminho_teste, granularidade)
-    # Aplicar tratamento (escolha o método desejado: 'interpolacao', 'ffill' ou 'drop')
-    train_data, test_data = helper.tratar_nans(train_data, test_data, metodo="interpolacao")
-    ajustar_arima(train_data, test_data, "ARIMA", granularidade)
+    # Valores ausentes já tratados na leitura (escolha o método desejado: 'interpolacao', 'ffill' ou 'drop')
+    train_data, test_data = carregar_dados(caminho_teste, granularidade, metodo_nan="interpolacao")
+    return ajustar_arima(train_data, test_data, "ARIMA", granularidade, n_processos, busca,
+                         caminho_teste=caminho_teste)
 
-def ajustar_sarima(train_data, test_data, nome_modelo="SARIMA", granularidade="mensal"):
+@perfil.medir()
+def ajustar_sarima(train_data, test_data, nome_modelo="SARIMA", granularidade="mensal", n_processos=None,
+                   busca="exaustiva", comparar_exaustiva=False, pasta_cache=cache_modelos.PASTA_CACHE,
+                   warm_start=False, caminho_teste="dados_processados", usar_diagnosticos=True):
     """
     Ajusta o modelo SARIMA com detecção automática de diferenciação (d) e sazonalidade (s).
+    Com `usar_diagnosticos`, a estacionariedade vem do índice de diagnósticos dos dados processados
+    e a grade é reduzida às diferenciações e ordens sazonais compatíveis com ele.
+    Os valores ausentes já devem estar tratados (como em `carregar_dados`).
     """
     if train_data is None or test_data is None:
         print("❌ Erro: Conjuntos de dados inválidos.")
         return
-
-    # Validar se há valores ausentes
-    train_data, test_data = helper.tratar_nans(train_data, test_data, metodo="interpolacao")
+    inicio_execucao = time.perf_counter()
 
     # Detectar a sazonalidade com base na granularidade
-    sazonalidade = {"diaria": 7, "semanal": 52, "mensal": 12}.get(granularidade, 12)
+    sazonalidade = diagnosticos.SAZONALIDADES.get(granularidade, 12)
 
     # Verificar se a série é estacionária
-    precisa_diff = not testar_estacionariedade(train_data["Preco_Medio"])
+    if usar_diagnosticos:
+        indice = carregar_diagnosticos(train_data["Preco_Medio"], granularidade, caminho_teste)
+        precisa_diff = not indice["diferencas"]["0"]["estacionaria"]
+    else:
+        precisa_diff = not testar_estacionariedade(train_data["Preco_Medio"])
+    ultimo_nivel = float(train_data["Preco_Medio"].iloc[-1])
 
     if precisa_diff:
         print("🔁 Aplicando diferenciação para tornar a série estacionária...")
-        train_data["Preco_Medio"] = train_data["Preco_Medio"].diff().dropna()
+        train_data = train_data.assign(Preco_Medio=train_data["Preco_Medio"].diff())
 
     melhor_p, melhor_d, melhor_q = 1, 1, 1
     melhor_P, melhor_D, melhor_Q = 0, 0, 0
-    melhor_rmse = float("inf")
 
     print("\n🔍 Otimizando parâmetros para SARIMA...")
-    for p in range(0, 3):
-        for d in range(0, 2):
-            for q in range(0, 3):
-                for P in range(0, 2):
-                    for D in range(0, 2):
-                        for Q in range(0, 2):
-                            try:
-                                modelo = SARIMAX(
-                                    train_data["Preco_Medio"],
-                                    order=(p, d, q),
-                                    seasonal_order=(P, D, Q, sazonalidade),
-                                    enforce_stationarity=False,
-                                    enforce_invertibility=False
-                                )
-                                resultado = modelo.fit(disp=False)
-                                previsoes = resultado.forecast(steps=len(test_data))
-
-                                # Alinhar índice
-                                previsoes.index = test_data.index
-
-                                # Remover NaNs para calcular métricas corretamente
-                                previsoes.dropna(inplace=True)
-                                test_data_validado = test_data.loc[previsoes.index]
-
-                                rmse = np.sqrt(mean_squared_error(test_data_validado["Preco_Medio"], previsoes))
-
-                                if rmse < melhor_rmse:
-                                    melhor_p, melhor_d, melhor_q = p, d, q
-                                    melhor_P, melhor_D, melhor_Q = P, D, Q
-                                    melhor_rmse = rmse
-
-                            except Exception as e:
-                                print(f"❌ Erro ao ajustar SARIMA({p},{d},{q})x({P},{D},{Q},{sazonalidade}): {e}")
+    candidatos = grade_candidatos("SARIMA", sazonalidade)
+    if usar_diagnosticos:
+        candidatos = podar_grade(candidatos, indice, precisa_diff, sazonalidade)
+    # A sugestão dos correlogramas só orienta a busca stepwise
+    sugestao = (sugerir_ordens(train_data["Preco_Medio"], sazonalidade, granularidade=granularidade)
+                if busca == "stepwise" else None)
+    melhor, resultados = buscar_ordem("SARIMA", train_data["Preco_Medio"], test_data["Preco_Medio"],
+                                      candidatos, n_processos, busca, comparar_exaustiva, pasta_cache,
+                                      warm_start, sugestao)
+    if melhor is not None:
+        melhor_p, melhor_d, melhor_q = melhor["ordem"]
+        melhor_P, melhor_D, melhor_Q, _ = melhor["ordem_sazonal"]
 
     print(f"✅ Melhor configuração para SARIMA: (p, d, q) = ({melhor_p}, {melhor_d}, {melhor_q}) | (P, D, Q, s) = ({melhor_P}, {melhor_D}, {melhor_Q}, {sazonalidade})")
 
-    # Ajustar o modelo final
-    modelo_final = SARIMAX(
-        train_data["Preco_Medio"],
-        order=(melhor_p, melhor_d, melhor_q),
-        seasonal_order=(melhor_P, melhor_D, melhor_Q, sazonalidade),
-        enforce_stationarity=False,
-        enforce_invertibility=False
-    )
-    resultado_final = modelo_final.fit(disp=False)
+    # Modelo final: reutiliza o ajuste do vencedor da busca (ou do cache) e salva no registro
+    ordem_sazonal = (melhor_P, melhor_D, melhor_Q, sazonalidade)
+    previsoes, resultado_final = prever_modelo_final("SARIMA", train_data["Preco_Medio"], test_data["Preco_Medio"],
+                                                     (melhor_p, melhor_d, melhor_q), ordem_sazonal, melhor)
+    registrar_modelo_final(resultado_final, nome_modelo, granularidade, train_data["Preco_Medio"],
+                           (melhor_p, melhor_d, melhor_q), ordem_sazonal, melhor, precisa_diff, ultimo_nivel)
 
-    # Fazer previsões e alinhar índice
-    previsoes = resultado_final.forecast(steps=len(test_data))
-    previsoes.index = test_data.index
+    # Calcular métricas (pontos com NaN são ignorados pela máscara, sem alinhar índices)
+    desempenho = metricas.calcular_metricas(previsoes.to_numpy(), test_data["Preco_Medio"].to_numpy(),
+                                            train_data["Preco_Medio"])
+    mae, rmse, r2 = desempenho["MAE"], desempenho["RMSE"], desempenho["R²"]
 
     # Remover valores ausentes
     previsoes.dropna(inplace=True)
-    test_data_validado = test_data.loc[previsoes.index]
-
-    # Calcular métricas
-    mae = mean_absolute_error(test_data_validado["Preco_Medio"], previsoes)
-    rmse = np.sqrt(mean_squared_error(test_data_validado["Preco_Medio"], previsoes))
-    r2 = r2_score(test_data_validado["Preco_Medio"], previsoes)
 
     # Salvar métricas e previsões
-    helper.salvar_metricas_em_csv(nome_modelo, mae, rmse, r2, granularidade)
-    helper.salva_previsao_csv(nome_modelo.lower(), previsoes.values, granularidade)
-
-    print(f"📊 {nome_modelo} - MAE: {mae:.4f}, RMSE: {rmse:.4f}, R²: {r2:.4f}")
+    helper.salvar_metricas(nome_modelo, mae, rmse, r2, granularidade, metricas_extras=desempenho,
+                           tempo=time.perf_counter() - inicio_execucao,
+                           metadados={"ordem": (melhor_p, melhor_d, melhor_q), "ordem_sazonal": ordem_sazonal,
+                                      "busca": busca, "candidatos": len(resultados), "n_processos": n_processos})
+    helper.salva_previsao_csv(nome_modelo.lower(), previsoes.values, granularidade, test_data.loc[previsoes.index])
+    salvar_previsoes_busca("SARIMA", nome_modelo, granularidade, test_data["Preco_Medio"], previsoes, resultados,
+                           {"ordem": (melhor_p, melhor_d, melhor_q), "ordem_sazonal": ordem_sazonal})
+
+    print(f"📊 {nome_modelo} - {metricas.formatar_metricas(desempenho)}")
     print(f"📁 Previsões salvas em 'resultados/{nome_modelo.lower()}_predictions.csv'.")
 
-def executar_sarima(caminho_teste="dados_processados", granularidade="mensal"):
+    return {
+        "ordem": (melhor_p, melhor_d, melhor_q),
+        "ordem_sazonal": (melhor_P, melhor_D, melhor_Q, sazonalidade),
+        **{metricas.chave_metrica(nome): valor for nome, valor in desempenho.items()},
+        "candidatos": resultados
+    }
+
+@perfil.medir()
+def executar_sarima(caminho_teste="dados_processados", granularidade="mensal", n_processos=None, busca="exaustiva"):
     """
     Executa o pipeline completo do modelo SARIMA para a granularidade especificada.
+    A grade de parâmetros é avaliada com `n_processos` processos (None = um por núcleo), de forma
+    exaustiva ou stepwise (`busca`).
     """
     print(f"\n🚀 Executando SARIMA com otimização de parâmetros para granularidade {granularidade}...")
 
-    train_data, test_data = carregar_dados(caminho_teste, granularidade)
+    # Valores ausentes já tratados na leitura
+    train_data, test_data = carregar_dados(caminho_teste, granularidade, metodo_nan="interpolacao")
 
-    # Tratar valores ausentes nos conjuntos de dados
-    train_data, test_data = helper.tratar_nans(train_data, test_data, metodo="interpolacao")
+    return ajustar_sarima(train_data, test_data, "SARIMA", granularidade, n_processos, busca,
+                          caminho_teste=caminho_teste)
 
-    ajustar_sarima(train_data, test_data, "SARIMA", granularidade)
+def parametros_prophet(modelo):
+    """
+    Extrai os parâmetros ajustados de um modelo Prophet no formato aceito por `fit(init=...)`.
+    """
+    parametros = {nome: modelo.params[nome][0][0] for nome in ["k", "m", "sigma_obs"]}
+    parametros.update({nome: modelo.params[nome][0] for nome in ["delta", "beta"]})
+    return parametros
 
-def ajustar_prophet(train_data, test_data, nome_modelo="Prophet", granularidade="mensal"):
+def inicializacao_prophet(train_data_prophet, nome_modelo, granularidade, sazonalidade,
+                          pasta_registro=registro_modelos.PASTA_REGISTRO):
+    """
+    Busca no registro o Prophet ajustado anteriormente e devolve seus parâmetros como ponto de partida,
+    desde que o histórico usado naquele ajuste seja um prefixo dos dados de treino atuais (os dados
+    apenas cresceram) e a configuração de sazonalidade seja a mesma. Caso contrário, retorna None.
+    """
+    try:
+        anterior, metadados = registro_modelos.carregar_modelo(nome_modelo, granularidade, pasta_registro)
+    except (KeyError, OSError):
+        return None
+    if metadados.get("formato") != "prophet" or metadados.get("sazonalidade") != sazonalidade:
+        return None
+
+    historico = anterior.history
+    if len(historico) > len(train_data_prophet):
+        return None
+    prefixo = train_data_prophet.iloc[:len(historico)]
+    if not (np.array_equal(historico["ds"].to_numpy(), prefixo["ds"].to_numpy())
+            and np.allclose(historico["y"].to_numpy(), prefixo["y"].to_numpy())):
+        return None
+
+    return parametros_prophet(anterior)
+
+@perfil.medir()
+def ajustar_prophet(train_data, test_data, nome_modelo="Prophet", granularidade="mensal", rapido=False,
+                    amostras_incerteza=None, warm_start=False, pasta_registro=registro_modelos.PASTA_REGISTRO):
     """
     Ajusta o modelo Prophet e realiza previsões.
+    Os valores ausentes já devem estar tratados (como em `carregar_dados`).
+
+    Args:
+        rapido (bool): Prevê apenas as datas de teste e desativa a amostragem dos intervalos de incerteza.
+        amostras_incerteza (int): Número de amostras dos intervalos de incerteza (0 = sem intervalos).
+            Se None, usa o padrão do Prophet, ou 0 no modo rápido.
+        warm_start (bool): Parte dos parâmetros do Prophet salvo no registro quando os dados de treino
+            apenas cresceram desde aquele ajuste.
     """
     if train_data is None or test_data is None:
         print("❌ Erro: Conjuntos de dados inválidos.")
         return
-
-    # Tratar valores ausentes
-    train_data, test_data = helper.tratar_nans(train_data, test_data, metodo="interpolacao")
+    inicio_execucao = time.perf_counter()
 
     # Preparar os dados para o Prophet (colunas 'ds' e 'y')
     train_data_prophet = train_data.reset_index().rename(columns={"Data": "ds", "Preco_Medio": "y"})
@@ -277,51 +878,99 @@ def ajustar_prophet(train_data, test_data, nome_modelo="Prophet", granularidade=
 
     # Inicializar o modelo Prophet com sazonalidade
     print(f"\n🚀 Treinando o modelo {nome_modelo} com sazonalidade: {sazonalidade}...")
-    modelo = Prophet()
+    if amostras_incerteza is None and rapido:
+        amostras_incerteza = 0
+    from prophet import Prophet  # Importado sob demanda: as execuções de ARIMA/SARIMA não o carregam
+
+    modelo = Prophet() if amostras_incerteza is None else Prophet(uncertainty_samples=amostras_incerteza)
 
     if sazonalidade == "weekly":
         modelo.add_seasonality(name="weekly", period=7, fourier_order=3)
     elif sazonalidade == "monthly":
         modelo.add_seasonality(name="monthly", period=30.5, fourier_order=5)
 
+    inicializacao = None
+    if warm_start:
+        inicializacao = inicializacao_prophet(train_data_prophet, nome_modelo, granularidade, sazonalidade,
+                                              pasta_registro)
+        if inicializacao is not None:
+            print("♻️ Partindo dos parâmetros do Prophet salvo no registro.")
+
     # Ajustar o modelo
-    modelo.fit(train_data_prophet)
+    inicio = time.perf_counter()
+    if inicializacao is not None:
+        modelo.fit(train_data_prophet, init=inicializacao)
+    else:
+        modelo.fit(train_data_prophet)
+    tempo_ajuste = time.perf_counter() - inicio
+    perfil.registrar("prophet:fit", inicio, tempo_ajuste, warm_start=inicializacao is not None)
 
     # Realizar previsões
-    futuro = modelo.make_future_dataframe(periods=len(test_data), freq=test_data.index.freqstr)
-    previsoes = modelo.predict(futuro)
-
-    # Ajustar previsões ao intervalo do conjunto de teste usando reindex
-    previsoes = previsoes.set_index("ds").reindex(test_data_prophet["ds"])["yhat"]
+    inicio = time.perf_counter()
+    if rapido:
+        # Somente o horizonte de teste
+        previsoes = modelo.predict(test_data_prophet[["ds"]]).set_index("ds")["yhat"]
+    else:
+        futuro = modelo.make_future_dataframe(periods=len(test_data), freq=test_data.index.freqstr)
+        previsoes = modelo.predict(futuro)
+
+        # Ajustar previsões ao intervalo do conjunto de teste usando reindex
+        previsoes = previsoes.set_index("ds").reindex(test_data_prophet["ds"])["yhat"]
+    tempo_previsao = time.perf_counter() - inicio
+    perfil.registrar("prophet:predict", inicio, tempo_previsao, pontos=len(test_data))
+    print(f"⏱️ {nome_modelo}: ajuste em {tempo_ajuste:.2f}s, previsão em {tempo_previsao:.2f}s")
+
+    # Calcular métricas de desempenho (pontos com NaN são ignorados pela máscara)
+    desempenho = metricas.calcular_metricas(previsoes.to_numpy(), test_data["Preco_Medio"].to_numpy(),
+                                            train_data["Preco_Medio"])
+    mae, rmse, r2 = desempenho["MAE"], desempenho["RMSE"], desempenho["R²"]
 
     # Remover valores ausentes
     previsoes.dropna(inplace=True)
-    test_data_validado = test_data.loc[previsoes.index]
-
-    # Calcular métricas de desempenho
-    mae = mean_absolute_error(test_data_validado["Preco_Medio"], previsoes)
-    rmse = np.sqrt(mean_squared_error(test_data_validado["Preco_Medio"], previsoes))
-    r2 = r2_score(test_data_validado["Preco_Medio"], previsoes)
 
     # Salvar métricas e previsões
-    helper.salvar_metricas_em_csv(nome_modelo, mae, rmse, r2, granularidade)
-    helper.salva_previsao_csv(nome_modelo.lower(), previsoes.values, granularidade)
-
-    print(f"📊 {nome_modelo} - MAE: {mae:.4f}, RMSE: {rmse:.4f}, R²: {r2:.4f}")
+    helper.salvar_metricas(nome_modelo, mae, rmse, r2, granularidade, metricas_extras=desempenho,
+                           tempo=time.perf_counter() - inicio_execucao,
+                           metadados={"tempo_ajuste": tempo_ajuste, "tempo_previsao": tempo_previsao, "rapido": rapido,
+                                      "warm_start": inicializacao is not None})
+    helper.salva_previsao_csv(nome_modelo.lower(), previsoes.values, granularidade, test_data.loc[previsoes.index])
+    banco_previsoes.salvar_previsoes(nome_modelo, granularidade, test_data.index, test_data["Preco_Medio"],
+                                     previsoes.reindex(test_data.index), metadados={"sazonalidade": sazonalidade})
+
+    # Salvar o modelo ajustado no registro
+    registro_modelos.salvar_modelo(modelo, nome_modelo, granularidade, {
+        "sazonalidade": sazonalidade,
+        "hash_treino": cache_modelos.impressao_serie(train_data["Preco_Medio"]),
+        "tempo_ajuste": tempo_ajuste,
+        "tempo_previsao": tempo_previsao,
+        "warm_start": inicializacao is not None,
+        "ultima_data": str(train_data.index[-1]),
+        "frequencia": test_data.index.freqstr
+    }, pasta_registro)
+
+    print(f"📊 {nome_modelo} - {metricas.formatar_metricas(desempenho)}")
     print(f"📁 Previsões salvas em 'resultados/{nome_modelo.lower()}_predictions.csv'.")
 
-def executar_prophet(caminho_teste="dados_processados", granularidade="mensal"):
+    return {
+        **{metricas.chave_metrica(nome): valor for nome, valor in desempenho.items()},
+        "tempo_ajuste": tempo_ajuste,
+        "tempo_previsao": tempo_previsao,
+        "warm_start": inicializacao is not None
+    }
+
+@perfil.medir()
+def executar_prophet(caminho_teste="dados_processados", granularidade="mensal", rapido=False,
+                     amostras_incerteza=None, warm_start=False):
     """
     Executa o pipeline completo do modelo Prophet para a granularidade especificada.
+    No modo `rapido`, apenas o horizonte de teste é previsto e os intervalos de incerteza não são amostrados.
     """
     print(f"\n🚀 Executando Prophet para granularidade {granularidade}...")
 
-    train_data, test_data = carregar_dados(caminho_teste, granularidade)
-
-    # Tratar valores ausentes nos conjuntos de dados
-    train_data, test_data = helper.tratar_nans(train_data, test_data, metodo="interpolacao")
+    # Valores ausentes já tratados na leitura
+    train_data, test_data = carregar_dados(caminho_teste, granularidade, metodo_nan="interpolacao")
 
-    ajustar_prophet(train_data, test_data, "Prophet", granularidade)
+    return ajustar_prophet(train_data, test_data, "Prophet", granularidade, rapido, amostras_incerteza, warm_start)
 
 def diagnosticar_dados(train_data, test_data):
     print("\n📊 Diagnóstico dos Dados\n")
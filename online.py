@@ -0,0 +1,224 @@
+# online.py
+import argparse
+import json
+import os
+import time
+from datetime import datetime
+import numpy as np
+import pandas as pd
+import registro_modelos
+
+ARQUIVO_FILA = "fila_reestimacao.json"
+ALFA_MONITOR = 0.1      # Peso das observações novas nas médias móveis exponenciais dos erros
+LIMITE_VIES = 1.0       # |média móvel do erro padronizado| acima disto indica deriva
+LIMITE_VARIANCIA = 4.0  # Média móvel do erro padronizado ao quadrado acima disto indica erro excessivo
+
+def carregar_fila(pasta_registro=registro_modelos.PASTA_REGISTRO):
+    """
+    Carrega a fila de pedidos de reestimação completa (busca de parâmetros).
+    """
+    caminho = os.path.join(pasta_registro, ARQUIVO_FILA)
+    if not os.path.exists(caminho):
+        return []
+    with open(caminho, encoding="utf-8") as f:
+        return json.load(f)
+
+def _salvar_fila(fila, pasta_registro):
+    os.makedirs(pasta_registro, exist_ok=True)
+    caminho = os.path.join(pasta_registro, ARQUIVO_FILA)
+    temporario = f"{caminho}.{os.getpid()}.tmp"
+    with open(temporario, "w", encoding="utf-8") as f:
+        json.dump(fila, f, indent=2, ensure_ascii=False)
+    os.replace(temporario, caminho)
+
+def agendar_reestimacao(nome_modelo, granularidade, motivo, pasta_registro=registro_modelos.PASTA_REGISTRO):
+    """
+    Registra um pedido de reestimação completa do modelo. Pedidos repetidos para o mesmo
+    modelo e granularidade são mantidos como um único pedido (o mais recente).
+    """
+    fila = [
+        pedido for pedido in carregar_fila(pasta_registro)
+        if (pedido["modelo"], pedido["granularidade"]) != (nome_modelo, granularidade)
+    ]
+    fila.append({
+        "modelo": nome_modelo,
+        "granularidade": granularidade,
+        "motivo": motivo,
+        "solicitado_em": datetime.now().isoformat(timespec="seconds")
+    })
+    _salvar_fila(fila, pasta_registro)
+    print(f"📌 Reestimação do {nome_modelo}_{granularidade} agendada: {motivo}")
+
+def processar_fila(caminho_teste="dados_processados", pasta_registro=registro_modelos.PASTA_REGISTRO):
+    """
+    Executa as reestimações pendentes (busca de parâmetros completa) e remove da fila as concluídas.
+    Os dados processados devem ter sido atualizados antes (ex.: `dados.atualizar_dados`).
+    """
+    import modelos
+
+    executores = {"ARIMA": modelos.executar_arima, "SARIMA": modelos.executar_sarima}
+    pendentes = []
+    for pedido in carregar_fila(pasta_registro):
+        executar = executores.get(pedido["modelo"])
+        if executar is None or executar(caminho_teste, pedido["granularidade"]) is None:
+            pendentes.append(pedido)
+    _salvar_fila(pendentes, pasta_registro)
+    return pendentes
+
+def preparar_observacoes(novas_observacoes, metadados):
+    """
+    Alinha as observações novas à frequência do modelo, a partir do período seguinte ao último
+    já incorporado. Períodos sem coleta são interpolados e, se o modelo foi ajustado sobre a
+    série diferenciada, as observações são convertidas em variações.
+
+    Args:
+        novas_observacoes (Series ou DataFrame): Preços em nível, indexados pela data
+            (ou DataFrame com colunas 'Data' e 'Preco_Medio').
+        metadados (dict): Metadados do modelo no registro.
+
+    Returns:
+        tuple: Série para o filtro de Kalman e série dos preços em nível.
+    """
+    if isinstance(novas_observacoes, pd.DataFrame):
+        novas_observacoes = novas_observacoes.set_index("Data")["Preco_Medio"]
+    novas_observacoes = novas_observacoes.copy()
+    novas_observacoes.index = pd.to_datetime(novas_observacoes.index)
+
+    ultima_data = pd.Timestamp(metadados["ultima_data"])
+    novas_observacoes = novas_observacoes[novas_observacoes.index > ultima_data].sort_index()
+    if novas_observacoes.empty:
+        return None, None
+
+    ultimo_nivel = metadados.get("ultimo_nivel")
+    inicio = pd.Series([np.nan if ultimo_nivel is None else ultimo_nivel], index=[ultima_data])
+    niveis = pd.concat([inicio, novas_observacoes]).asfreq(metadados["frequencia"]).interpolate(method="linear")
+
+    if metadados.get("serie_diferenciada"):
+        return niveis.diff().iloc[1:], niveis.iloc[1:]
+    return niveis.iloc[1:], niveis.iloc[1:]
+
+def atualizar_monitor(monitor, erros_padronizados, alfa=ALFA_MONITOR):
+    """
+    Atualiza as médias móveis exponenciais do erro padronizado (viés) e do seu quadrado (variância).
+    """
+    vies = monitor.get("vies", 0.0)
+    variancia = monitor.get("variancia", 1.0)
+    for erro in erros_padronizados[~np.isnan(erros_padronizados)]:
+        vies = (1 - alfa) * vies + alfa * erro
+        variancia = (1 - alfa) * variancia + alfa * erro ** 2
+    return {
+        "vies": float(vies),
+        "variancia": float(variancia),
+        "observacoes": monitor.get("observacoes", 0) + len(erros_padronizados)
+    }
+
+def atualizar_previsao(nome_modelo, granularidade, novas_observacoes, horizonte=None,
+                       pasta_registro=registro_modelos.PASTA_REGISTRO, limite_vies=LIMITE_VIES,
+                       limite_variancia=LIMITE_VARIANCIA):
+    """
+    Incorpora observações novas a um modelo do registro por meio de uma atualização do filtro de
+    Kalman (parâmetros fixos, sem reajuste) e devolve imediatamente a previsão atualizada.
+    O modelo atualizado é salvo no registro. Se os erros de previsão um passo à frente indicarem
+    deriva ou erro excessivo, uma reestimação completa é agendada.
+
+    Args:
+        nome_modelo (str): 'ARIMA' ou 'SARIMA'.
+        granularidade (str): Granularidade do modelo ('mensal', 'semanal' ou 'diaria').
+        novas_observacoes (Series ou DataFrame): Preços novos em nível, indexados pela data.
+        horizonte (int): Número de períodos a prever (padrão: 1).
+        pasta_registro (str): Diretório do registro de modelos.
+        limite_vies (float): Limite da média móvel do erro padronizado.
+        limite_variancia (float): Limite da média móvel do erro padronizado ao quadrado.
+
+    Returns:
+        DataFrame: Colunas 'Data' e 'Previsao' (em nível), ou None se não houver o que atualizar.
+    """
+    inicio = time.perf_counter()
+    resultado, metadados = registro_modelos.carregar_modelo(nome_modelo, granularidade, pasta_registro)
+
+    if metadados["formato"] != "statsmodels":
+        print(f"❌ Atualização online não disponível para {nome_modelo}: o modelo precisa ser reajustado.")
+        return None
+    if metadados.get("serie_diferenciada") and metadados.get("ultimo_nivel") is None:
+        print(f"❌ O registro do {nome_modelo}_{granularidade} não tem o último nível da série. "
+              "Execute o modelo novamente antes de usar a atualização online.")
+        return None
+
+    observacoes, niveis = preparar_observacoes(novas_observacoes, metadados)
+    if observacoes is None:
+        print("✅ Nenhuma observação nova após a última data do modelo.")
+        return None
+
+    # Atualização do estado: apenas o filtro de Kalman é executado sobre as observações novas
+    resultado = resultado.extend(observacoes)
+    erros = resultado.forecasts_error[0]
+    variancias = resultado.forecasts_error_cov[0, 0]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        erros_padronizados = erros / np.sqrt(variancias)
+
+    monitor = atualizar_monitor(metadados.get("monitor", {}), erros_padronizados)
+    metadados = {
+        **metadados,
+        "ultima_data": str(observacoes.index[-1]),
+        "ultimo_nivel": float(niveis.iloc[-1]),
+        "monitor": monitor,
+        "atualizado_online_em": datetime.now().isoformat(timespec="seconds")
+    }
+    registro_modelos.salvar_modelo(resultado, nome_modelo, granularidade, metadados, pasta_registro)
+
+    if abs(monitor["vies"]) > limite_vies:
+        agendar_reestimacao(nome_modelo, granularidade,
+                            f"deriva: média móvel do erro padronizado {monitor['vies']:.2f}", pasta_registro)
+    elif monitor["variancia"] > limite_variancia:
+        agendar_reestimacao(nome_modelo, granularidade,
+                            f"erro excessivo: média móvel do erro padronizado² {monitor['variancia']:.2f}",
+                            pasta_registro)
+
+    previsao = resultado.forecast(steps=horizonte or 1)
+    valores = registro_modelos.reconstruir_niveis(previsao.to_numpy(), metadados)
+
+    print(f"⚡ {len(observacoes)} observações incorporadas ao {nome_modelo}_{granularidade} em "
+          f"{(time.perf_counter() - inicio) * 1000:.1f} ms")
+    return pd.DataFrame({"Data": previsao.index, "Previsao": valores})
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(
+        description="Incorpora os preços novos aos modelos do registro e executa as reestimações pendentes.")
+    parser.add_argument("--modelo", nargs="+", choices=["ARIMA", "SARIMA"], default=["ARIMA"])
+    parser.add_argument("--granularidade", choices=["mensal", "semanal", "diaria"], default="diaria")
+    parser.add_argument("--horizonte", type=int, default=1, help="Períodos previstos após a atualização")
+    parser.add_argument("--dados", default="dados_processados", help="Diretório dos dados processados")
+    parser.add_argument("--arquivos", default="../data/ca-*.csv", help="Arquivos de origem (ca-*.csv)")
+    args = parser.parse_args(argumentos)
+
+    import conjuntos_dados
+    from main import verificar_dados_processados
+    from dados import atualizar_dados
+
+    # Arquivos novos ou alterados são incorporados de forma incremental aos dados processados
+    if not verificar_dados_processados(args.dados, args.arquivos):
+        print("🔄 Atualizando os dados...\n")
+        atualizar_dados(args.arquivos, args.dados)
+
+    serie = conjuntos_dados.obter_serie(args.dados, args.granularidade)
+    if serie is None:
+        print(f"❌ Erro: Arquivos não encontrados para a granularidade {args.granularidade}.")
+        return 1
+
+    for nome_modelo in args.modelo:
+        try:
+            previsao = atualizar_previsao(nome_modelo, args.granularidade, serie["Preco_Medio"], args.horizonte)
+        except KeyError as erro:
+            print(f"❌ {erro.args[0]}")
+            continue
+        if previsao is not None:
+            print(previsao.to_string(index=False))
+
+    # As reestimações agendadas (agora ou em execuções anteriores) são executadas em seguida
+    pendentes = processar_fila(args.dados)
+    if pendentes:
+        print(f"⚠️ {len(pendentes)} reestimação(ões) continuam pendentes em '{ARQUIVO_FILA}'.")
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,244 @@
+# painel.py
+import argparse
+import json
+import os
+import time
+from functools import partial
+import numpy as np
+import pandas as pd
+from dados import FORMATO_DATA, GRANULARIDADES, TAMANHO_BLOCO, listar_arquivos, mapear_arquivos
+
+# Chaves que identificam cada série do painel, por nível de agregação
+NIVEIS = {
+    "nacional": ["Produto"],
+    "estado": ["Produto", "Estado - Sigla"],
+    "municipio": ["Produto", "Estado - Sigla", "Municipio"]
+}
+PASTA_PAINEL = "painel"
+ARQUIVO_INDICE = "indice.json"
+# Rótulo das coletas sem produto, estado ou município: formam uma série própria, identificada
+ROTULO_AUSENTE = "NAO INFORMADO"
+
+def reduzir_arquivo_painel(arquivo, nivel="estado", tamanho_bloco=TAMANHO_BLOCO):
+    """
+    Reduz um arquivo ca-*.csv a pares (soma, contagem) por série e por dia, para todos os produtos,
+    lendo o arquivo em blocos.
+
+    Args:
+        arquivo (str): Caminho do arquivo CSV.
+        nivel (str): Nível de agregação ('nacional', 'estado' ou 'municipio').
+        tamanho_bloco (int): Número de linhas lidas por bloco.
+
+    Returns:
+        tuple: DataFrame (chaves, 'Dia', 'Soma', 'Contagem'), número de linhas e tempo em segundos.
+    """
+    inicio = time.perf_counter()
+    chaves = NIVEIS[nivel]
+    tipos = {chave: "category" for chave in chaves}
+    tipos.update({"Data da Coleta": "str", "Valor de Venda": "float64"})
+
+    parciais = []
+    linhas = 0
+    with pd.read_csv(
+        arquivo,
+        delimiter=';',
+        usecols=list(tipos),
+        dtype=tipos,
+        decimal=',',
+        chunksize=tamanho_bloco
+    ) as leitor:
+        for bloco in leitor:
+            linhas += len(bloco)
+            for chave in chaves:
+                if bloco[chave].isna().any():
+                    if ROTULO_AUSENTE not in bloco[chave].cat.categories:
+                        bloco[chave] = bloco[chave].cat.add_categories([ROTULO_AUSENTE])
+                    bloco[chave] = bloco[chave].fillna(ROTULO_AUSENTE)
+            bloco['Dia'] = pd.to_datetime(bloco['Data da Coleta'], format=FORMATO_DATA, errors='coerce')
+            bloco = bloco.dropna(subset=['Dia', 'Valor de Venda'])
+            parcial = bloco.groupby(chaves + ['Dia'], observed=True)['Valor de Venda'].agg(['sum', 'count'])
+            parciais.append(parcial.rename(columns={'sum': 'Soma', 'count': 'Contagem'}))
+
+    # Blocos diferentes podem ter categorias diferentes: as chaves são combinadas como texto
+    reduzido = pd.concat(parciais).reset_index()
+    reduzido[chaves] = reduzido[chaves].astype(str)
+    reduzido = reduzido.groupby(chaves + ['Dia'], as_index=False)[['Soma', 'Contagem']].sum()
+
+    return reduzido, linhas, time.perf_counter() - inicio
+
+def _salvar_atomico(caminho, gravar):
+    """
+    Grava um arquivo do painel em um temporário e o substitui de uma vez (os.replace).
+    """
+    temporario = f"{caminho}.{os.getpid()}.tmp"
+    with open(temporario, "wb") as f:
+        gravar(f)
+    os.replace(temporario, caminho)
+
+def _rotular_periodo(dias, frequencia):
+    """
+    Converte dias no rótulo do período usado pelo `resample` do pandas ('ME', 'W' ou 'D').
+    """
+    if frequencia == "ME":
+        return dias + pd.offsets.MonthEnd(0)
+    if frequencia == "W":
+        return dias + pd.to_timedelta((6 - dias.dt.weekday) % 7, unit="D")
+    return dias
+
+def carregar_painel(caminho_arquivos="../data/ca-*.csv", pasta="dados_processados", nivel="estado",
+                    n_processos=None):
+    """
+    Gera o painel de preços médios de todas as combinações de produto e região, nas granularidades
+    mensal, semanal e diária. As chaves são codificadas como inteiros e cada granularidade é salva
+    ordenada por série, com um índice de deslocamentos que permite ler uma série sem percorrer as outras.
+
+    Args:
+        caminho_arquivos (str): Caminho dos arquivos CSV.
+        pasta (str): Diretório dos dados processados.
+        nivel (str): Nível de agregação ('nacional', 'estado' ou 'municipio').
+        n_processos (int): Número de processos usados na leitura (None = um por núcleo).
+
+    Returns:
+        str: Diretório onde o painel foi salvo.
+    """
+    if nivel not in NIVEIS:
+        raise ValueError(f"Nível '{nivel}' inválido. Use um de: {', '.join(NIVEIS)}.")
+    chaves = NIVEIS[nivel]
+    arquivos = listar_arquivos(caminho_arquivos)
+
+    inicio = time.perf_counter()
+    tarefa = partial(reduzir_arquivo_painel, nivel=nivel)
+    reduzidos = []
+    for arquivo, (reduzido, linhas, segundos) in zip(arquivos, mapear_arquivos(tarefa, arquivos, n_processos)):
+        print(f"⏱️ {os.path.basename(arquivo)}: {linhas} linhas em {segundos:.2f}s")
+        reduzidos.append(reduzido)
+    diario = pd.concat(reduzidos, ignore_index=True)
+    print(f"✅ {len(arquivos)} arquivos reduzidos em {time.perf_counter() - inicio:.2f}s")
+
+    # Codificar as chaves como inteiros compactos e identificar cada série
+    categorias = {}
+    codigos = {}
+    for chave in chaves:
+        categoria = pd.Categorical(diario[chave])
+        categorias[chave] = [str(valor) for valor in categoria.categories]
+        codigos[chave] = categoria.codes.astype(np.int32)
+    series, inverso = np.unique(np.column_stack([codigos[chave] for chave in chaves]), axis=0,
+                                return_inverse=True)
+    diario["Serie"] = inverso.ravel().astype(np.int32)
+
+    pasta_painel = os.path.join(pasta, PASTA_PAINEL, nivel)
+    for nome, frequencia in GRANULARIDADES.items():
+        # Uma única agregação vetorizada para todas as séries
+        periodos = diario[["Serie", "Soma", "Contagem"]].assign(Data=_rotular_periodo(diario["Dia"], frequencia))
+        agregado = periodos.groupby(["Serie", "Data"], sort=True)[["Soma", "Contagem"]].sum().reset_index()
+
+        contagem_series = np.bincount(agregado["Serie"], minlength=len(series))
+        fins = np.cumsum(contagem_series)
+        inicios = fins - contagem_series
+
+        pasta_granularidade = os.path.join(pasta_painel, nome)
+        os.makedirs(pasta_granularidade, exist_ok=True)
+        arrays = {
+            "datas.npy": agregado["Data"].to_numpy(dtype="datetime64[D]"),
+            "precos.npy": (agregado["Soma"] / agregado["Contagem"]).to_numpy(dtype="float64"),
+            "contagens.npy": agregado["Contagem"].to_numpy(dtype="int64")
+        }
+        for arquivo, valores in arrays.items():
+            _salvar_atomico(os.path.join(pasta_granularidade, arquivo), partial(np.save, arr=valores))
+
+        indice = {
+            "nivel": nivel,
+            "granularidade": nome,
+            "frequencia": frequencia,
+            "chaves": chaves,
+            "categorias": categorias,
+            "series": [
+                {"codigos": [int(c) for c in series[i]], "inicio": int(inicios[i]), "fim": int(fins[i])}
+                for i in range(len(series))
+            ]
+        }
+        # O índice é gravado por último: só aponta para arrays já completos
+        conteudo = json.dumps(indice, ensure_ascii=False).encode("utf-8")
+        _salvar_atomico(os.path.join(pasta_granularidade, ARQUIVO_INDICE), lambda f: f.write(conteudo))
+
+        print(f"Painel {nivel} {nome}: {len(series)} séries, {len(agregado)} pontos salvos em {pasta_granularidade}")
+
+    return pasta_painel
+
+def carregar_indice_painel(granularidade="mensal", nivel="estado", pasta="dados_processados"):
+    """
+    Carrega o índice do painel (categorias e deslocamentos de cada série).
+    """
+    caminho = os.path.join(pasta, PASTA_PAINEL, nivel, granularidade, ARQUIVO_INDICE)
+    with open(caminho, encoding="utf-8") as f:
+        return json.load(f)
+
+def listar_series_painel(granularidade="mensal", nivel="estado", pasta="dados_processados"):
+    """
+    Lista as séries disponíveis no painel, com os valores de cada chave e o número de pontos.
+
+    Returns:
+        DataFrame: Uma linha por série.
+    """
+    indice = carregar_indice_painel(granularidade, nivel, pasta)
+    linhas = []
+    for serie in indice["series"]:
+        linha = {
+            chave: indice["categorias"][chave][codigo]
+            for chave, codigo in zip(indice["chaves"], serie["codigos"])
+        }
+        linha["Pontos"] = serie["fim"] - serie["inicio"]
+        linhas.append(linha)
+    return pd.DataFrame(linhas)
+
+def carregar_serie_painel(produto, estado=None, municipio=None, granularidade="mensal", nivel="estado",
+                          pasta="dados_processados"):
+    """
+    Lê uma única série do painel por fatiamento dos arrays mapeados em memória, sem ler as demais séries.
+
+    Args:
+        produto (str): Produto (ex.: "GASOLINA", "ETANOL").
+        estado (str): Sigla do estado (níveis 'estado' e 'municipio').
+        municipio (str): Nome do município (nível 'municipio').
+        granularidade (str): Granularidade ('mensal', 'semanal' ou 'diaria').
+        nivel (str): Nível de agregação do painel.
+        pasta (str): Diretório dos dados processados.
+
+    Returns:
+        DataFrame: Colunas 'Data' e 'Preco_Medio', com os períodos sem coleta preenchidos com NaN.
+    """
+    indice = carregar_indice_painel(granularidade, nivel, pasta)
+    valores = {"Produto": produto, "Estado - Sigla": estado, "Municipio": municipio}
+
+    try:
+        procurados = [indice["categorias"][chave].index(valores[chave]) for chave in indice["chaves"]]
+    except ValueError:
+        raise KeyError(f"Série não encontrada no painel: {produto}, {estado}, {municipio}") from None
+
+    serie = next((s for s in indice["series"] if s["codigos"] == procurados), None)
+    if serie is None:
+        raise KeyError(f"Série não encontrada no painel: {produto}, {estado}, {municipio}")
+
+    pasta_granularidade = os.path.join(pasta, PASTA_PAINEL, nivel, granularidade)
+    datas = np.load(os.path.join(pasta_granularidade, "datas.npy"), mmap_mode="r")
+    precos = np.load(os.path.join(pasta_granularidade, "precos.npy"), mmap_mode="r")
+    fatia = slice(serie["inicio"], serie["fim"])
+
+    df = pd.DataFrame({"Preco_Medio": np.asarray(precos[fatia])},
+                      index=pd.DatetimeIndex(np.asarray(datas[fatia]).astype("datetime64[ns]"), name="Data"))
+    return df.asfreq(indice["frequencia"]).reset_index()
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description="Gera o painel de preços por produto e região.")
+    parser.add_argument("--nivel", choices=list(NIVEIS), default="estado")
+    parser.add_argument("--dados", default="dados_processados", help="Diretório dos dados processados")
+    parser.add_argument("--arquivos", default="../data/ca-*.csv", help="Arquivos de origem (ca-*.csv)")
+    parser.add_argument("--processos", type=int, default=None, help="Processos de leitura (padrão: um por núcleo)")
+    args = parser.parse_args(argumentos)
+
+    carregar_painel(args.arquivos, args.dados, args.nivel, args.processos)
+    print(listar_series_painel("mensal", args.nivel, args.dados).to_string(index=False))
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,200 @@
+# perfil.py
+import functools
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Ativado pela variável de ambiente PERFIL=1 (herdada pelos processos filhos) ou por `ativar()`
+_ativo = os.environ.get("PERFIL", "") not in ("", "0")
+_memoria = os.environ.get("PERFIL_MEMORIA", "") not in ("", "0")
+_eventos = []
+_pilha = threading.local()
+_inicio = time.perf_counter()
+_SEM_PERFIL = nullcontext()
+
+def ativo():
+    return _ativo
+
+def ativar(memoria=False):
+    """
+    Ativa a coleta de etapas. Com `memoria=True`, o pico de memória alocada em cada etapa é
+    medido com o tracemalloc (mais caro).
+    """
+    global _ativo, _memoria
+    _ativo, _memoria = True, memoria
+    os.environ["PERFIL"] = "1"
+    if memoria:
+        os.environ["PERFIL_MEMORIA"] = "1"
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+def desativar():
+    global _ativo
+    _ativo = False
+    os.environ.pop("PERFIL", None)
+
+def limpar():
+    """
+    Descarta os eventos coletados.
+    """
+    _eventos.clear()
+
+def _registrar_evento(nome, inicio, duracao, atributos, pid=None, tid=None):
+    _eventos.append({
+        "nome": nome,
+        "inicio": inicio,
+        "duracao": duracao,
+        "pid": pid or os.getpid(),
+        "tid": tid or threading.get_ident(),
+        "atributos": atributos
+    })
+
+@contextmanager
+def _etapa_ativa(nome, atributos):
+    pilha = getattr(_pilha, "etapas", None)
+    if pilha is None:
+        pilha = _pilha.etapas = []
+    medir_memoria = _memoria and tracemalloc.is_tracing()
+    if medir_memoria:
+        # O pico acumulado até aqui pertence à etapa externa
+        if pilha:
+            pilha[-1]["pico"] = max(pilha[-1]["pico"], tracemalloc.get_traced_memory()[1])
+        tracemalloc.reset_peak()
+    quadro = {"pico": 0}
+    pilha.append(quadro)
+
+    inicio = time.perf_counter()
+    try:
+        yield atributos
+    finally:
+        duracao = time.perf_counter() - inicio
+        pilha.pop()
+        if medir_memoria:
+            quadro["pico"] = max(quadro["pico"], tracemalloc.get_traced_memory()[1])
+            atributos["pico_memoria_mb"] = round(quadro["pico"] / 2 ** 20, 2)
+            if pilha:
+                pilha[-1]["pico"] = max(pilha[-1]["pico"], quadro["pico"])
+        _registrar_evento(nome, inicio, duracao, atributos)
+
+def etapa(nome, **atributos):
+    """
+    Mede uma etapa do pipeline (uso: `with perfil.etapa("carregar_dados", granularidade=...):`).
+    Desativado, retorna um contexto vazio compartilhado, sem custo de medição.
+    O dicionário de atributos é devolvido pelo `with` e pode ser completado dentro da etapa.
+    """
+    if not _ativo:
+        return _SEM_PERFIL
+    return _etapa_ativa(nome, atributos)
+
+def medir(nome=None):
+    """
+    Decorador que mede cada chamada da função como uma etapa.
+    """
+    def decorador(funcao):
+        rotulo = nome or funcao.__name__
+
+        @functools.wraps(funcao)
+        def envoltorio(*args, **kwargs):
+            if not _ativo:
+                return funcao(*args, **kwargs)
+            with _etapa_ativa(rotulo, {}):
+                return funcao(*args, **kwargs)
+        return envoltorio
+    return decorador
+
+def registrar(nome, inicio, duracao, pid=None, **atributos):
+    """
+    Registra uma etapa já medida, por exemplo em um processo do pool (`inicio` em `time.perf_counter()`).
+    """
+    if _ativo:
+        _registrar_evento(nome, inicio, duracao, atributos, pid=pid, tid=pid)
+
+def pico_memoria_processo_mb():
+    """
+    Pico de memória residente do processo (e dos filhos já finalizados), em MB, se disponível.
+    """
+    if resource is None:
+        return None
+    fator = 1 if sys.platform == "darwin" else 1024  # bytes no macOS, KB no Linux
+    proprio = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * fator
+    filhos = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * fator
+    return round(max(proprio, filhos) / 2 ** 20, 1)
+
+def exportar_chrome(caminho):
+    """
+    Exporta as etapas no formato Chrome Trace (abrir em chrome://tracing ou no Perfetto).
+    """
+    pasta = os.path.dirname(caminho)
+    if pasta:
+        os.makedirs(pasta, exist_ok=True)
+    eventos = [
+        {
+            "name": evento["nome"],
+            "cat": evento["nome"].split(":", 1)[0],
+            "ph": "X",
+            "ts": round((evento["inicio"] - _inicio) * 1e6, 1),
+            "dur": round(evento["duracao"] * 1e6, 1),
+            "pid": evento["pid"],
+            "tid": evento["tid"],
+            "args": evento["atributos"]
+        }
+        for evento in _eventos
+    ]
+    with open(caminho, "w", encoding="utf-8") as f:
+        json.dump({"traceEvents": eventos, "displayTimeUnit": "ms",
+                   "otherData": {"pico_memoria_processo_mb": pico_memoria_processo_mb()}}, f, default=str)
+    print(f"🧭 Perfil exportado em '{caminho}' ({len(eventos)} eventos).")
+    return caminho
+
+def resumir():
+    """
+    Exibe uma tabela com o número de chamadas, tempo total, médio e máximo de cada etapa,
+    o pico de memória medido e o total de iterações do otimizador, quando houver.
+
+    Returns:
+        list: Uma linha (dict) por etapa, da mais cara para a mais barata.
+    """
+    etapas = {}
+    for evento in _eventos:
+        linha = etapas.setdefault(evento["nome"], {"etapa": evento["nome"], "chamadas": 0, "total": 0.0,
+                                                    "maximo": 0.0, "pico_memoria_mb": None, "iteracoes": None})
+        linha["chamadas"] += 1
+        linha["total"] += evento["duracao"]
+        linha["maximo"] = max(linha["maximo"], evento["duracao"])
+        pico = evento["atributos"].get("pico_memoria_mb")
+        if pico is not None:
+            linha["pico_memoria_mb"] = max(linha["pico_memoria_mb"] or 0, pico)
+        iteracoes = evento["atributos"].get("iteracoes")
+        if iteracoes is not None:
+            linha["iteracoes"] = (linha["iteracoes"] or 0) + iteracoes
+
+    linhas = sorted(etapas.values(), key=lambda linha: linha["total"], reverse=True)
+    print("\n=== 🧭 PERFIL POR ETAPA ===")
+    print(f"{'Etapa':<34}{'Chamadas':>9}{'Total (s)':>11}{'Média (ms)':>12}{'Máx. (ms)':>11}{'Pico (MB)':>11}"
+          f"{'Iterações':>11}")
+    for linha in linhas:
+        pico = f"{linha['pico_memoria_mb']:.1f}" if linha["pico_memoria_mb"] is not None else "-"
+        iteracoes = linha["iteracoes"] if linha["iteracoes"] is not None else "-"
+        print(f"{linha['etapa'][:33]:<34}{linha['chamadas']:>9}{linha['total']:>11.3f}"
+              f"{linha['total'] / linha['chamadas'] * 1000:>12.1f}{linha['maximo'] * 1000:>11.1f}{pico:>11}"
+              f"{iteracoes:>11}")
+    print(f"Pico de memória do processo: {pico_memoria_processo_mb()} MB")
+    return linhas
+
+def finalizar(caminho_trace):
+    """
+    Exporta o perfil coletado e exibe o resumo, se o perfil estiver ativo.
+    """
+    if not _ativo:
+        return None
+    exportar_chrome(caminho_trace)
+    return resumir()
@@ -0,0 +1,207 @@
+# registro_modelos.py
+import json
+import os
+import pickle
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import datetime
+import numpy as np
+import pandas as pd
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+PASTA_REGISTRO = "modelos_salvos"
+ARQUIVO_REGISTRO = "registro.json"
+LIMITE_LRU = 8
+
+# Modelos já carregados neste processo: (pasta, nome, granularidade) -> (mtime do arquivo, modelo)
+_modelos_carregados = OrderedDict()
+
+def _chave(nome_modelo, granularidade):
+    return f"{nome_modelo.lower()}_{granularidade}"
+
+def carregar_registro(pasta_registro=PASTA_REGISTRO):
+    """
+    Carrega o índice do registro de modelos (metadados de cada modelo salvo).
+    """
+    caminho = os.path.join(pasta_registro, ARQUIVO_REGISTRO)
+    if not os.path.exists(caminho):
+        return {}
+    with open(caminho, encoding="utf-8") as f:
+        return json.load(f)
+
+@contextmanager
+def _travar_registro(pasta_registro):
+    """
+    Trava exclusiva (entre processos) do índice do registro, mantida durante a leitura, alteração e
+    gravação de `registro.json`: trabalhos do lote salvam modelos em paralelo.
+    """
+    with open(os.path.join(pasta_registro, f"{ARQUIVO_REGISTRO}.lock"), "a+b") as trava:
+        if fcntl is not None:
+            fcntl.flock(trava.fileno(), fcntl.LOCK_EX)
+        else:
+            trava.seek(0)
+            msvcrt.locking(trava.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(trava.fileno(), fcntl.LOCK_UN)
+            else:
+                trava.seek(0)
+                msvcrt.locking(trava.fileno(), msvcrt.LK_UNLCK, 1)
+
+def _salvar_registro(registro, pasta_registro):
+    caminho = os.path.join(pasta_registro, ARQUIVO_REGISTRO)
+    temporario = f"{caminho}.{os.getpid()}.tmp"
+    with open(temporario, "w", encoding="utf-8") as f:
+        json.dump(registro, f, indent=2, ensure_ascii=False)
+    os.replace(temporario, caminho)
+
+def salvar_modelo(modelo, nome_modelo, granularidade, metadados=None, pasta_registro=PASTA_REGISTRO):
+    """
+    Serializa o modelo ajustado final e registra seus metadados.
+
+    Args:
+        modelo: Resultado ajustado do statsmodels (ARIMA/SARIMAX) ou modelo Prophet ajustado.
+        nome_modelo (str): Nome do modelo (ex.: "ARIMA", "SARIMA", "Prophet").
+        granularidade (str): Granularidade dos dados de treino.
+        metadados (dict): Informações adicionais (ordem, hash dos dados de treino, tempo de ajuste, ...).
+        pasta_registro (str): Diretório do registro.
+
+    Returns:
+        str: Caminho do arquivo do modelo.
+    """
+    os.makedirs(pasta_registro, exist_ok=True)
+    chave = _chave(nome_modelo, granularidade)
+
+    if nome_modelo.lower() == "prophet":
+        from prophet.serialize import model_to_json
+
+        formato = "prophet"
+        caminho = os.path.join(pasta_registro, f"{chave}.json")
+        conteudo = model_to_json(modelo).encode("utf-8")
+    else:
+        formato = "statsmodels"
+        caminho = os.path.join(pasta_registro, f"{chave}.pkl")
+        conteudo = pickle.dumps(modelo, protocol=pickle.HIGHEST_PROTOCOL)
+
+    temporario = f"{caminho}.{os.getpid()}.tmp"
+    with open(temporario, "wb") as f:
+        f.write(conteudo)
+    os.replace(temporario, caminho)
+
+    with _travar_registro(pasta_registro):
+        registro = carregar_registro(pasta_registro)
+        registro[chave] = {
+            "modelo": nome_modelo,
+            "granularidade": granularidade,
+            "formato": formato,
+            "arquivo": os.path.basename(caminho),
+            "salvo_em": datetime.now().isoformat(timespec="seconds"),
+            **(metadados or {})
+        }
+        _salvar_registro(registro, pasta_registro)
+
+    # O modelo recém-salvo já fica disponível no LRU, sem precisar ser lido do disco
+    _guardar_em_memoria((os.path.abspath(pasta_registro), chave), os.stat(caminho).st_mtime_ns, modelo)
+
+    print(f"💾 Modelo {chave} salvo no registro em '{caminho}'.")
+    return caminho
+
+def _guardar_em_memoria(chave_lru, mtime, modelo):
+    _modelos_carregados[chave_lru] = (mtime, modelo)
+    _modelos_carregados.move_to_end(chave_lru)
+    while len(_modelos_carregados) > LIMITE_LRU:
+        _modelos_carregados.popitem(last=False)
+
+def carregar_modelo(nome_modelo, granularidade, pasta_registro=PASTA_REGISTRO):
+    """
+    Carrega um modelo do registro sob demanda. Os modelos carregados ficam em um LRU em memória
+    (até LIMITE_LRU modelos) e são recarregados se o arquivo mudar.
+
+    Returns:
+        tuple: Modelo ajustado e seus metadados.
+    """
+    registro = carregar_registro(pasta_registro)
+    chave = _chave(nome_modelo, granularidade)
+    if chave not in registro:
+        raise KeyError(f"Modelo '{chave}' não encontrado no registro '{pasta_registro}'.")
+
+    metadados = registro[chave]
+    caminho = os.path.join(pasta_registro, metadados["arquivo"])
+    mtime = os.stat(caminho).st_mtime_ns
+    chave_lru = (os.path.abspath(pasta_registro), chave)
+
+    em_memoria = _modelos_carregados.get(chave_lru)
+    if em_memoria is not None and em_memoria[0] == mtime:
+        _modelos_carregados.move_to_end(chave_lru)
+        return em_memoria[1], metadados
+
+    if metadados["formato"] == "prophet":
+        from prophet.serialize import model_from_json
+
+        with open(caminho, encoding="utf-8") as f:
+            modelo = model_from_json(f.read())
+    else:
+        with open(caminho, "rb") as f:
+            modelo = pickle.load(f)
+
+    _guardar_em_memoria(chave_lru, mtime, modelo)
+    return modelo, metadados
+
+def reconstruir_niveis(previsoes, metadados):
+    """
+    Converte as previsões de um modelo ajustado sobre a série diferenciada em preços (nível),
+    acumulando as variações a partir do último nível registrado. Previsões de modelos ajustados
+    sobre a série em nível são devolvidas como estão.
+
+    Args:
+        previsoes (array-like): Previsões do modelo, na escala em que foi ajustado.
+        metadados (dict): Metadados do modelo no registro.
+
+    Returns:
+        ndarray: Previsões em nível.
+    """
+    previsoes = np.asarray(previsoes, dtype="float64")
+    if not metadados.get("serie_diferenciada"):
+        return previsoes
+    if metadados.get("ultimo_nivel") is None:
+        raise ValueError(f"O registro do {metadados.get('modelo')}_{metadados.get('granularidade')} não tem o "
+                         "último nível da série: execute o modelo novamente para reconstruir as previsões.")
+    return metadados["ultimo_nivel"] + np.cumsum(previsoes)
+
+def prever(modelo, granularidade, horizonte, pasta_registro=PASTA_REGISTRO):
+    """
+    Gera previsões a partir de um modelo salvo no registro, sem reajustar.
+    O horizonte é contado a partir do fim dos dados de treino do modelo; as previsões de
+    modelos ajustados sobre a série diferenciada são devolvidas em nível.
+
+    Args:
+        modelo (str): Nome do modelo ("ARIMA", "SARIMA" ou "Prophet").
+        granularidade (str): Granularidade ('mensal', 'semanal' ou 'diaria').
+        horizonte (int): Número de períodos a prever.
+        pasta_registro (str): Diretório do registro.
+
+    Returns:
+        DataFrame: Colunas 'Data' e 'Previsao' (em nível).
+    """
+    inicio = time.perf_counter()
+    ajustado, metadados = carregar_modelo(modelo, granularidade, pasta_registro)
+
+    if metadados["formato"] == "prophet":
+        datas = pd.date_range(pd.Timestamp(metadados["ultima_data"]), periods=horizonte + 1,
+                              freq=metadados["frequencia"])[1:]
+        previsoes = ajustado.predict(pd.DataFrame({"ds": datas}))["yhat"].to_numpy()
+    else:
+        previsao = ajustado.forecast(steps=horizonte)
+        datas, previsoes = previsao.index, reconstruir_niveis(previsao.to_numpy(), metadados)
+
+    print(f"⚡ Previsão de {horizonte} períodos com {_chave(modelo, granularidade)} em "
+          f"{(time.perf_counter() - inicio) * 1000:.1f} ms")
+    return pd.DataFrame({"Data": datas, "Previsao": previsoes})
@@ -0,0 +1,87 @@
+# test_diagnosticos.py
+import numpy as np
+import pytest
+import diagnosticos
+
+stattools = pytest.importorskip("statsmodels.tsa.stattools")
+
+def serie_ar(n=300, phi=(0.6, -0.3), semente=0):
+    rng = np.random.default_rng(semente)
+    x = np.zeros(n)
+    for t in range(len(phi), n):
+        x[t] = sum(coef * x[t - 1 - i] for i, coef in enumerate(phi)) + rng.normal()
+    return x + 10
+
+@pytest.mark.parametrize("n, nlags", [(300, 40), (61, 12), (1000, 52)])
+def test_acf_fft_igual_statsmodels(n, nlags):
+    x = serie_ar(n)
+    np.testing.assert_allclose(diagnosticos.acf_fft(x, nlags), stattools.acf(x, nlags=nlags, fft=True), atol=1e-10)
+
+@pytest.mark.parametrize("n, nlags", [(300, 40), (61, 12), (1000, 52)])
+def test_pacf_levinson_igual_statsmodels(n, nlags):
+    x = serie_ar(n)
+    acf = diagnosticos.acf_fft(x, nlags)
+    np.testing.assert_allclose(diagnosticos.pacf_levinson(acf, nlags), stattools.pacf(x, nlags=nlags, method="ywm"),
+                               atol=1e-10)
+
+def test_acf_serie_constante():
+    np.testing.assert_array_equal(diagnosticos.acf_fft(np.full(20, 3.0), 5), np.r_[1.0, np.zeros(5)])
+
+def test_correlogramas_limitam_lags_e_ignoram_nan():
+    x = serie_ar(50)
+    x[[5, 17]] = np.nan
+    correlograma = diagnosticos.calcular_correlogramas(x, 40)
+    assert correlograma["n"] == 48
+    assert len(correlograma["acf"]) == diagnosticos.limitar_lags(48, 40) + 1
+
+# Índices de diagnósticos montados à mão para as regras de poda
+def diagnostico_diferenca(adf_p, kpss_p, sazonal=None):
+    return {"adf_p": adf_p, "kpss_p": kpss_p, "estacionaria": adf_p < 0.05 and kpss_p > 0.05,
+            "sazonal": sazonal or {}}
+
+def indice(diferencas, sazonalidade=None):
+    return {"diferencas": {str(d): teste for d, teste in enumerate(diferencas)}, "sazonalidade": sazonalidade or {}}
+
+def grade(ds=(0, 1, 2), sazonais=((0, 0, 0, 12),)):
+    return [((1, d, 1), sazonal) for d in ds for sazonal in sazonais]
+
+def test_poda_subdiferenciacao_e_sobrediferenciacao():
+    # Não estacionária em nível, estacionária com uma diferença: só d=1 sobrevive
+    mantidos, motivos = diagnosticos.podar_candidatos(
+        grade(), indice([diagnostico_diferenca(0.6, 0.01), diagnostico_diferenca(0.01, 0.1), diagnostico_diferenca(0.01, 0.1)]))
+    assert {ordem[1] for ordem, _ in mantidos} == {1}
+    assert len(motivos) == 2
+
+def test_poda_considera_diferencas_previas():
+    mantidos, _ = diagnosticos.podar_candidatos(
+        grade(ds=(0, 1)), indice([diagnostico_diferenca(0.6, 0.01), diagnostico_diferenca(0.01, 0.1), diagnostico_diferenca(0.01, 0.1)]),
+        diferencas_previas=1)
+    assert {ordem[1] for ordem, _ in mantidos} == {0}
+
+def test_poda_nao_descarta_todos():
+    # Nenhum nível de diferença é aceitável: a regra não é aplicada
+    candidatos = grade(ds=(0,))
+    mantidos, motivos = diagnosticos.podar_candidatos(candidatos, indice([diagnostico_diferenca(0.6, 0.01)]))
+    assert mantidos == candidatos and motivos == []
+
+def test_poda_sazonal_fraca():
+    sazonais = ((0, 0, 0, 12), (1, 0, 1, 12), (0, 1, 0, 12), (1, 1, 1, 12))
+    sazonal = {"12": {"acf": 0.05, "pacf": 0.02, "significativo": False}}
+    diferencas = [diagnostico_diferenca(0.01, 0.1, sazonal)]
+    candidatos = grade(ds=(0,), sazonais=sazonais)
+
+    mantidos, motivos = diagnosticos.podar_candidatos(candidatos, indice(diferencas, {"12": {"forca": 0.2}}), periodo=12)
+    assert [sazonal for _, sazonal in mantidos] == [(0, 0, 0, 12)]
+    assert len(motivos) == 2
+
+    # Sazonalidade forte: nada é descartado
+    mantidos, motivos = diagnosticos.podar_candidatos(candidatos, indice(diferencas, {"12": {"forca": 0.9}}), periodo=12)
+    assert mantidos == candidatos and motivos == []
+
+def test_poda_sazonal_fraca_mas_significativa():
+    sazonais = ((0, 0, 0, 12), (1, 0, 1, 12), (1, 1, 1, 12))
+    sazonal = {"12": {"acf": 0.5, "pacf": 0.4, "significativo": True}}
+    mantidos, _ = diagnosticos.podar_candidatos(
+        grade(ds=(0,), sazonais=sazonais), indice([diagnostico_diferenca(0.01, 0.1, sazonal)], {"12": {"forca": 0.3}}),
+        periodo=12)
+    assert [sazonal for _, sazonal in mantidos] == [(0, 0, 0, 12), (1, 0, 1, 12)]
@@ -0,0 +1,58 @@
+# test_metricas.py
+import numpy as np
+import pytest
+from metricas import calcular_metricas, escala_mase
+
+sk = pytest.importorskip("sklearn.metrics")
+
+@pytest.fixture
+def dados():
+    rng = np.random.default_rng(1)
+    reais = 5 + rng.normal(size=24).cumsum() * 0.1
+    previsoes = reais + rng.normal(scale=0.2, size=(3, 24))
+    treino = 5 + rng.normal(size=60).cumsum() * 0.1
+    return previsoes, reais, treino
+
+def referencia(previsao, reais):
+    return {
+        "MAE": sk.mean_absolute_error(reais, previsao),
+        "RMSE": np.sqrt(sk.mean_squared_error(reais, previsao)),
+        "R²": sk.r2_score(reais, previsao),
+        "MAPE": 100 * sk.mean_absolute_percentage_error(reais, previsao)
+    }
+
+def test_vetor_igual_sklearn(dados):
+    previsoes, reais, treino = dados
+    metricas = calcular_metricas(previsoes[0], reais, treino)
+    for nome, valor in referencia(previsoes[0], reais).items():
+        assert metricas[nome] == pytest.approx(valor, rel=1e-10)
+    smape = 100 * np.mean(2 * np.abs(previsoes[0] - reais) / (np.abs(previsoes[0]) + np.abs(reais)))
+    assert metricas["sMAPE"] == pytest.approx(smape, rel=1e-10)
+    assert metricas["MASE"] == pytest.approx(metricas["MAE"] / np.mean(np.abs(np.diff(treino))), rel=1e-10)
+
+def test_matriz_igual_vetores(dados):
+    previsoes, reais, treino = dados
+    matriz = calcular_metricas(previsoes, reais, treino)
+    for i, previsao in enumerate(previsoes):
+        for nome, valor in calcular_metricas(previsao, reais, treino).items():
+            assert matriz[nome][i] == pytest.approx(valor, rel=1e-12)
+
+def test_nan_ignorados(dados):
+    previsoes, reais, treino = dados
+    previsao = previsoes[0].copy()
+    previsao[[2, 7]] = np.nan
+    reais = reais.copy()
+    reais[11] = np.nan
+    validos = ~(np.isnan(previsao) | np.isnan(reais))
+    metricas = calcular_metricas(previsao, reais, treino)
+    for nome, valor in referencia(previsao[validos], reais[validos]).items():
+        assert metricas[nome] == pytest.approx(valor, rel=1e-10)
+
+def test_r2_serie_constante():
+    reais = np.full(5, 2.0)
+    assert calcular_metricas(reais, reais)["R²"] == sk.r2_score(reais, reais) == 1.0
+    assert calcular_metricas(reais + 1, reais)["R²"] == sk.r2_score(reais, reais + 1) == 0.0
+
+def test_mase_sem_treino():
+    assert np.isnan(calcular_metricas([1.0, 2.0], [1.0, 3.0])["MASE"])
+    assert np.isnan(escala_mase([1.0], periodo_sazonal=1))
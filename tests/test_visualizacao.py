@@ -0,0 +1,47 @@
+# test_visualizacao.py
+import numpy as np
+import pytest
+from visualizacao import reduzir_lttb, reduzir_lttb_com_lacunas
+
+@pytest.fixture
+def serie():
+    rng = np.random.default_rng(2)
+    x = np.arange("2020-01-01", "2030-01-01", dtype="datetime64[D]")
+    return x, np.sin(np.arange(len(x)) / 50) + rng.normal(scale=0.1, size=len(x))
+
+@pytest.mark.parametrize("n_pontos", [3, 100, 2000])
+def test_lttb_tamanho_e_extremidades(serie, n_pontos):
+    x, y = serie
+    indices = reduzir_lttb(x, y, n_pontos)
+    assert len(indices) == n_pontos
+    assert indices[0] == 0 and indices[-1] == len(y) - 1
+    assert np.all(np.diff(indices) > 0)
+
+@pytest.mark.parametrize("n_pontos", [2, 10, 50])
+def test_lttb_sem_reducao(n_pontos):
+    y = np.arange(10, dtype="float64")
+    np.testing.assert_array_equal(reduzir_lttb(np.arange(10), y, n_pontos), np.arange(10))
+
+def test_lttb_preserva_pico(serie):
+    x, y = serie
+    y = y.copy()
+    y[1234] = 50.0
+    assert 1234 in reduzir_lttb(x, y, 200)
+
+def test_lttb_com_lacunas(serie):
+    x, y = serie
+    y = y.copy()
+    y[1000:1100] = np.nan
+    y[2500:2510] = np.nan
+    indices = reduzir_lttb_com_lacunas(x, y, 300)
+
+    assert np.all(np.diff(indices) > 0)
+    # Marcadores de lacuna mantidos, extremidades de cada trecho preservadas
+    assert {1000, 2500} <= set(indices)
+    assert {0, 999, 1100, 2499, 2510, len(y) - 1} <= set(indices)
+    assert np.isnan(y[indices]).sum() == 2
+    assert len(indices) <= 300 + 2 + 3
+
+def test_lttb_com_lacunas_sem_nan_igual_lttb(serie):
+    x, y = serie
+    np.testing.assert_array_equal(reduzir_lttb_com_lacunas(x, y, 500), reduzir_lttb(x, y, 500))
@@ -1,10 +1,21 @@
-import matplotlib.pyplot as plt
-import seaborn as sns
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
 import pandas as pd
-import statsmodels.api as sm
-from statsmodels.tsa.seasonal import seasonal_decompose
 from helpers import tratar_nans
-import os
+from metricas import METRICAS
+import numpy as np
+import banco_metricas
+import cache_modelos
+import conjuntos_dados
+import diagnosticos
+
+# matplotlib, seaborn e statsmodels são importados dentro das funções que desenham os gráficos:
+# consultar as métricas não deve carregá-los
+
+MAX_PONTOS_GRAFICO = 2000  # Pontos desenhados nas séries longas (redução LTTB)
 
 # Garantir que as pastas existam
 def garantir_pasta(caminho):
@@ -12,18 +23,19 @@ def garantir_pasta(caminho):
 
 def carregar_dados_granularidade(pasta="dados_processados"):
     """
-    Carrega os dados processados nas três granularidades (mensal, semanal e diária).
+    Carrega os dados de treino processados nas três granularidades (mensal, semanal e diária), como
+    estão nos arquivos (sem tratar valores ausentes). Os arquivos já lidos pelos modelos neste processo
+    não são lidos de novo (ver `conjuntos_dados.obter_dados`).
     """
     granularidades = ["mensal", "semanal", "diaria"]
     dados = {}
 
     for nome in granularidades:
-        caminho = os.path.join(pasta, f"train_data_{nome}.csv")
-        if os.path.exists(caminho):
-            dados[nome] = pd.read_csv(caminho)
-            dados[nome]['Data'] = pd.to_datetime(dados[nome]['Data'])
+        treino, _ = conjuntos_dados.obter_dados(pasta, nome, metodo_nan=None)
+        if treino is not None:
+            dados[nome] = treino.reset_index()
         else:
-            print(f"❌ Arquivo não encontrado: {caminho}")
+            print(f"❌ Dados processados não encontrados para a granularidade {nome} em '{pasta}'.")
 
     return dados
 
@@ -40,14 +52,89 @@ def estatisticas_descritivas(df, nome_granularidade):
     # Verificar duplicatas
     print(f"📌 Duplicatas: {df.duplicated().sum()} em {nome_granularidade}")
 
-def plotar_serie_temporal(df, nome_granularidade, pasta_saida="resultados_eda"):
+def reduzir_lttb(x, y, n_pontos=MAX_PONTOS_GRAFICO):
+    """
+    Reduz uma série para `n_pontos` com o Largest-Triangle-Three-Buckets (LTTB): de cada bloco,
+    mantém o ponto que forma o maior triângulo com o ponto escolhido no bloco anterior e a média
+    do bloco seguinte, preservando picos, vales e a forma da curva.
+
+    Args:
+        x (array): Eixo x (numérico ou datetime64), crescente.
+        y (array): Valores.
+        n_pontos (int): Número de pontos mantidos (inclui o primeiro e o último).
+
+    Returns:
+        ndarray: Índices dos pontos mantidos.
+    """
+    n = len(y)
+    if n_pontos >= n or n_pontos < 3:
+        return np.arange(n)
+
+    x = np.asarray(x)
+    xf = (x.view("int64") if np.issubdtype(x.dtype, np.datetime64) else x).astype("float64")
+    y = np.asarray(y, dtype="float64")
+
+    # n_pontos - 2 blocos entre o primeiro e o último ponto
+    limites = np.linspace(1, n - 1, n_pontos - 1).astype(int)
+    limites_seguinte = np.r_[limites[2:], n]
+    indices = np.empty(n_pontos, dtype=int)
+    indices[0], indices[-1] = 0, n - 1
+    a = 0
+    for i in range(n_pontos - 2):
+        inicio, fim = limites[i], limites[i + 1]
+        media_x = xf[fim:limites_seguinte[i]].mean()
+        media_y = y[fim:limites_seguinte[i]].mean()
+        area = np.abs((xf[a] - media_x) * (y[inicio:fim] - y[a]) - (xf[a] - xf[inicio:fim]) * (media_y - y[a]))
+        a = inicio + int(np.argmax(area))
+        indices[i + 1] = a
+    return indices
+
+def reduzir_lttb_com_lacunas(x, y, n_pontos=MAX_PONTOS_GRAFICO):
+    """
+    Aplica o LTTB a cada trecho contínuo (sem NaN) da série, dividindo os `n_pontos` entre os trechos
+    proporcionalmente ao tamanho de cada um (o primeiro e o último ponto de cada trecho são sempre mantidos).
+    Entre dois trechos, o índice do primeiro NaN da lacuna também é mantido, para que a linha desenhada
+    continue interrompida nas lacunas.
+
+    Returns:
+        ndarray: Índices dos pontos mantidos (incluindo os marcadores de lacuna), em ordem crescente.
+    """
+    y = np.asarray(y, dtype="float64")
+    validos = np.isfinite(y)
+    if validos.all():
+        return reduzir_lttb(x, y, n_pontos)
+
+    # Início e fim (exclusivo) de cada trecho contínuo de valores válidos
+    bordas = np.diff(np.r_[0, validos.astype(np.int8), 0])
+    inicios, fins = np.flatnonzero(bordas == 1), np.flatnonzero(bordas == -1)
+    total = int(validos.sum())
+
+    partes = []
+    for inicio, fim in zip(inicios, fins):
+        tamanho = fim - inicio
+        cota = max(2, int(round(n_pontos * tamanho / total))) if total else tamanho
+        partes.append(inicio + reduzir_lttb(x[inicio:fim], y[inicio:fim], cota))
+        if fim < len(y):
+            partes.append(np.array([fim]))
+    return np.concatenate(partes) if partes else np.arange(0)
+
+def plotar_serie_temporal(df, nome_granularidade, pasta_saida="resultados_eda", max_pontos=MAX_PONTOS_GRAFICO):
     """
     Plota a série temporal com base na granularidade (mensal, semanal, diária) e salva o gráfico.
+    Séries com mais de `max_pontos` pontos são reduzidas com LTTB antes de desenhar, trecho a trecho
+    entre as lacunas, que continuam aparecendo como interrupções da linha.
     """
+    import matplotlib.pyplot as plt
+
     garantir_pasta(pasta_saida)
 
+    datas, precos = df['Data'].to_numpy(), df['Preco_Medio'].to_numpy()
+    if len(precos) > max_pontos:
+        indices = reduzir_lttb_com_lacunas(datas, precos, max_pontos)
+        datas, precos = datas[indices], precos[indices]
+
     plt.figure(figsize=(12, 6))
-    plt.plot(df['Data'], df['Preco_Medio'], label=f'Série {nome_granularidade.capitalize()}')
+    plt.plot(datas, precos, label=f'Série {nome_granularidade.capitalize()}')
     plt.title(f'Série Temporal - {nome_granularidade.capitalize()}')
     plt.xlabel('Data')
     plt.ylabel('Preço Médio da Gasolina')
@@ -60,6 +147,7 @@ def plotar_serie_temporal(df, nome_granularidade, pasta_saida="resultados_eda"):
     plt.close()
 
     print(f"📊 Gráfico da série temporal salvo em: {caminho_saida}")
+    return caminho_saida
 
 def decompor_serie_temporal(df, nome_granularidade, modelo='additive', metodo_nan="interpolacao", pasta_saida="resultados_eda"):
     """
@@ -72,6 +160,9 @@ def decompor_serie_temporal(df, nome_granularidade, modelo='additive', metodo_na
     - metodo_nan (str): Método para lidar com NaNs ('interpolacao', 'ffill', 'drop').
     - pasta_saida (str): Caminho para salvar os gráficos gerados.
     """
+    import matplotlib.pyplot as plt
+    from statsmodels.tsa.seasonal import seasonal_decompose
+
     garantir_pasta(pasta_saida)
 
     df = df.set_index('Data')
@@ -89,6 +180,7 @@ def decompor_serie_temporal(df, nome_granularidade, modelo='additive', metodo_na
         plt.close(fig)
 
         print(f"📊 Gráfico de decomposição salvo em: {caminho_saida}")
+        return caminho_saida
 
     except Exception as e:
         print(f"❌ Erro ao decompor a série em {nome_granularidade}: {e}")
@@ -101,6 +193,9 @@ def plotar_histograma(df, nome_granularidade, pasta_saida="resultados_eda"):
     """
     Plota um histograma para visualizar a distribuição dos preços médios e salva o gráfico.
     """
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
     garantir_pasta(pasta_saida)
 
     plt.figure(figsize=(8, 4))
@@ -116,22 +211,40 @@ def plotar_histograma(df, nome_granularidade, pasta_saida="resultados_eda"):
     plt.close()
 
     print(f"📊 Gráfico do histograma salvo em: {caminho_saida}")
-
-def plotar_acf_pacf(df, nome_granularidade, lags=40, pasta_saida="resultados_eda"):
+    return caminho_saida
+
+def _plotar_correlograma(ax, valores, limites, titulo):
+    lags = np.arange(len(valores))
+    ax.fill_between(lags, -limites, limites, alpha=0.25, linewidth=0)
+    ax.vlines(lags, 0, valores, color="C0")
+    ax.scatter(lags, valores, s=20, color="C0", zorder=3)
+    ax.axhline(0, color="black", linewidth=0.8)
+    ax.set_title(titulo)
+
+def plotar_acf_pacf(df, nome_granularidade, lags=40, pasta_saida="resultados_eda",
+                    pasta_cache=diagnosticos.PASTA_CACHE):
     """
     Plota os gráficos de Autocorrelação (ACF) e Autocorrelação Parcial (PACF) e salva em um único gráfico.
+    Os valores vêm de `diagnosticos.correlogramas` (FFT e Levinson–Durbin, com cache), calculados sobre a
+    série interpolada (como o treino usado pelos modelos, sem unir pontos separados por lacunas) com as
+    defasagens das sugestões de ordens, de modo que a EDA e os modelos compartilham a entrada do cache.
+    Apenas as `lags` primeiras defasagens são desenhadas (limitadas a menos da metade da série).
     """
+    import matplotlib.pyplot as plt
+
     garantir_pasta(pasta_saida)
 
-    plt.figure(figsize=(12, 5))
+    serie = df['Preco_Medio'].interpolate(method='linear').dropna()
+    correlograma = diagnosticos.correlogramas(serie, diagnosticos.lags_correlograma(nome_granularidade),
+                                              pasta_cache)
+    correlograma = {chave: correlograma[chave][:lags + 1] for chave in ("acf", "pacf", "limite_acf", "limite_pacf")}
 
-    plt.subplot(121)
-    sm.graphics.tsa.plot_acf(df['Preco_Medio'], lags=lags, ax=plt.gca())
-    plt.title(f"ACF - {nome_granularidade.capitalize()}")
+    plt.figure(figsize=(12, 5))
 
-    plt.subplot(122)
-    sm.graphics.tsa.plot_pacf(df['Preco_Medio'], lags=lags, ax=plt.gca())
-    plt.title(f"PACF - {nome_granularidade.capitalize()}")
+    _plotar_correlograma(plt.subplot(121), correlograma["acf"], correlograma["limite_acf"],
+                         f"ACF - {nome_granularidade.capitalize()}")
+    _plotar_correlograma(plt.subplot(122), correlograma["pacf"], correlograma["limite_pacf"],
+                         f"PACF - {nome_granularidade.capitalize()}")
 
     plt.tight_layout()
 
@@ -140,59 +253,159 @@ def plotar_acf_pacf(df, nome_granularidade, lags=40, pasta_saida="resultados_eda
     plt.close()
 
     print(f"📊 Gráficos de ACF e PACF salvos em: {caminho_saida}")
+    return caminho_saida
+
+# Gráficos da EDA: tipo -> (função, parâmetros). O arquivo gerado é '<tipo>_<granularidade>.png'.
+GRAFICOS_EDA = {
+    "serie_temporal": (plotar_serie_temporal, {"max_pontos": MAX_PONTOS_GRAFICO}),
+    "decomposicao": (decompor_serie_temporal, {"modelo": "additive", "metodo_nan": "interpolacao"}),
+    "histograma": (plotar_histograma, {}),
+    "acf_pacf": (plotar_acf_pacf, {"lags": 40})
+}
+ARQUIVO_MANIFESTO_EDA = "manifesto_eda.json"
+VERSAO_GRAFICOS = 4  # Incrementar quando a aparência dos gráficos mudar, para redesenhá-los
+
+def chave_grafico(impressao, tipo, parametros):
+    """
+    Monta a chave de cache de um gráfico: impressão da série + tipo do gráfico + parâmetros.
+    """
+    especificacao = json.dumps({"versao": VERSAO_GRAFICOS, "serie": impressao, "tipo": tipo,
+                                "parametros": parametros}, sort_keys=True)
+    return hashlib.sha256(especificacao.encode()).hexdigest()
+
+def carregar_manifesto_eda(pasta_saida="resultados_eda"):
+    """
+    Carrega o manifesto que associa cada gráfico salvo à chave dos dados e parâmetros que o geraram.
+    """
+    caminho = os.path.join(pasta_saida, ARQUIVO_MANIFESTO_EDA)
+    if not os.path.exists(caminho):
+        return {}
+    try:
+        with open(caminho, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+def salvar_manifesto_eda(manifesto, pasta_saida="resultados_eda"):
+    garantir_pasta(pasta_saida)
+    caminho = os.path.join(pasta_saida, ARQUIVO_MANIFESTO_EDA)
+    temporario = f"{caminho}.{os.getpid()}.tmp"
+    with open(temporario, "w", encoding="utf-8") as f:
+        json.dump(manifesto, f, indent=2)
+    os.replace(temporario, caminho)
+
+def renderizar_grafico(tarefa):
+    """
+    Gera um gráfico da EDA (executado em um processo do pool, com o backend não interativo Agg).
+
+    Args:
+        tarefa (tuple): (tipo, df, nome_granularidade, pasta_saida).
+
+    Returns:
+        tuple: Tipo, granularidade, caminho do gráfico (None em caso de erro) e duração em segundos.
+    """
+    import matplotlib
+    matplotlib.use("Agg")
+
+    tipo, df, nome_granularidade, pasta_saida = tarefa
+    funcao, parametros = GRAFICOS_EDA[tipo]
+    inicio = time.perf_counter()
+    try:
+        caminho = funcao(df, nome_granularidade, pasta_saida=pasta_saida, **parametros)
+    except Exception as e:
+        print(f"❌ Erro ao gerar o gráfico '{tipo}' de {nome_granularidade}: {e}")
+        caminho = None
+    return tipo, nome_granularidade, caminho, time.perf_counter() - inicio
 
-def executar_eda(pasta="dados_processados", pasta_saida="resultados_eda"):
+def executar_eda(pasta="dados_processados", pasta_saida="resultados_eda", n_processos=None, usar_cache=True):
     """
     Executa a Análise Exploratória de Dados (EDA) para cada granularidade.
+    Cada gráfico (granularidade x tipo) é uma tarefa de um pool de processos; gráficos cujos dados
+    e parâmetros não mudaram desde a última execução são reaproveitados.
+
+    Args:
+        pasta (str): Diretório dos dados processados.
+        pasta_saida (str): Diretório dos gráficos.
+        n_processos (int): Número de processos (None = um por núcleo, limitado ao número de gráficos).
+        usar_cache (bool): Se False, redesenha todos os gráficos.
     """
     dados = carregar_dados_granularidade(pasta)
+    manifesto = carregar_manifesto_eda(pasta_saida) if usar_cache else {}
 
+    tarefas, chaves = [], {}
     for nome_granularidade, df in dados.items():
         estatisticas_descritivas(df, nome_granularidade)
-        plotar_serie_temporal(df, nome_granularidade, pasta_saida)
-        decompor_serie_temporal(df, nome_granularidade, pasta_saida=pasta_saida)
-        plotar_histograma(df, nome_granularidade, pasta_saida)
-        plotar_acf_pacf(df, nome_granularidade, pasta_saida=pasta_saida)
+        impressao = cache_modelos.impressao_serie(df.set_index('Data')['Preco_Medio'])
+        for tipo, (_, parametros) in GRAFICOS_EDA.items():
+            arquivo = f"{tipo}_{nome_granularidade}.png"
+            chaves[arquivo] = chave_grafico(impressao, tipo, parametros)
+            if manifesto.get(arquivo) == chaves[arquivo] and os.path.exists(os.path.join(pasta_saida, arquivo)):
+                continue
+            tarefas.append((tipo, df, nome_granularidade, pasta_saida))
+
+    reaproveitados = len(chaves) - len(tarefas)
+    inicio = time.perf_counter()
+    if n_processos is None:
+        n_processos = os.cpu_count() or 1
+    n_processos = max(1, min(n_processos, len(tarefas)))
+
+    if n_processos == 1:
+        resultados = [renderizar_grafico(tarefa) for tarefa in tarefas]
+    else:
+        with ProcessPoolExecutor(max_workers=n_processos) as executor:
+            resultados = list(executor.map(renderizar_grafico, tarefas))
+
+    for tipo, nome_granularidade, caminho, _ in resultados:
+        arquivo = f"{tipo}_{nome_granularidade}.png"
+        if caminho is not None:
+            manifesto[arquivo] = chaves[arquivo]
+        else:
+            manifesto.pop(arquivo, None)
+    if tarefas:
+        salvar_manifesto_eda(manifesto, pasta_saida)
 
+    mais_lento = max((duracao for *_, duracao in resultados), default=0.0)
+    print(f"\n🖼️ {len(tarefas)} gráficos gerados em {time.perf_counter() - inicio:.2f}s com {n_processos} processos "
+          f"(mais lento: {mais_lento:.2f}s); {reaproveitados} sem alterações reaproveitados.")
     print("\n✅ Análise Exploratória concluída e gráficos salvos em:", pasta_saida)
 
-def comparar_modelos(caminho_metricas="metricas/resultados_modelos.csv", pasta_resultados="resultados_comparacao"):
+def comparar_modelos(caminho_metricas=banco_metricas.CAMINHO_BANCO, pasta_resultados="resultados_comparacao"):
     """
     Compara os modelos ARIMA, SARIMA e Prophet em diferentes granularidades (diária, semanal, mensal).
-    Gera gráficos comparativos para MAE, RMSE e R².
+    Gera gráficos comparativos para MAE, RMSE e R² (e MAPE, sMAPE e MASE, quando disponíveis).
     
     Args:
-        caminho_metricas (str): Caminho do arquivo CSV com as métricas dos modelos.
+        caminho_metricas (str): Caminho do banco de métricas.
         pasta_resultados (str): Pasta para salvar os gráficos gerados.
     """
     # Garantir que a pasta de resultados exista
     os.makedirs(pasta_resultados, exist_ok=True)
 
-    # Carregar as métricas
-    try:
-        df_metricas = pd.read_csv(caminho_metricas)
-    except FileNotFoundError:
-        print(f"❌ Erro: Arquivo de métricas não encontrado em '{caminho_metricas}'.")
+    # Carregar as métricas da execução mais recente de cada modelo, por granularidade (consultas indexadas)
+    granularidades = ["diaria", "semanal", "mensal"]
+    metricas_granularidade = {
+        granularidade: banco_metricas.consultar_metricas(granularidade=granularidade, caminho_banco=caminho_metricas)
+        for granularidade in granularidades
+    }
+    if all(df.empty for df in metricas_granularidade.values()):
+        print(f"❌ Erro: Nenhuma métrica encontrada em '{caminho_metricas}'.")
         return
 
-    # Garantir que temos as colunas esperadas
-    if not {"Modelo", "MAE", "RMSE", "R²"}.issubset(df_metricas.columns):
-        print("❌ Erro: O arquivo de métricas está com formato incorreto.")
-        return
+    import matplotlib.pyplot as plt
+    import seaborn as sns
 
     print("\n📊 Comparando o desempenho dos modelos...")
 
-    # Separar granularidades
-    granularidades = ["diaria", "semanal", "mensal"]
+    # Iterar por cada métrica disponível e gerar gráficos comparativos
+    for metrica in METRICAS:
+        if all(df[metrica].isna().all() for df in metricas_granularidade.values()):
+            continue
 
-    # Iterar por cada métrica e gerar gráficos comparativos
-    for metrica in ["MAE", "RMSE", "R²"]:
         plt.figure(figsize=(12, 6))
         sns.set_style("whitegrid")
         
         for granularidade in granularidades:
-            # Filtrar dados da granularidade atual
-            df_granularidade = df_metricas[df_metricas["Modelo"].str.contains(granularidade, case=False)]
+            df_granularidade = metricas_granularidade[granularidade]
 
             if df_granularidade.empty:
                 print(f"⚠️ Nenhum dado encontrado para a granularidade '{granularidade}'.")
@@ -220,22 +433,16 @@ def comparar_modelos(caminho_metricas="metricas/resultados_modelos.csv", pasta_r
 
     print("\n✅ Comparação concluída com sucesso!")
 
-def exibir_todas_as_metricas(nome_modelo, caminho_metricas="metricas/resultados_modelos.csv"):
+def exibir_todas_as_metricas(nome_modelo, caminho_metricas=banco_metricas.CAMINHO_BANCO):
     """
-    Exibe todas as métricas (MAE, RMSE, R²) para um modelo específico em todas as granularidades.
+    Exibe todas as métricas (MAE, RMSE, R², ...) para um modelo específico em todas as granularidades.
 
     Args:
         nome_modelo (str): Nome do modelo a ser analisado (ex: "ARIMA", "SARIMA", "Prophet").
-        caminho_metricas (str): Caminho do arquivo CSV com as métricas.
+        caminho_metricas (str): Caminho do banco de métricas.
     """
-    try:
-        df_metricas = pd.read_csv(caminho_metricas)
-    except FileNotFoundError:
-        print(f"❌ Erro: Arquivo de métricas não encontrado em '{caminho_metricas}'.")
-        return
-
-    # Filtrar métricas do modelo específico (independente de maiúsculas/minúsculas)
-    df_modelo = df_metricas[df_metricas["Modelo"].str.contains(nome_modelo, case=False)]
+    # Consulta indexada pelo modelo (independente de maiúsculas/minúsculas)
+    df_modelo = banco_metricas.consultar_metricas(modelo=nome_modelo, caminho_banco=caminho_metricas)
 
     if df_modelo.empty:
         print(f"⚠️ Nenhum resultado encontrado para o modelo '{nome_modelo}'.")